@@ -0,0 +1,75 @@
+import importlib.util
+import os
+import socket
+import subprocess
+import sys
+import time
+
+from django.core.management.base import CommandError
+
+from .loadtest import Command as LoadTestCommand
+
+ASYNC_PATHS = ["/api/v1/forms/", "/api/v1/submissions/", "/api/v1/dashboard/metrics/"]
+
+# name -> (server command, extra environment)
+SERVERS = {
+    "wsgi": (["gunicorn", "backend.wsgi:application", "--workers", "{workers}", "--threads", "{threads}",
+              "--bind", "127.0.0.1:{port}"], {"ASYNC_READ_VIEWS": "False"}),
+    "asgi-sync": (["uvicorn", "backend.asgi:application", "--workers", "{workers}", "--port", "{port}",
+                   "--no-access-log"], {"ASYNC_READ_VIEWS": "False"}),
+    "asgi-async": (["uvicorn", "backend.asgi:application", "--workers", "{workers}", "--port", "{port}",
+                    "--no-access-log"], {"ASYNC_READ_VIEWS": "True"}),
+}
+
+class Command(LoadTestCommand):
+    help = (
+        "Start the app under gunicorn (WSGI) and uvicorn (ASGI, with and without ASYNC_READ_VIEWS) "
+        "in turn and run the loadtest measurement against each, at a concurrency where the WSGI "
+        "workers saturate (e.g. --concurrency 64)."
+    )
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.set_defaults(concurrency=64, requests=1000)
+        parser.add_argument("--server", action="append", choices=list(SERVERS),
+                            help="Configuration to measure (repeatable, default: all)")
+        parser.add_argument("--workers", type=int, default=2, help="Worker processes per server")
+        parser.add_argument("--threads", type=int, default=4, help="Threads per gunicorn worker")
+        parser.add_argument("--port", type=int, default=8765)
+
+    def handle(self, *args, **options):
+        paths = options["path"] or ASYNC_PATHS
+        for name in options["server"] or list(SERVERS):
+            command, env = SERVERS[name]
+            if importlib.util.find_spec(command[0]) is None:
+                # Only compare what was actually measured
+                self.stdout.write(self.style.WARNING(f"\n{name}: skipped, {command[0]} is not installed"))
+                continue
+            args = [part.format(**options) for part in command]
+            base_url = f"http://127.0.0.1:{options['port']}"
+            self.stdout.write(self.style.MIGRATE_HEADING(f"\n{name}: {' '.join(args)}"))
+
+            process = subprocess.Popen(
+                [sys.executable, "-m", *args], env={**os.environ, **env},
+                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            )
+            try:
+                self.wait_for_port(options["port"], process)
+                token = options["token"] or self.obtain_token(base_url, options["username"], options["password"])
+                self.run(base_url, token, paths, options)
+            finally:
+                process.terminate()
+                process.wait(timeout=30)
+
+    @staticmethod
+    def wait_for_port(port, process, timeout=30):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise CommandError(f"Server exited with status {process.returncode} (is it installed?)")
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=1).close()
+                return
+            except OSError:
+                time.sleep(0.2)
+        raise CommandError(f"Server did not start listening on port {port}")
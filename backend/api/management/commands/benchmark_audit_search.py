@@ -0,0 +1,103 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.http import QueryDict
+
+from api.v1.services import AuditLogService
+
+BENCH_MARKER = "[bench]"
+
+# Representative /audit-logs/ searches (query strings as the frontend sends them)
+SCENARIOS = [
+    ("free text", "search=submissions"),
+    ("path token", "search=path:/api/v1/forms/"),
+    ("message token", 'search=message:"-> 500"'),
+    ("status exact", "search=status:404"),
+    ("status class", "search=status:5xx"),
+    ("method + status", "search=method:delete status:403"),
+    ("user token", "search=user:admin"),
+    ("ip exact", "search=ip:10.0.3.7"),
+    ("date range", "date_from=2025-01-01&date_to=2025-01-31"),
+    ("combined", "search=method:post status:2xx path:submissions&date_from=2025-03-01"),
+]
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark AuditLogService search on a large audit table (PostgreSQL). "
+        "Use --seed to insert synthetic rows first and --cleanup to remove them."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--seed", type=int, default=0, help="Insert N synthetic audit rows before measuring")
+        parser.add_argument("--cleanup", action="store_true", help="Delete the synthetic rows afterwards")
+        parser.add_argument("--repeat", type=int, default=5, help="Runs per scenario (median is reported)")
+        parser.add_argument("--explain", action="store_true", help="Print the query plan of each scenario")
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("This benchmark targets PostgreSQL (trigram and btree indexes).")
+
+        if options["seed"]:
+            self.seed(options["seed"])
+
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE relname = 'v1_auditlog'")
+            rows = cursor.fetchone()[0]
+        self.stdout.write(f"v1_auditlog: ~{rows:,} rows, {options['repeat']} runs per scenario\n")
+        self.stdout.write(f"{'scenario':<18}{'first page (ms)':>18}{'count (ms)':>14}{'matches':>12}")
+
+        for label, query_string in SCENARIOS:
+            queryset = AuditLogService.get_queryset(QueryDict(query_string))
+            page_ms = self.measure(lambda: list(queryset[:10]), options["repeat"])
+            count_holder = {}
+            count_ms = self.measure(lambda: count_holder.update(n=queryset.count()), options["repeat"])
+            self.stdout.write(f"{label:<18}{page_ms:>18.1f}{count_ms:>14.1f}{count_holder['n']:>12,}")
+            if options["explain"]:
+                self.stdout.write(queryset[:10].explain(analyze=True, buffers=True))
+                self.stdout.write("")
+
+        if options["cleanup"]:
+            with connection.cursor() as cursor:
+                cursor.execute("DELETE FROM v1_auditlog WHERE message LIKE %s", [BENCH_MARKER + "%"])
+                self.stdout.write(self.style.SUCCESS(f"Removed {cursor.rowcount:,} synthetic rows"))
+
+    @staticmethod
+    def measure(run, repeat):
+        timings = []
+        for _ in range(max(repeat, 1)):
+            start = time.perf_counter()
+            run()
+            timings.append((time.perf_counter() - start) * 1000)
+        return statistics.median(timings)
+
+    def seed(self, count):
+        self.stdout.write(f"Seeding {count:,} synthetic audit rows...")
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                WITH u AS (SELECT array_agg(id ORDER BY id) AS ids FROM auth_user)
+                INSERT INTO v1_auditlog (user_id, method, path, status_code, message, ip_address, created_at)
+                SELECT
+                    u.ids[1 + g %% cardinality(u.ids)],
+                    (ARRAY['POST', 'PUT', 'PATCH', 'DELETE'])[1 + g %% 4],
+                    p.path,
+                    s.code,
+                    %s || ' ' || (ARRAY['POST', 'PUT', 'PATCH', 'DELETE'])[1 + g %% 4] || ' ' || p.path || ' -> ' || s.code,
+                    ('10.0.' || (g %% 256) || '.' || (g %% 251))::inet,
+                    now() - (g %% 31536000) * interval '1 second'
+                FROM generate_series(1, %s) AS g
+                CROSS JOIN u
+                CROSS JOIN LATERAL (
+                    SELECT (ARRAY['/api/v1/forms/', '/api/v1/submissions/', '/api/v1/users/', '/api/v1/auth/token/'])[1 + g %% 4]
+                        || CASE WHEN g %% 3 = 0 THEN (g %% 997)::text || '/' ELSE '' END AS path
+                ) p
+                CROSS JOIN LATERAL (
+                    SELECT (ARRAY[200, 201, 204, 400, 403, 404, 500])[1 + (g / 7) %% 7] AS code
+                ) s
+                """,
+                [BENCH_MARKER, count],
+            )
+            cursor.execute("ANALYZE v1_auditlog")
+        self.stdout.write(self.style.SUCCESS("Seeded."))
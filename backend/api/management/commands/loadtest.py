@@ -0,0 +1,93 @@
+import json
+import statistics
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+
+DEFAULT_PATHS = ["/api/v1/dashboard/metrics/", "/api/v1/forms/"]
+
+class Command(BaseCommand):
+    help = (
+        "Small HTTP load test against a running server (e.g. gunicorn). Run it once per server "
+        "configuration, e.g. DB_CONN_MAX_AGE=0 vs DB_CONN_MAX_AGE=60 vs DB_POOL=true, "
+        "and compare the per-request latencies."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--base-url", default="http://localhost:8000", help="Server to hit")
+        parser.add_argument("--path", action="append", help=f"Endpoint to hit (repeatable, default: {DEFAULT_PATHS})")
+        parser.add_argument("--requests", type=int, default=200, help="Requests per endpoint")
+        parser.add_argument("--concurrency", type=int, default=4, help="Parallel clients")
+        parser.add_argument("--warmup", type=int, default=10, help="Unmeasured requests per endpoint first")
+        parser.add_argument("--token", help="JWT access token (otherwise obtained with --username/--password)")
+        parser.add_argument("--username")
+        parser.add_argument("--password")
+
+    def handle(self, *args, **options):
+        base_url = options["base_url"].rstrip("/")
+        token = options["token"] or self.obtain_token(base_url, options["username"], options["password"])
+        self.stdout.write(
+            f"{options['requests']} requests per endpoint, concurrency {options['concurrency']}\n"
+        )
+        self.run(base_url, token, options["path"] or DEFAULT_PATHS, options)
+
+    def run(self, base_url, token, paths, options):
+        """Measure every path and print one table row each (also used by benchmark_asgi)."""
+        headers = {"Authorization": f"Bearer {token}", "Accept": "application/json"}
+        self.stdout.write(f"{'endpoint':<34}{'req/s':>8}{'mean':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'errors':>8}   (ms)")
+
+        for path in paths:
+            url = base_url + path
+            for _ in range(options["warmup"]):
+                self.timed_get(url, headers)
+
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=options["concurrency"]) as pool:
+                results = list(pool.map(lambda _: self.timed_get(url, headers), range(options["requests"])))
+            elapsed = time.perf_counter() - started
+
+            timings = sorted(ms for ok, ms in results if ok)
+            errors = sum(1 for ok, _ in results if not ok)
+            if not timings:
+                self.stdout.write(f"{path:<34}{'all requests failed':>44}")
+                continue
+            self.stdout.write(
+                f"{path:<34}{len(results) / elapsed:>8.1f}{statistics.mean(timings):>9.1f}"
+                f"{self.percentile(timings, 50):>9.1f}{self.percentile(timings, 95):>9.1f}"
+                f"{self.percentile(timings, 99):>9.1f}{errors:>8}"
+            )
+
+    @staticmethod
+    def percentile(timings, pct):
+        index = min(len(timings) - 1, round(pct / 100 * (len(timings) - 1)))
+        return timings[index]
+
+    @staticmethod
+    def timed_get(url, headers):
+        request = urllib.request.Request(url, headers=headers)
+        start = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request, timeout=30) as response:
+                response.read()
+                ok = response.status == 200
+        except (urllib.error.URLError, TimeoutError):
+            ok = False
+        return ok, (time.perf_counter() - start) * 1000
+
+    @staticmethod
+    def obtain_token(base_url, username, password):
+        if not username or not password:
+            raise CommandError("Pass --token or --username/--password.")
+        request = urllib.request.Request(
+            f"{base_url}/api/v1/auth/token/",
+            data=json.dumps({"username": username, "password": password}).encode(),
+            headers={"Content-Type": "application/json"},
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=30) as response:
+                return json.load(response)["access"]
+        except (urllib.error.URLError, KeyError, ValueError) as e:
+            raise CommandError(f"Could not obtain a token: {e}")
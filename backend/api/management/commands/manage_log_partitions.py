@@ -0,0 +1,59 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from api.v1.services import LogPartitionService
+
+class Command(BaseCommand):
+    help = (
+        "Create upcoming monthly partitions of the audit/application log tables and apply the "
+        "retention policy: expired partitions are detached, archived as gzipped NDJSON and dropped. "
+        "Meant to run daily (cron / scheduled job) on PostgreSQL."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--table", choices=LogPartitionService.TABLES, action="append",
+            help="Only manage this table (repeatable); defaults to all log tables",
+        )
+        parser.add_argument(
+            "--premake", type=int, default=settings.LOG_PARTITION_PREMAKE_MONTHS,
+            help="Months of future partitions to keep ready",
+        )
+        parser.add_argument(
+            "--retention", type=int, default=None,
+            help="Months to keep for every selected table (overrides LOG_RETENTION_MONTHS; 0 keeps all)",
+        )
+        parser.add_argument("--archive-dir", default=settings.LOG_ARCHIVE_DIR, help="Where archives are written")
+        parser.add_argument("--skip-retention", action="store_true", help="Only create partitions")
+        parser.add_argument("--dry-run", action="store_true", help="Print the plan without changing anything")
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("Log partitioning requires PostgreSQL.")
+
+        for table in options["table"] or LogPartitionService.TABLES:
+            if not LogPartitionService.is_partitioned(table):
+                raise CommandError(f"{table} is not partitioned; run `manage.py migrate` first.")
+            retention = options["retention"]
+            if retention is None:
+                retention = settings.LOG_RETENTION_MONTHS.get(table, 0)
+
+            months = LogPartitionService.missing_months(table, premake=options["premake"])
+            expired = [] if options["skip_retention"] else LogPartitionService.expired_partitions(table, retention)
+
+            if options["dry_run"]:
+                for month in months:
+                    self.stdout.write(f"would create {LogPartitionService.partition_name(table, month)}")
+                for name in expired:
+                    self.stdout.write(f"would archive and drop {name}")
+                continue
+
+            for month in months:
+                name = LogPartitionService.create_partition(table, month)
+                self.stdout.write(self.style.SUCCESS(f"Created {name}"))
+            if expired:
+                for name, path, rows in LogPartitionService.apply_retention(table, retention, options["archive_dir"]):
+                    self.stdout.write(self.style.SUCCESS(f"Archived {name} ({rows:,} rows) to {path} and dropped it"))
+            if not months and not expired:
+                self.stdout.write(f"{table}: nothing to do")
@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from api.v1.services import MetricRollupService
+
+class Command(BaseCommand):
+    help = (
+        "Fold the shards of closed dashboard MetricRollup buckets into one row and delete hourly "
+        "buckets past the retention window. Meant to run daily (cron / scheduled job)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--retention", type=int, default=settings.METRIC_ROLLUP_HOUR_RETENTION_DAYS,
+            help="Days of hourly buckets to keep (overrides METRIC_ROLLUP_HOUR_RETENTION_DAYS; 0 keeps all)",
+        )
+
+    def handle(self, *args, **options):
+        folded = MetricRollupService.compact()
+        self.stdout.write(f"Folded {folded} shard rows of closed buckets")
+        deleted = MetricRollupService.prune(options["retention"])
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} expired hourly buckets"))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from api.v1.services import MetricRollupService
+
+class Command(BaseCommand):
+    help = "Recompute the dashboard MetricRollup counters from the users, forms and submissions tables"
+
+    def handle(self, *args, **kwargs):
+        self.stdout.write("Rebuilding dashboard metric rollups...")
+        rows = MetricRollupService.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Metric rollups rebuilt ({rows} rows)"))
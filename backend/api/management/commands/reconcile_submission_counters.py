@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from api.v1.services import SubmissionCounterService
+
+class Command(BaseCommand):
+    help = "Recompute the per-form submission counters on FormDefinition from the submissions table"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="Only report how many form versions drifted")
+
+    def handle(self, *args, **options):
+        self.stdout.write("Reconciling form submission counters...")
+        drifted = SubmissionCounterService.reconcile(dry_run=options["dry_run"])
+        if options["dry_run"]:
+            self.stdout.write(f"{drifted} form versions have drifted counters")
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Submission counters reconciled ({drifted} form versions fixed)"))
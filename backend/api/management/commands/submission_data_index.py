@@ -0,0 +1,80 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from api.v1.models import FormDefinition
+from api.v1.services import FormSchemaService, SubmissionDataIndexService, SubmissionQueryService
+
+class Command(BaseCommand):
+    help = (
+        "Manage per-field expression indexes on FormSubmission.data (PostgreSQL) for hot "
+        "data.<field>__gte/__lt/... filters: list them, create one for FORM_ID:FIELD, drop one, "
+        "create them for every latest-version field filtered at least --hot times (counted by the "
+        "submissions API), or --prune those of superseded and deleted form versions."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--list", action="store_true", help="Show existing indexes and filter usage")
+        parser.add_argument("--create", action="append", metavar="FORM_ID:FIELD", help="Index one field (repeatable)")
+        parser.add_argument("--drop", action="append", metavar="INDEX", help="Drop one index (repeatable)")
+        parser.add_argument("--hot", type=int, metavar="USES", help="Index every field filtered at least USES times")
+        parser.add_argument("--prune", action="store_true", help="Drop the indexes of superseded and deleted versions")
+        parser.add_argument("--dry-run", action="store_true", help="Print what --create/--hot/--prune would do")
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("Submission data indexes require PostgreSQL.")
+
+        targets = [self.parse_target(target) for target in options["create"] or []]
+        if options["hot"] is not None:
+            targets += [
+                (form_id, name) for form_id, name, uses in SubmissionQueryService.usage(latest_only=True)
+                if uses >= options["hot"]
+            ]
+
+        for form_id, name in targets:
+            index = SubmissionDataIndexService.index_name(form_id, name)
+            if options["dry_run"]:
+                self.stdout.write(f"would create {index} on form {form_id} field {name!r}")
+                continue
+            SubmissionDataIndexService.create(form_id, name)
+            self.stdout.write(self.style.SUCCESS(f"Created {index}"))
+
+        drops = list(options["drop"] or [])
+        if options["prune"]:
+            stale = SubmissionDataIndexService.stale([name for name, _ in SubmissionDataIndexService.existing()])
+            if options["dry_run"]:
+                for index in stale:
+                    self.stdout.write(f"would drop {index}")
+            else:
+                drops += stale
+
+        for index in drops:
+            try:
+                SubmissionDataIndexService.drop(index)
+            except ValueError as e:
+                raise CommandError(str(e))
+            self.stdout.write(self.style.SUCCESS(f"Dropped {index}"))
+
+        if options["list"] or not (targets or options["drop"] or options["prune"]):
+            self.list_indexes()
+
+    @staticmethod
+    def parse_target(target):
+        form_id, _, name = target.partition(":")
+        if not form_id.isdigit() or not name:
+            raise CommandError(f"Expected FORM_ID:FIELD, got {target!r}")
+        form = FormDefinition.objects.filter(pk=int(form_id)).first()
+        if form is None:
+            raise CommandError(f"Form {form_id} does not exist.")
+        if name not in {field["name"] for field in FormSchemaService.get_fields(form)}:
+            raise CommandError(f"Form {form_id} has no field {name!r}.")
+        return form.id, name
+
+    def list_indexes(self):
+        indexes = SubmissionDataIndexService.existing()
+        self.stdout.write(f"{len(indexes)} per-field index(es)")
+        for name, definition in indexes:
+            self.stdout.write(f"  {name}: {definition}")
+        self.stdout.write("Filter usage (form, field, uses):")
+        for form_id, name, uses in SubmissionQueryService.usage()[:20]:
+            self.stdout.write(f"  {form_id:>6}  {name:<32}{uses:>8}")
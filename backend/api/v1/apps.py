@@ -6,5 +6,6 @@ class ApiConfig(AppConfig):
     name = 'api.v1'
 
     def ready(self):
-        # Import signals
-        import api.v1.signals
\ No newline at end of file
+        # Import signals and system checks
+        import api.v1.signals
+        import api.v1.checks
@@ -0,0 +1,218 @@
+"""
+Async-native read endpoints for ASGI deployments (enabled with ASYNC_READ_VIEWS).
+
+DRF views are sync-only, so under an ASGI server every request to them is handed to a thread.
+These views answer the hot polling reads without leaving the event loop except for the ORM's
+own per-query hop: form list/retrieve, submission list and dashboard metrics. They reuse the
+services, serializers, response cache and ETags of the sync views, so responses are identical.
+Every other method on the same URLs (and unusual read options such as keyset pagination) is
+delegated to the sync DRF view.
+"""
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.http import Http404, HttpResponse
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import exceptions, status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from .authentication import StatelessJWTAuthentication
+from .exception_handler import custom_exception_handler
+from .mixins import not_modified_response, set_validators
+from .models import FieldDefinition
+from .pagination import StandardResultsSetPagination
+from .serializers import FormDefinitionSerializer, FormSubmissionSerializer
+from .services import (
+    ChangeCounterService,
+    DashboardService,
+    FormCacheService,
+    FormDefinitionService,
+    FormSchemaService,
+    FormSubmissionService,
+    RoleService,
+    SubmissionQueryService,
+)
+from .views import DashboardMetricsView, FormDefinitionViewSet, FormSubmissionViewSet
+
+READ_ROLES = {"Admin", "Editor", "Viewer"}
+
+
+def render(data, status_code=status.HTTP_200_OK):
+    return HttpResponse(JSONRenderer().render(data), status=status_code, content_type="application/json")
+
+
+class AsyncReadView(View):
+    """
+    Authenticates with the JWT settings of the sync API, checks read permission and renders the
+    handler's data as JSON. `sync_view` serves every request `handles()` declines.
+    """
+
+    sync_view = None
+    read_roles = READ_ROLES   # None: any authenticated user
+    authenticator = StatelessJWTAuthentication
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        # Like DRF's APIView.as_view: the API authenticates with JWT headers, not session cookies,
+        # so CsrfViewMiddleware must not reject the writes handed to the sync viewsets
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    async def dispatch(self, request, *args, **kwargs):
+        if request.method != "GET" or not self.handles(request):
+            return await sync_to_async(self.call_sync_view)(request, *args, **kwargs)
+        try:
+            credentials = await self.authenticator().aauthenticate(request)
+            if credentials is None:
+                raise exceptions.NotAuthenticated()
+            self.user, self.token = credentials
+            self.roles = await RoleService.aget_roles(self.user, self.token)
+            if self.read_roles is not None and self.roles.isdisjoint(self.read_roles):
+                raise exceptions.PermissionDenied()
+            return await self.get(request, *args, **kwargs)
+        except (Http404, exceptions.APIException) as exc:
+            return self.error_response(exc)
+
+    def handles(self, request) -> bool:
+        return True
+
+    def call_sync_view(self, request, *args, **kwargs):
+        # Render in the worker thread too, so lazy serializer data never runs on the event loop
+        response = self.sync_view(request, *args, **kwargs)
+        if hasattr(response, "render"):
+            response.render()
+        return response
+
+    def error_response(self, exc):
+        response = custom_exception_handler(exc, {})
+        rendered = render(response.data, response.status_code)
+        if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+            rendered["WWW-Authenticate"] = self.authenticator().authenticate_header(self.request)
+        return rendered
+
+    # ---- page-number pagination, same shape and links as StandardResultsSetPagination ----
+
+    def page_bounds(self, request):
+        params = request.GET
+        page_size = StandardResultsSetPagination.page_size
+        if params.get("page_size"):
+            page_size = min(int(params["page_size"]), StandardResultsSetPagination.max_page_size)
+        page = int(params.get("page", 1))
+        return page, page_size
+
+    def paginated(self, request, count, page, page_size, results):
+        url = request.build_absolute_uri()
+        last_page = max(1, -(-count // page_size))
+        if page > last_page:
+            raise exceptions.NotFound("Invalid page.")
+        next_link = replace_query_param(url, "page", page + 1) if page < last_page else None
+        if page == 1:
+            previous_link = None
+        elif page == 2:
+            previous_link = remove_query_param(url, "page")
+        else:
+            previous_link = replace_query_param(url, "page", page - 1)
+        return {"count": count, "next": next_link, "previous": previous_link, "results": results}
+
+    @staticmethod
+    def simple_pagination(request) -> bool:
+        """Positive integer page/page_size only; anything else (e.g. page=last) goes to the sync view."""
+        return all(request.GET.get(name, "1").isdigit() and request.GET.get(name, "1") != "0"
+                   for name in ("page", "page_size"))
+
+
+class AsyncFormView(AsyncReadView):
+    """GET /forms/ and /forms/{id}/, served from the same FormCacheService entries as the sync view."""
+
+    async def get(self, request, pk=None):
+        action = "list" if pk is None else "retrieve"
+        scope = FormCacheService.scope(self.roles)
+        key, etag = await FormCacheService.aresponse_key(request, action, scope, pk)
+        not_modified = not_modified_response(request, etag)
+        if not_modified is not None:
+            return not_modified
+
+        timeout = FormCacheService.timeout()
+        data = await cache.aget(key) if timeout else None
+        if data is None:
+            queryset = FormDefinitionService.get_queryset(self.user, request.GET)
+            if pk is None:
+                page, page_size = self.page_bounds(request)
+                count = await queryset.acount()
+                offset = (page - 1) * page_size
+                forms = [form async for form in queryset[offset:offset + page_size]]
+                await FieldDefinition.objects.aattach(forms)
+                data = self.paginated(request, count, page, page_size, self.serialize(request, forms, many=True))
+            else:
+                try:
+                    form = await queryset.aget(pk=int(pk))
+                except (ValueError, queryset.model.DoesNotExist):
+                    raise Http404(f"No {queryset.model._meta.object_name} matches the given query.")
+                await FieldDefinition.objects.aattach([form])
+                data = self.serialize(request, form)
+            if timeout:
+                await cache.aset(key, data, timeout)
+        return set_validators(render(data), etag)
+
+    def handles(self, request):
+        return self.simple_pagination(request)
+
+    @staticmethod
+    def serialize(request, instance, many=False):
+        return FormDefinitionSerializer(instance, many=many, context={"request": request}).data
+
+
+class AsyncSubmissionListView(AsyncReadView):
+    """GET /submissions/ and /forms/{form_pk}/submissions/ (page-number pagination)."""
+
+    async def get(self, request, form_pk=None):
+        counters = await ChangeCounterService.avalues(FormCacheService.COUNTER, "submissions")
+        kwargs = {"form_pk": form_pk} if form_pk is not None else {}
+        etag = FormSubmissionService.etag(request, "list", self.user, self.roles, kwargs, counters)
+        not_modified = not_modified_response(request, etag)
+        if not_modified is not None:
+            return not_modified
+
+        queryset = FormSubmissionService.get_queryset(self.user, self.roles, request.GET, form_pk)
+        page, page_size = self.page_bounds(request)
+        count = await queryset.acount()
+        offset = (page - 1) * page_size
+        submissions = [submission async for submission in queryset[offset:offset + page_size]]
+
+        include_fields = FormSubmissionService.include_fields(request.GET)
+        context = {"request": request, "include_fields": include_fields}
+        if include_fields:
+            # Resolve the schemas here so serialization never touches the ORM
+            forms = {submission.form_id: submission.form for submission in submissions}
+            context["form_schemas"] = await FormSchemaService.aget_many(forms.values())
+        results = FormSubmissionSerializer(submissions, many=True, context=context).data
+        return set_validators(render(self.paginated(request, count, page, page_size, results)), etag)
+
+    def handles(self, request):
+        params = request.GET
+        keyset = params.get("pagination") == "cursor" or "cursor" in params
+        # data.* filters resolve the form schema through the sync cache/ORM
+        return not keyset and not SubmissionQueryService.has_filters(params) and self.simple_pagination(request)
+
+
+class AsyncDashboardMetricsView(AsyncReadView):
+    read_roles = None
+
+    async def get(self, request):
+        days, hours = DashboardMetricsView.window(request.GET)
+        metrics, etag, generated_at = await DashboardService.aget_snapshot(days=days, hours=hours)
+        not_modified = not_modified_response(request, etag, generated_at)
+        if not_modified is not None:
+            return not_modified
+        return set_validators(render(metrics), etag, generated_at)
+
+
+# Sync views for the methods and options the async views do not serve (same action maps as the routers)
+form_list_view = AsyncFormView.as_view(sync_view=FormDefinitionViewSet.as_view({"get": "list", "post": "create"}))
+form_detail_view = AsyncFormView.as_view(sync_view=FormDefinitionViewSet.as_view({
+    "get": "retrieve", "put": "update", "patch": "partial_update", "delete": "destroy",
+}))
+submission_list_view = AsyncSubmissionListView.as_view(
+    sync_view=FormSubmissionViewSet.as_view({"get": "list", "post": "create"})
+)
+dashboard_metrics_view = AsyncDashboardMetricsView.as_view(sync_view=DashboardMetricsView.as_view())
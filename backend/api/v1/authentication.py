@@ -0,0 +1,188 @@
+import hmac
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser, User
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+from rest_framework.authentication import BaseAuthentication, get_authorization_header
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+
+from .services import RoleService
+
+TOKEN_VERSION_CLAIM = "token_version"
+
+
+class TokenBackedUser(TokenUser):
+    """
+    Request user built from the access token claims: id, username, roles, is_staff, is_superuser.
+    Anything else (email, groups, permissions, date_joined...) loads the User row on first use,
+    at most once per request.
+    """
+
+    def __init__(self, token):
+        super().__init__(token)
+        if "roles" in token:
+            # RoleService.get_roles reads this instead of querying auth_group
+            setattr(self, RoleService.ROLE_CACHE_ATTR, frozenset(token["roles"]))
+
+    def __str__(self):
+        return self.username
+
+    @cached_property
+    def id(self):
+        # The claim is serialized as a string; compare equal to model ids (e.g. submitted_by_id)
+        return User._meta.pk.to_python(self.token[api_settings.USER_ID_CLAIM])
+
+    @cached_property
+    def pk(self):
+        return self.id
+
+    @cached_property
+    def model_user(self) -> User:
+        return User.objects.get(pk=self.id)
+
+    @cached_property
+    def is_staff(self):
+        return self.token["is_staff"] if "is_staff" in self.token else self.model_user.is_staff
+
+    @cached_property
+    def is_superuser(self):
+        return self.token["is_superuser"] if "is_superuser" in self.token else self.model_user.is_superuser
+
+    @property
+    def groups(self):
+        return self.model_user.groups
+
+    @property
+    def user_permissions(self):
+        return self.model_user.user_permissions
+
+    def get_group_permissions(self, obj=None):
+        return self.model_user.get_group_permissions(obj)
+
+    def get_all_permissions(self, obj=None):
+        return self.model_user.get_all_permissions(obj)
+
+    def has_perm(self, perm, obj=None):
+        return self.model_user.has_perm(perm, obj)
+
+    def has_perms(self, perm_list, obj=None):
+        return self.model_user.has_perms(perm_list, obj)
+
+    def has_module_perms(self, module):
+        return self.model_user.has_module_perms(module)
+
+    def __getattr__(self, attr):
+        # Only reached for attributes not defined above (TokenUser falls back to raw claims)
+        if attr.startswith("_"):
+            raise AttributeError(attr)
+        return getattr(self.model_user, attr)
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication without the per-request User query on reads.
+
+    - Safe methods get a TokenBackedUser built from the claims.
+    - Writes load the User model as usual, since serializers assign request.user to foreign keys.
+    - Every request compares the token's `token_version` claim with
+      RoleService.get_token_version (served from the cache). Role changes through
+      RoleService.assign_role, flag or password changes and deactivation therefore revoke
+      tokens issued before them, and the client has to log in again.
+    - Tokens issued before the claim existed fall back to the regular database lookup.
+    """
+
+    def authenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+        if TOKEN_VERSION_CLAIM not in validated_token:
+            return self.get_user(validated_token), validated_token
+
+        self.check_token_version(validated_token)
+        if request.method in SAFE_METHODS:
+            return TokenBackedUser(validated_token), validated_token
+        return self.get_user(validated_token), validated_token
+
+    def check_token_version(self, validated_token):
+        current = RoleService.get_token_version(self.get_user_id(validated_token))
+        self.compare_token_version(validated_token, current)
+
+    @staticmethod
+    def get_user_id(validated_token):
+        try:
+            return validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(_("Token contained no recognizable user identification")) from e
+
+    @staticmethod
+    def compare_token_version(validated_token, current):
+        if current is None:
+            raise AuthenticationFailed(_("User not found or inactive"), code="user_inactive")
+        if validated_token[TOKEN_VERSION_CLAIM] != current:
+            raise AuthenticationFailed(_("Token has been revoked, log in again"), code="token_revoked")
+
+    # ---- async counterparts (api.v1.async_views) ----
+
+    async def aauthenticate(self, request):
+        """
+        Async authenticate. Honours JWT_STATELESS_AUTH: without it the User row is loaded on
+        every request, as with the default JWTAuthentication.
+        """
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+        if getattr(settings, "JWT_STATELESS_AUTH", False) and TOKEN_VERSION_CLAIM in validated_token:
+            current = await RoleService.aget_token_version(self.get_user_id(validated_token))
+            self.compare_token_version(validated_token, current)
+            return TokenBackedUser(validated_token), validated_token
+        return await self.aget_user(validated_token), validated_token
+
+    async def aget_user(self, validated_token):
+        user_id = self.get_user_id(validated_token)
+        try:
+            user = await self.user_model.objects.aget(**{api_settings.USER_ID_FIELD: user_id})
+        except self.user_model.DoesNotExist as e:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found") from e
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        return user
+
+
+class MetricsScrapeTokenAuthentication(BaseAuthentication):
+    """
+    "Authorization: Bearer <METRICS_SCRAPE_TOKEN>" for the Prometheus scraper, which cannot log in
+    for a JWT. Authenticates an anonymous user with request.auth set to SCRAPE_AUTH (checked by
+    permissions.HasMetricsScrapeToken); any other header is left to the JWT classes after it.
+    """
+
+    SCRAPE_AUTH = "metrics-scrape"
+
+    def authenticate(self, request):
+        token = getattr(settings, "METRICS_SCRAPE_TOKEN", "")
+        if not token:
+            return None
+        parts = get_authorization_header(request).split()
+        if len(parts) != 2 or parts[0].lower() != b"bearer":
+            return None
+        if not hmac.compare_digest(parts[1], token.encode()):
+            return None
+        return AnonymousUser(), self.SCRAPE_AUTH
+
+    def authenticate_header(self, request):
+        # First class on the view: keeps unauthenticated requests a 401, as with JWT alone
+        return 'Bearer realm="api"'
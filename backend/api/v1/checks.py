@@ -0,0 +1,36 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, Warning, register
+
+from .services import ChangeCounterService
+
+
+@register(Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    """Change counters, cached responses and token versions must be shared by every worker."""
+    if ChangeCounterService.is_shared():
+        return []
+    return [
+        Error(
+            f"{settings.APP_SERVER_WORKERS} app server workers with the per-process cache backend "
+            f"{settings.CACHES['default']['BACKEND']}: each worker would keep its own change "
+            "counters and serve stale ETags (304) and cached forms, and accept revoked tokens "
+            "(JWT_STATELESS_AUTH) for up to JWT_TOKEN_VERSION_LOCAL_TTL seconds.",
+            hint="Set REDIS_URL (docker-compose.yml runs a redis service) or run a single worker (GUNICORN_WORKERS=1).",
+            id="api.E001",
+        )
+    ]
+
+
+@register()
+def check_asgi_connection_reuse(app_configs, **kwargs):
+    """Under uvicorn persistent connections are disabled (settings.py), so only a pool reuses them."""
+    if settings.APP_SERVER != "uvicorn" or settings.DB_POOL:
+        return []
+    return [
+        Warning(
+            "APP_SERVER=uvicorn without DB_POOL: CONN_MAX_AGE is forced to 0, so every request "
+            "opens a new database connection.",
+            hint="Set DB_POOL=true (psycopg 3 pool, sized by DB_POOL_MIN_SIZE / DB_POOL_MAX_SIZE).",
+            id="api.W002",
+        )
+    ]
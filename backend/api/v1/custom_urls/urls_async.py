@@ -0,0 +1,13 @@
+from django.urls import path, re_path
+from ..async_views import dashboard_metrics_view, form_detail_view, form_list_view, submission_list_view
+
+# Same paths and names as the routers; listed first in api.v1.urls when ASYNC_READ_VIEWS is on.
+# Non-GET methods on these paths are passed through to the DRF viewsets.
+urlpatterns = [
+    path("forms/", form_list_view, name="form-list"),
+    # Numeric ids only, so list-level actions (forms/submission-counters/) reach the router
+    re_path(r"^forms/(?P<pk>\d+)/$", form_detail_view, name="form-detail"),
+    path("submissions/", submission_list_view, name="form-submission-list"),
+    path("forms/<str:form_pk>/submissions/", submission_list_view, name="form-submissions-nested-list"),
+    path("dashboard/metrics/", dashboard_metrics_view, name="metrics"),
+]
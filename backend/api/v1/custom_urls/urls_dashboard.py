@@ -1,6 +1,7 @@
 from django.urls import path
-from ..views import DashboardMetricsView
+from ..views import DashboardMetricsView, RequestMetricsView
 
 urlpatterns = [
     path("metrics/", DashboardMetricsView.as_view(), name="metrics"),
+    path("metrics/prometheus/", RequestMetricsView.as_view(), name="metrics-prometheus"),
 ]
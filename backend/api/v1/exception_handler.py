@@ -7,7 +7,6 @@ from psycopg.errors import UniqueViolation
 # Centralized map of constraint names → friendly messages
 CONSTRAINT_ERROR_MESSAGES = {
     "unique_form_name_version": "A form with this name and version already exists.",
-    "unique_form_field_name": "Each field name must be unique within a form.",
     "unique_submission_per_user_per_version": "You have already submitted this form version.",
 }
 
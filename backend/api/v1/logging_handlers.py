@@ -1,26 +1,194 @@
+import atexit
 import logging
+import os
+import queue
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+
+from django.db import close_old_connections, connection
+
+# Queued by close() to wake the writer thread without waiting for the flush interval
+_STOP = object()
+
+# Write failures are reported here; LOGGING only attaches the db handlers to "audit"
+logger = logging.getLogger(__name__)
 
 class DatabaseLogHandler(logging.Handler):
-    def emit(self, record):
+    def build_entry(self, record):
+        """Turn a log record into an unsaved AuditLog / LogEntry instance."""
         from .models import LogEntry, AuditLog
+        # When the record was logged, not when a buffered batch reaches the database
+        created_at = datetime.fromtimestamp(record.created, tz=timezone.utc)
+        if hasattr(record, "audit"):
+            audit = record.audit
+            return AuditLog(
+                user_id=getattr(audit.get("user"), "id", None),   # FK safe lookup
+                method=audit.get("method"),
+                path=audit.get("path"),
+                status_code=audit.get("status_code"),
+                message=self.format(record),  # also fill the `message` field
+                ip_address=audit.get("ip"),
+                duration_ms=audit.get("duration_ms"),
+                request_bytes=audit.get("request_bytes"),
+                response_bytes=audit.get("response_bytes"),
+                sample_rate=audit.get("sample_rate", 1.0),
+                created_at=created_at,
+            )
+        return LogEntry(
+            level=record.levelname,
+            message=self.format(record),
+            logger_name=record.name,
+            created_at=created_at,
+        )
+
+    def emit(self, record):
+        try:
+            self.build_entry(record).save()
+        except Exception:
+            self.handleError(record)
+
+
+class BufferedDatabaseLogHandler(DatabaseLogHandler):
+    """
+    Queue log records in memory and write them with bulk_create instead of one INSERT per record.
+
+    - A background thread flushes when `batch_size` records are queued or `flush_interval` seconds pass.
+    - The queue is bounded by `max_queue_size`. When it is full, emit waits up to `block_timeout`
+      seconds, then drops the record and counts it in `stats["dropped"]`.
+    - Records that cannot be built or written are counted in `stats["failed"]`; batch write errors
+      are logged on this module's logger, build errors go through handleError().
+    - Remaining records are flushed on close(), which also runs at interpreter exit.
+    - With background=False no thread is started; records are written from the emitting thread
+      once a batch fills up, or on flush().
+    """
+
+    def __init__(self, batch_size=100, flush_interval=1.0, max_queue_size=10000,
+                 block_timeout=0.0, background=True, level=logging.NOTSET):
+        super().__init__(level)
+        self.batch_size = int(batch_size)
+        self.flush_interval = float(flush_interval)
+        self.max_queue_size = int(max_queue_size)
+        self.block_timeout = float(block_timeout)
+        self.background = background
+
+        self.queue = queue.Queue(maxsize=self.max_queue_size)
+        self.stats = {"enqueued": 0, "written": 0, "dropped": 0, "failed": 0}
+        self._stats_lock = threading.Lock()
+        self._worker_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._worker = None
+        self._pid = None
+        self._closed = False
+        atexit.register(self.close)
+
+    def _count(self, key, amount=1):
+        with self._stats_lock:
+            self.stats[key] += amount
+
+    def _ensure_worker(self):
+        if self._worker is not None and self._pid == os.getpid() and self._worker.is_alive():
+            return
+        with self._worker_lock:
+            if self._pid != os.getpid():
+                # Forked (e.g. gunicorn worker): the parent's queue and thread do not carry over
+                self.queue = queue.Queue(maxsize=self.max_queue_size)
+                self._pid = os.getpid()
+                self._worker = None
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="audit-log-writer", daemon=True)
+                self._worker.start()
+
+    def emit(self, record):
+        if self._closed:
+            return super().emit(record)
         try:
-            if hasattr(record, "audit"):
-                audit = record.audit
-                AuditLog.objects.create(
-                    user_id=getattr(audit.get("user"), "id", None),   # FK safe lookup
-                    method=audit.get("method"),
-                    path=audit.get("path"),
-                    status_code=audit.get("status_code"),
-                    message=self.format(record),  # also fill the `message` field
-                    ip_address=audit.get("ip"),
-                )
+            entry = self.build_entry(record)
+        except Exception:
+            self._count("failed")
+            self.handleError(record)
+            return
+
+        if self.background:
+            self._ensure_worker()
+        try:
+            if self.block_timeout > 0:
+                self.queue.put(entry, timeout=self.block_timeout)
             else:
-                LogEntry.objects.create(
-                    level=record.levelname,
-                    message=self.format(record),
-                    logger_name=record.name,
-                )
-        except Exception as e:
-            # Optional: print/log to console to debug
-            print(f"[DatabaseLogHandler ERROR] {e}")
-            pass
\ No newline at end of file
+                self.queue.put_nowait(entry)
+        except queue.Full:
+            self._count("dropped")
+            return
+        self._count("enqueued")
+
+        if not self.background and self.queue.qsize() >= self.batch_size:
+            self.flush()
+
+    def _collect(self):
+        """Block until a batch is full or the flush interval has elapsed."""
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                entry = self.queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if entry is _STOP:
+                break
+            batch.append(entry)
+        return batch
+
+    def _drain(self):
+        batch = []
+        while True:
+            try:
+                entry = self.queue.get_nowait()
+            except queue.Empty:
+                return batch
+            if entry is not _STOP:
+                batch.append(entry)
+
+    def _run(self):
+        while not self._stop.is_set():
+            batch = self._collect()
+            if batch:
+                # The writer thread owns its own connection; drop it if it went stale
+                close_old_connections()
+                self.write_batch(batch)
+        connection.close()
+
+    def write_batch(self, batch):
+        by_model = defaultdict(list)
+        for entry in batch:
+            by_model[type(entry)].append(entry)
+        try:
+            for model, entries in by_model.items():
+                model.objects.bulk_create(entries, batch_size=self.batch_size)
+            self._count("written", len(batch))
+        except Exception:
+            self._count("failed", len(batch))
+            logger.exception("Could not write %d log records", len(batch))
+
+    def flush(self):
+        """Write everything queued so far from the calling thread."""
+        batch = self._drain()
+        for start in range(0, len(batch), self.batch_size):
+            self.write_batch(batch[start:start + self.batch_size])
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._stop.set()
+        if self._worker is not None and self._pid == os.getpid():
+            try:
+                self.queue.put_nowait(_STOP)
+            except queue.Full:
+                pass
+            self._worker.join(timeout=self.flush_interval + 5)
+        self.flush()
+        super().close()
@@ -1,47 +1,174 @@
+import contextvars
 import logging
-from django.utils.deprecation import MiddlewareMixin
+import random
+import re
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+
+from .services import RequestMetricsService
 
 audit_logger = logging.getLogger("audit")
 
-class AuditMiddleware(MiddlewareMixin):
+# [query count, seconds in SQL] of the request being instrumented. A context variable rather
+# than a per-request connection.execute_wrapper: under ASGI the ORM runs in worker threads with
+# their own connections, and asgiref copies the context into them.
+_query_stats = contextvars.ContextVar("query_stats", default=None)
+
+
+def count_queries(execute, sql, params, many, context):
+    """Execute wrapper installed on every DB connection (see signals.py); a no-op outside requests."""
+    stats = _query_stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats[0] += 1
+        stats[1] += time.perf_counter() - start
+
+
+def install_query_counter(connection):
+    if count_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(count_queries)
+
+DEFAULT_AUDIT_METHODS = ("POST", "PUT", "PATCH", "DELETE")
+
+DEFAULT_AUDIT_ROUTES = [
+    {"pattern": r"/api/v1/forms/"},
+    {"pattern": r"/api/v1/users/"},
+    {"pattern": r"/api/v1/submissions/"},
+    {"pattern": r"/api/v1/auth/"},
+]
+
+
+class AuditRouter:
     """
-    Audit middleware that only logs critical actions:
-    - POST (create)
-    - PUT / PATCH (update)
-    - DELETE (delete)
-    Skips safe requests like GET, HEAD, OPTIONS.
+    AUDIT_ROUTES compiled once per process into a single regex per HTTP method.
+
+    Each route is {"pattern": <regex matched at the start of the path>, "methods": [...],
+    "sample_rate": <0..1>}; routes are tried in order and the first match wins. A method no route
+    lists has no regex at all, so safe requests cost one dict lookup.
     """
 
-    CRITICAL_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
-
-    # Define which endpoints to audit (prefix match)
-    AUDITED_PATHS = [
-        "/api/v1/forms/",
-        "/api/v1/users/",
-        "/api/v1/submissions/",
-        "/api/v1/auth/",
-    ]
-
-    def process_response(self, request, response):
-        if (
-            request.method in self.CRITICAL_METHODS
-            and any(request.path.startswith(path) for path in self.AUDITED_PATHS)
-        ):
-            audit_logger.info(
-                f"{request.method} {request.path} -> {response.status_code}",
-                extra={
-                    "audit": {
-                        "user": request.user if request.user.is_authenticated else None,
-                        "method": request.method,
-                        "path": request.path,
-                        "status_code": response.status_code,
-                        "ip": self.get_client_ip(request),
-                    }
-                }
-            )
+    def __init__(self, routes, default_methods=DEFAULT_AUDIT_METHODS):
+        self.routes = [
+            {
+                "pattern": route["pattern"],
+                "methods": frozenset(m.upper() for m in route.get("methods", default_methods)),
+                "sample_rate": float(route.get("sample_rate", 1.0)),
+            }
+            for route in routes
+        ]
+        methods = {method for route in self.routes for method in route["methods"]}
+        self.by_method = {}
+        for method in methods:
+            indexes = [i for i, route in enumerate(self.routes) if method in route["methods"]]
+            regex = "|".join(f"(?P<r{i}>{self.routes[i]['pattern']})" for i in indexes)
+            self.by_method[method] = re.compile(regex)
+
+    @classmethod
+    def from_settings(cls):
+        return cls(
+            getattr(settings, "AUDIT_ROUTES", DEFAULT_AUDIT_ROUTES),
+            getattr(settings, "AUDIT_METHODS", DEFAULT_AUDIT_METHODS),
+        )
+
+    def match(self, method: str, path: str):
+        """The route auditing `method path`, or None."""
+        regex = self.by_method.get(method)
+        if regex is None:
+            return None
+        match = regex.match(path)
+        if match is None:
+            return None
+        return self.routes[int(match.lastgroup[1:])]
+
+
+class AuditMiddleware:
+    """
+    Logs the requests selected by AUDIT_ROUTES (by default every POST/PUT/PATCH/DELETE under
+    /api/v1/forms/, users/, submissions/ and auth/) with their duration and payload sizes.
+    Routes with a sample_rate below 1 log that fraction of their requests; each row records its
+    rate. Requests no route matches skip timing and logging entirely.
+    """
+
+    sync_capable = True
+    async_capable = True
 
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.router = AuditRouter.from_settings()
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def route(self, request):
+        """The matching route if this request is to be logged (sampling decided here)."""
+        if request.method not in self.router.by_method:
+            return None
+        route = self.router.match(request.method, request.path)
+        if route is None or (route["sample_rate"] < 1 and random.random() >= route["sample_rate"]):
+            return None
+        return route
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        route = self.route(request)
+        if route is None:
+            return self.get_response(request)
+        start = time.perf_counter()
+        response = self.get_response(request)
+        self.log(request, response, route, time.perf_counter() - start)
         return response
 
+    async def __acall__(self, request):
+        # Under ASGI, only audited writes take the thread hop (request.user and logging are sync)
+        route = self.route(request)
+        if route is None:
+            return await self.get_response(request)
+        start = time.perf_counter()
+        response = await self.get_response(request)
+        duration = time.perf_counter() - start
+        await sync_to_async(self.log, thread_sensitive=True)(request, response, route, duration)
+        return response
+
+    def log(self, request, response, route, duration):
+        audit_logger.info(
+            f"{request.method} {request.path} -> {response.status_code}",
+            extra={
+                "audit": {
+                    "user": request.user if request.user.is_authenticated else None,
+                    "method": request.method,
+                    "path": request.path,
+                    "status_code": response.status_code,
+                    "ip": self.get_client_ip(request),
+                    "duration_ms": round(duration * 1000, 3),
+                    "request_bytes": self.request_size(request),
+                    "response_bytes": self.response_size(response),
+                    "sample_rate": route["sample_rate"],
+                }
+            }
+        )
+
+    @staticmethod
+    def request_size(request):
+        try:
+            return int(request.META.get("CONTENT_LENGTH") or 0)
+        except ValueError:
+            return None
+
+    @staticmethod
+    def response_size(response):
+        if response.streaming:
+            # Streaming bodies (exports) are never buffered just to be measured
+            length = response.get("Content-Length")
+            return int(length) if length and length.isdigit() else None
+        return len(response.content)
+
     def get_client_ip(self, request):
         """
         Extract the client IP address from request headers.
@@ -62,4 +189,53 @@ class AuditMiddleware(MiddlewareMixin):
         if ip.startswith("[") and "]" in ip:
             ip = ip.split("]")[0].lstrip("[")
 
-        return ip
\ No newline at end of file
+        return ip
+
+
+class InstrumentationMiddleware:
+    """
+    Records latency, SQL statement count, SQL time and response size of every request under its
+    resolved URL name (RequestMetricsService, exposed at /dashboard/metrics/prometheus/).
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        stats = [0, 0.0]
+        token = _query_stats.set(stats)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _query_stats.reset(token)
+        self.record(request, response, time.perf_counter() - start, stats)
+        return response
+
+    async def __acall__(self, request):
+        stats = [0, 0.0]
+        token = _query_stats.set(stats)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _query_stats.reset(token)
+        self.record(request, response, time.perf_counter() - start, stats)
+        return response
+
+    @staticmethod
+    def record(request, response, duration, stats):
+        match = getattr(request, "resolver_match", None)
+        route = match.view_name if match is not None else "unresolved"
+        RequestMetricsService.record(
+            route, request.method, response.status_code, duration, stats[0], stats[1],
+            AuditMiddleware.response_size(response),
+        )
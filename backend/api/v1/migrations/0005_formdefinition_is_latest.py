@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-17 12:32
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def mark_latest_versions(apps, schema_editor):
+    FormDefinition = apps.get_model("v1", "FormDefinition")
+    latest_ids = FormDefinition.objects.filter(
+        name=OuterRef("name")
+    ).order_by("-version").values("id")[:1]
+    FormDefinition.objects.exclude(id=Subquery(latest_ids)).update(is_latest=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('v1', '0004_formfield_unique_form_field_name_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='formdefinition',
+            unique_together=set(),
+        ),
+        migrations.AddField(
+            model_name='formdefinition',
+            name='is_latest',
+            field=models.BooleanField(default=True),
+        ),
+        migrations.RunPython(mark_latest_versions, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='formdefinition',
+            index=models.Index(condition=models.Q(('is_latest', True)), fields=['-created_at'], name='form_latest_created_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='formdefinition',
+            constraint=models.UniqueConstraint(fields=('name', 'version'), name='unique_form_name_version'),
+        ),
+        migrations.AddConstraint(
+            model_name='formdefinition',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_latest', True)), fields=('name',), name='unique_latest_form_version'),
+        ),
+    ]
@@ -0,0 +1,73 @@
+# Generated by Django 5.2.18 on 2026-10-17 12:45
+
+from datetime import datetime, timezone
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncDay, TruncHour
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def backfill_rollups(apps, schema_editor):
+    """Initial rollups from the source tables (a frozen copy of MetricRollupService.rebuild)."""
+    Rollup = apps.get_model("v1", "MetricRollup")
+    sources = [
+        ("users", apps.get_model("auth", "User").objects.all(), "date_joined", {}),
+        ("forms", apps.get_model("v1", "FormDefinition").objects.all(), "created_at", {"is_deleted": False}),
+        ("submissions", apps.get_model("v1", "FormSubmission").objects.all(), "submitted_at", {}),
+    ]
+
+    rows = []
+    for metric, queryset, field, active in sources:
+        rows.append(Rollup(
+            metric=metric, granularity="total", bucket=EPOCH, count=queryset.filter(**active).count(),
+        ))
+        for granularity, trunc in (("hour", TruncHour), ("day", TruncDay)):
+            buckets = (
+                queryset.annotate(bucket=trunc(field, tzinfo=timezone.utc))
+                .values("bucket").annotate(n=Count("id")).order_by()
+            )
+            rows.extend(
+                Rollup(metric=metric, granularity=granularity, bucket=b["bucket"], count=b["n"])
+                for b in buckets
+            )
+        if metric == "submissions":
+            buckets = (
+                queryset.annotate(bucket=TruncDay(field, tzinfo=timezone.utc))
+                .values("form_id", "bucket").annotate(n=Count("id")).order_by()
+            )
+            rows.extend(
+                Rollup(metric=metric, granularity="day", bucket=b["bucket"], form_id=b["form_id"], count=b["n"])
+                for b in buckets
+            )
+    Rollup.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('v1', '0006_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MetricRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('metric', models.CharField(choices=[('users', 'Users'), ('forms', 'Forms'), ('submissions', 'Submissions')], max_length=20)),
+                ('granularity', models.CharField(choices=[('total', 'Total'), ('day', 'Day'), ('hour', 'Hour')], max_length=10)),
+                ('bucket', models.DateTimeField()),
+                ('shard', models.PositiveSmallIntegerField(default=0)),
+                ('count', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('form', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='v1.formdefinition')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['granularity', 'bucket'], name='metric_rollup_bucket_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('form__isnull', True)), fields=('metric', 'granularity', 'bucket', 'shard'), name='unique_metric_rollup'), models.UniqueConstraint(condition=models.Q(('form__isnull', False)), fields=('metric', 'granularity', 'bucket', 'form', 'shard'), name='unique_form_metric_rollup')],
+            },
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
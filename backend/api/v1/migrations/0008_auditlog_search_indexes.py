@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-17 12:50
+
+from django.conf import settings
+from django.db import migrations, models
+
+# Django compiles icontains on Postgres to UPPER(col) LIKE UPPER('%...%'),
+# so the trigram indexes are built over UPPER(col) to serve those lookups.
+TRIGRAM_INDEXES = {
+    "auditlog_path_trgm_idx": "path",
+    "auditlog_message_trgm_idx": "message",
+}
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for name, column in TRIGRAM_INDEXES.items():
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {name} ON v1_auditlog USING gin (UPPER({column}) gin_trgm_ops)"
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name in TRIGRAM_INDEXES:
+        schema_editor.execute(f"DROP INDEX IF EXISTS {name}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('v1', '0007_metricrollup'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['status_code', '-created_at'], name='auditlog_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['method', '-created_at'], name='auditlog_method_idx'),
+        ),
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
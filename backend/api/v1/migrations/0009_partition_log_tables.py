@@ -0,0 +1,130 @@
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.db import migrations
+
+# Converts v1_auditlog and v1_logentry into tables range-partitioned by month on created_at
+# (PostgreSQL only). Existing rows are copied into the new monthly partitions, so on a large
+# table run this migration in a maintenance window.
+#
+# A partitioned table's primary key must include the partition key, so the key becomes
+# (id, created_at); ids still come from the table's sequence and stay unique, and the ORM keeps
+# treating `id` as the primary key. Secondary indexes and foreign keys are recreated on the
+# parent table with their original names, so later migrations can still alter them.
+#
+# The helpers below are frozen copies of what LogPartitionService does today, so this migration
+# keeps its behaviour when the service changes.
+
+TABLES = ("v1_auditlog", "v1_logentry")
+
+
+def add_months(month, months):
+    index = month.year * 12 + month.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1, tzinfo=timezone.utc)
+
+
+def month_start(moment):
+    moment = moment.astimezone(timezone.utc)
+    return datetime(moment.year, moment.month, 1, tzinfo=timezone.utc)
+
+
+def is_partitioned(schema_editor, table):
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid "
+            "WHERE c.relname = %s AND c.relnamespace = current_schema()::regnamespace",
+            [table],
+        )
+        return cursor.fetchone() is not None
+
+
+def create_monthly_partitions(schema_editor, table, since):
+    """One partition per month from `since` (default: now) through LOG_PARTITION_PREMAKE_MONTHS ahead."""
+    now = datetime.now(timezone.utc)
+    month = month_start(min(since or now, now))
+    last = add_months(month_start(now), getattr(settings, "LOG_PARTITION_PREMAKE_MONTHS", 3))
+    while month <= last:
+        end = add_months(month, 1)
+        schema_editor.execute(
+            f"CREATE TABLE {table}_p{month:%Y%m} PARTITION OF {table} "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{end.isoformat()}')"
+        )
+        month = end
+
+
+def convert_to_partitioned(schema_editor, table):
+    if is_partitioned(schema_editor, table):
+        return
+    legacy = f"{table}_unpartitioned"
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT indexdef FROM pg_indexes WHERE schemaname = current_schema() AND tablename = %s "
+            "AND indexname NOT IN (SELECT conname FROM pg_constraint WHERE conrelid = %s::regclass AND contype = 'p')",
+            [table, table],
+        )
+        index_definitions = [definition for (definition,) in cursor.fetchall()]
+        cursor.execute(
+            "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint WHERE conrelid = %s::regclass AND contype = 'f'",
+            [table],
+        )
+        foreign_keys = cursor.fetchall()
+        cursor.execute(
+            "SELECT pg_get_serial_sequence(%s, 'id'), attidentity <> '' FROM pg_attribute "
+            "WHERE attrelid = %s::regclass AND attname = 'id'",
+            [table, table],
+        )
+        sequence, is_identity = cursor.fetchone()
+
+    schema_editor.execute(f"ALTER TABLE {table} RENAME TO {legacy}")
+    # Identity columns are not allowed on partitioned tables (before PostgreSQL 17): move the
+    # id counter to a plain sequence owned by the new table.
+    if is_identity:
+        schema_editor.execute(f"ALTER TABLE {legacy} ALTER COLUMN id DROP IDENTITY")
+        schema_editor.execute(f"CREATE SEQUENCE {sequence}")
+    else:
+        schema_editor.execute(f"ALTER TABLE {legacy} ALTER COLUMN id DROP DEFAULT")
+        schema_editor.execute(f"ALTER SEQUENCE {sequence} OWNED BY NONE")
+
+    schema_editor.execute(
+        f"CREATE TABLE {table} (LIKE {legacy} INCLUDING DEFAULTS INCLUDING STORAGE) PARTITION BY RANGE (created_at)"
+    )
+    schema_editor.execute(f"ALTER TABLE {table} ALTER COLUMN id SET DEFAULT nextval('{sequence}')")
+    schema_editor.execute(f"ALTER SEQUENCE {sequence} OWNED BY {table}.id")
+    schema_editor.execute(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT")
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f"SELECT min(created_at), max(id) FROM {legacy}")
+        oldest, max_id = cursor.fetchone()
+    create_monthly_partitions(schema_editor, table, since=oldest)
+
+    schema_editor.execute(f"INSERT INTO {table} SELECT * FROM {legacy}")
+    schema_editor.execute(f"DROP TABLE {legacy}")
+    if max_id is not None:
+        schema_editor.execute(f"SELECT setval('{sequence}', {int(max_id)})")
+
+    schema_editor.execute(f"ALTER TABLE {table} ADD CONSTRAINT {table}_pkey PRIMARY KEY (id, created_at)")
+    for definition in index_definitions:
+        schema_editor.execute(definition)
+    for name, definition in foreign_keys:
+        schema_editor.execute(f"ALTER TABLE {table} ADD CONSTRAINT {name} {definition}")
+
+
+def partition_log_tables(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for table in TABLES:
+        convert_to_partitioned(schema_editor, table)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('v1', '0008_auditlog_search_indexes'),
+    ]
+
+    operations = [
+        # Not reversed: the partitioned tables keep the same columns and index names, so the
+        # previous migrations' schema operations keep working against them.
+        migrations.RunPython(partition_log_tables, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,113 @@
+# Generated by Django 5.2.18 on 2026-10-17 13:28
+
+import hashlib
+import json
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+CONTENT_KEYS = ("name", "label", "field_type", "required", "options")
+
+
+def field_digest(content):
+    # Same canonical form as FieldStoreService.digest at the time of this migration
+    return hashlib.sha256(json.dumps(content, sort_keys=True).encode()).hexdigest()
+
+
+def build_layouts(apps, schema_editor):
+    """
+    Deduplicate every FormField row into FieldDefinition, give each form its layout and one
+    FormFieldReference per field it uses.
+    """
+    FormField = apps.get_model("v1", "FormField")
+    FieldDefinition = apps.get_model("v1", "FieldDefinition")
+    FormDefinition = apps.get_model("v1", "FormDefinition")
+    FormFieldReference = apps.get_model("v1", "FormFieldReference")
+
+    contents = {}
+    digests = {}
+    rows = FormField.objects.order_by("form_id", "order", "id").values("form_id", "order", *CONTENT_KEYS)
+    for row in rows.iterator(chunk_size=2000):
+        content = {key: row[key] for key in CONTENT_KEYS}
+        digest = field_digest(content)
+        contents.setdefault(digest, content)
+        digests.setdefault(row["form_id"], []).append((digest, row["order"]))
+
+    FieldDefinition.objects.bulk_create(
+        [FieldDefinition(digest=digest, **content) for digest, content in contents.items()], batch_size=1000
+    )
+    ids = dict(FieldDefinition.objects.values_list("digest", "id"))
+    layouts = {form_id: [[ids[digest], order] for digest, order in rows] for form_id, rows in digests.items()}
+
+    forms = []
+    for form in FormDefinition.objects.filter(id__in=layouts).only("id").iterator(chunk_size=500):
+        form.field_layout = layouts[form.id]
+        forms.append(form)
+    FormDefinition.objects.bulk_update(forms, ["field_layout"], batch_size=500)
+    FormFieldReference.objects.bulk_create(
+        [
+            FormFieldReference(form_id=form_id, field_id=field_id)
+            for form_id, layout in layouts.items()
+            for field_id in sorted({field_id for field_id, _ in layout})
+        ],
+        batch_size=1000,
+    )
+
+
+def restore_form_fields(apps, schema_editor):
+    FormField = apps.get_model("v1", "FormField")
+    FieldDefinition = apps.get_model("v1", "FieldDefinition")
+    FormDefinition = apps.get_model("v1", "FormDefinition")
+
+    definitions = FieldDefinition.objects.in_bulk()
+    fields = []
+    for form in FormDefinition.objects.only("id", "field_layout").iterator(chunk_size=500):
+        for field_id, order in form.field_layout:
+            definition = definitions[field_id]
+            fields.append(FormField(
+                form_id=form.id, order=order, **{key: getattr(definition, key) for key in CONTENT_KEYS}
+            ))
+    FormField.objects.bulk_create(fields, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('v1', '0009_partition_log_tables'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FieldDefinition',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('digest', models.CharField(max_length=64, unique=True)),
+                ('name', models.CharField(max_length=255)),
+                ('label', models.CharField(blank=True, max_length=255)),
+                ('field_type', models.CharField(choices=[('button', 'Button'), ('checkbox', 'Checkbox'), ('color', 'Color'), ('date', 'Date'), ('datetime-local', 'Datetime Local'), ('email', 'Email'), ('file', 'File'), ('hidden', 'Hidden'), ('image', 'Image'), ('month', 'Month'), ('number', 'Number'), ('password', 'Password'), ('radio', 'Radio'), ('range', 'Range'), ('reset', 'Reset'), ('search', 'Search'), ('submit', 'Submit'), ('tel', 'Telephone'), ('text', 'Text'), ('textarea', 'Textarea'), ('time', 'Time'), ('url', 'URL'), ('week', 'Week'), ('select', 'Select')], max_length=50)),
+                ('required', models.BooleanField(default=False)),
+                ('options', models.JSONField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='formdefinition',
+            name='field_layout',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.CreateModel(
+            name='FormFieldReference',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('field', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='form_references', to='v1.fielddefinition')),
+                ('form', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='field_references', to='v1.formdefinition')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('form', 'field'), name='unique_form_field_reference')],
+            },
+        ),
+        migrations.RunPython(build_layouts, restore_form_fields),
+        migrations.DeleteModel(
+            name='FormField',
+        ),
+    ]
@@ -0,0 +1,48 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+INDEX_NAME = "formsubmission_data_gin"
+
+
+def create_data_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    # jsonb_path_ops: smaller than the default jsonb_ops and serves the @> containment used by
+    # SubmissionQueryService for data.<field>=<value> filters
+    schema_editor.execute(
+        f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {INDEX_NAME} ON v1_formsubmission USING gin (data jsonb_path_ops)"
+    )
+
+
+def drop_data_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {INDEX_NAME}")
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('v1', '0010_field_definition_store'),
+    ]
+
+    operations = [
+        # The index first: it is idempotent, so a rerun after a failed build starts over cleanly
+        migrations.RunPython(create_data_index, drop_data_index),
+        migrations.CreateModel(
+            name='SubmissionFilterUsage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('field_name', models.CharField(max_length=255)),
+                ('uses', models.IntegerField(default=0)),
+                ('last_used_at', models.DateTimeField(auto_now=True)),
+                ('form', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='v1.formdefinition')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['-uses'], name='filter_usage_uses_idx')],
+                'constraints': [models.UniqueConstraint(fields=('form', 'field_name'), name='unique_filter_usage_per_field')],
+            },
+        ),
+    ]
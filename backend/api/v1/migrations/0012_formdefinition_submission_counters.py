@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-17 13:47
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+
+def backfill_counters(apps, schema_editor):
+    """Counters of every version from one grouped query over the submissions."""
+    FormDefinition = apps.get_model("v1", "FormDefinition")
+    FormSubmission = apps.get_model("v1", "FormSubmission")
+
+    actual = {
+        row["form_id"]: (row["count"], row["last"])
+        for row in FormSubmission.objects.values("form_id").annotate(count=Count("id"), last=Max("submitted_at")).order_by()
+    }
+    forms = list(FormDefinition.objects.filter(id__in=actual).only("id"))
+    for form in forms:
+        form.submission_count, form.last_submitted_at = actual[form.id]
+    FormDefinition.objects.bulk_update(forms, ["submission_count", "last_submitted_at"], batch_size=1000)
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('v1', '0011_formsubmission_data_gin'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='formdefinition',
+            name='last_submitted_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='formdefinition',
+            name='submission_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
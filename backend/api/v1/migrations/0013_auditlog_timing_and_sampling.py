@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-17 13:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('v1', '0012_formdefinition_submission_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='auditlog',
+            name='duration_ms',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='auditlog',
+            name='request_bytes',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='auditlog',
+            name='response_bytes',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='auditlog',
+            name='sample_rate',
+            field=models.FloatField(default=1.0),
+        ),
+    ]
@@ -1,11 +1,18 @@
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
 from rest_framework import status
 from rest_framework.response import Response
 
+from .permissions import get_request_roles
+
 class BulkCreateMixin:
     """
     A mixin that adds support for POSTing either a single object or
     a list of objects to a DRF ViewSet. It also injects the current
     user into a configurable field (e.g. 'created_by', 'submitted_by').
+    Lists are saved by the serializer's list_serializer_class, which can write the
+    whole batch at once (see FormDefinitionListSerializer).
     """
 
     user_field = "created_by"
@@ -17,11 +24,97 @@ class BulkCreateMixin:
         serializer = self.get_serializer(data=data, many=many)
         serializer.is_valid(raise_exception=True)
 
-        if many:
-            # Pass user_field for each object at save-time
-            instances = serializer.save(**{self.user_field: request.user})
-        else:
-            instances = serializer.save(**{self.user_field: request.user})
+        # Pass user_field for each object at save-time
+        instances = serializer.save(**{self.user_field: request.user})
 
         output_serializer = self.get_serializer(instances, many=many)
-        return Response(output_serializer.data, status=status.HTTP_201_CREATED)
\ No newline at end of file
+        return Response(output_serializer.data, status=status.HTTP_201_CREATED)
+
+def not_modified_response(request, etag, last_modified=None):
+    """HttpResponseNotModified if the request's If-None-Match / If-Modified-Since still match, else None."""
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    if response is not None:
+        set_validators(response, etag, last_modified)
+    return response
+
+
+def set_validators(response, etag, last_modified=None):
+    response["ETag"] = etag
+    if last_modified:
+        response["Last-Modified"] = http_date(last_modified.timestamp())
+    # Bodies depend on the caller's roles
+    patch_vary_headers(response, ["Authorization"])
+    return response
+
+
+class ConditionalGetMixin:
+    """
+    Answer list/retrieve with 304 Not Modified while the client's ETag / Last-Modified still match.
+
+    Views implement get_validators(request) -> (etag, last_modified or None) from cheap sources
+    (change counters, index-only aggregates), so a 304 costs no queryset evaluation and no
+    serialization.
+    """
+
+    def get_validators(self, request):
+        """(etag, last_modified or None); None (the default) serves a plain GET without validators."""
+        return None
+
+    def conditional_response(self, request, build):
+        validators = self.get_validators(request)
+        if validators is None:
+            return build()
+        etag, last_modified = validators
+        response = not_modified_response(request, etag, last_modified)
+        if response is not None:
+            return response
+        response = build()
+        if response.status_code == status.HTTP_200_OK:
+            set_validators(response, etag, last_modified)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            request, lambda: super(ConditionalGetMixin, self).list(request, *args, **kwargs)
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(
+            request, lambda: super(ConditionalGetMixin, self).retrieve(request, *args, **kwargs)
+        )
+
+
+class CachedReadMixin(ConditionalGetMixin):
+    """
+    ConditionalGetMixin that also serves list/retrieve bodies from a response cache.
+
+    `response_cache` is a service exposing scope(roles),
+    response_key(request, action, scope, pk) -> (key, etag) and timeout() (0 skips the body
+    cache), and handling its own invalidation (see FormCacheService). Safe methods pass has_object_permission for every role that passes
+    has_permission, so a cached detail body can be returned without loading the object.
+    """
+
+    response_cache = None
+
+    def get_validators(self, request):
+        scope = self.response_cache.scope(get_request_roles(request))
+        pk = self.kwargs.get(self.lookup_url_kwarg or self.lookup_field)
+        self.response_cache_key, etag = self.response_cache.response_key(request, self.action, scope, pk)
+        return etag, None
+
+    def conditional_response(self, request, build):
+        timeout = self.response_cache.timeout()
+        if not timeout:
+            return super().conditional_response(request, build)
+
+        def cached_build():
+            data = cache.get(self.response_cache_key)
+            if data is not None:
+                return Response(data)
+            response = build()
+            if response.status_code == status.HTTP_200_OK:
+                cache.set(self.response_cache_key, response.data, timeout)
+            return response
+
+        return super().conditional_response(request, cached_build)
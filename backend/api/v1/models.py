@@ -1,6 +1,9 @@
+import copy
+
 from django.db import models
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
+from django.utils import timezone
 
 class AuditLog(models.Model):
     user = models.ForeignKey(User, null=True, on_delete=models.SET_NULL)
@@ -9,16 +12,34 @@ class AuditLog(models.Model):
     status_code = models.IntegerField()
     message = models.TextField(blank=True)
     ip_address = models.GenericIPAddressField(null=True, blank=True)
-    created_at = models.DateTimeField(auto_now_add=True)
-    
+    # Not auto_now_add: the log handlers set it from the record's time, which bulk_create must keep
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
+    duration_ms = models.FloatField(null=True, blank=True)
+    request_bytes = models.IntegerField(null=True, blank=True)
+    response_bytes = models.IntegerField(null=True, blank=True)
+    # Fraction of matching requests that are logged (AUDIT_ROUTES); 1 row stands for 1/sample_rate
+    sample_rate = models.FloatField(default=1.0)
+
+    class Meta:
+        indexes = [
+            # Keyset pagination on (created_at, id)
+            models.Index(fields=["-created_at", "-id"], name="auditlog_keyset_idx"),
+            # Exact-match search filters (see AuditLogService); path/message use trigram indexes
+            models.Index(fields=["status_code", "-created_at"], name="auditlog_status_idx"),
+            models.Index(fields=["method", "-created_at"], name="auditlog_method_idx"),
+        ]
+
 class LogEntry(models.Model):
     level = models.CharField(max_length=50)
     message = models.TextField()
     logger_name = models.CharField(max_length=255)
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(default=timezone.now, editable=False)   # see AuditLog.created_at
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["-created_at", "-id"], name="logentry_keyset_idx"),
+        ]
 
     def __str__(self):
         return f"[{self.level}] {self.logger_name}: {self.message[:50]}"
@@ -31,6 +52,14 @@ class FormDefinition(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     is_deleted = models.BooleanField(default=False)
     version = models.IntegerField(default=1)
+    # Marks the highest version of each lineage (same name); maintained by FormService
+    is_latest = models.BooleanField(default=True)
+    # Ordered [FieldDefinition id, order] pairs; versions are immutable, so this is written once
+    field_layout = models.JSONField(default=list, blank=True)
+    # Denormalized submission counters of this version, maintained by SubmissionCounterService
+    # (reconcile with `manage.py reconcile_submission_counters`); lineage totals are summed on read
+    submission_count = models.IntegerField(default=0)
+    last_submitted_at = models.DateTimeField(null=True, blank=True)
 
     class Meta:
         ordering = ["-created_at"]
@@ -38,14 +67,68 @@ class FormDefinition(models.Model):
             models.UniqueConstraint(
                 fields=["name", "version"],
                 name="unique_form_name_version"
-            )
+            ),
+            models.UniqueConstraint(
+                fields=["name"],
+                condition=models.Q(is_latest=True),
+                name="unique_latest_form_version"
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["-created_at"],
+                condition=models.Q(is_latest=True),
+                name="form_latest_created_idx"
+            ),
         ]
 
     def __str__(self):
         return f"{self.name} v{self.version} ({'deleted' if self.is_deleted else 'active'})"
 
+    @property
+    def fields(self) -> list:
+        """
+        This version's FieldDefinitions in layout order, each carrying its `order`. Loaded with one
+        query on first access, unless FieldDefinition.objects.attach() loaded a batch of forms.
+        """
+        if "_field_entries" not in self.__dict__:
+            FieldDefinition.objects.attach([self])
+        return self._field_entries
+
+    def set_field_entries(self, definitions: dict):
+        entries = []
+        for field_id, order in self.field_layout:
+            # Copies: one definition can appear in several forms with different orders
+            entry = copy.copy(definitions[field_id])
+            entry.order = order
+            entries.append(entry)
+        self._field_entries = entries
+
+
+class FieldDefinitionManager(models.Manager):
+    def attach(self, forms):
+        """Load the fields of several form versions with one query and cache them on each form."""
+        forms = [form for form in forms if "_field_entries" not in form.__dict__]
+        ids = {field_id for form in forms for field_id, _ in form.field_layout}
+        definitions = self.in_bulk(ids) if ids else {}
+        for form in forms:
+            form.set_field_entries(definitions)
+
+    async def aattach(self, forms):
+        forms = [form for form in forms if "_field_entries" not in form.__dict__]
+        ids = {field_id for form in forms for field_id, _ in form.field_layout}
+        definitions = await self.ain_bulk(ids) if ids else {}
+        for form in forms:
+            form.set_field_entries(definitions)
+
+
+class FieldDefinition(models.Model):
+    """
+    Content-addressed field definition, shared by every form version that declares an identical
+    field (same name, label, type, required flag and options). Rows are never updated: editing a
+    field creates (or reuses) another row, so the unchanged fields of a new version cost nothing.
+    """
 
-class FormField(models.Model):
     FIELD_TYPES = [
         ('button', 'Button'),
         ('checkbox', 'Checkbox'),
@@ -73,24 +156,15 @@ class FormField(models.Model):
         ('select', 'Select'),
     ]
 
-    form = models.ForeignKey(FormDefinition, related_name="fields", on_delete=models.CASCADE)
+    digest = models.CharField(max_length=64, unique=True)  # sha256 of the content, see FieldStoreService
     name = models.CharField(max_length=255)
     label = models.CharField(max_length=255, blank=True)
     field_type = models.CharField(max_length=50, choices=FIELD_TYPES)
     required = models.BooleanField(default=False)
     options = models.JSONField(blank=True, null=True)  # For select dropdowns
-    order = models.PositiveIntegerField(default=0)
-    created_at = models.DateTimeField(auto_now_add=True)  # optional audit
-    updated_at = models.DateTimeField(auto_now=True)
+    created_at = models.DateTimeField(auto_now_add=True)
 
-    class Meta:
-        ordering = ["order"]
-        constraints = [
-            models.UniqueConstraint(
-                fields=["form", "name"],
-                name="unique_form_field_name"
-            )
-        ]
+    objects = FieldDefinitionManager()
 
     def clean(self):
         """Ensure select fields have options."""
@@ -101,6 +175,26 @@ class FormField(models.Model):
         return f"{self.label or self.name} ({self.field_type})"
 
 
+class FormFieldReference(models.Model):
+    """
+    One row per (form version, field definition) in its field_layout. The layout itself is a JSON
+    list of ids, which the database cannot check; these foreign keys make deleting a definition
+    that a form still uses fail (PROTECT) instead of leaving the layout pointing at nothing.
+    Written by FieldStoreService.link when a version is created.
+    """
+
+    form = models.ForeignKey(FormDefinition, related_name="field_references", on_delete=models.CASCADE)
+    field = models.ForeignKey(FieldDefinition, related_name="form_references", on_delete=models.PROTECT)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["form", "field"], name="unique_form_field_reference"),
+        ]
+
+    def __str__(self):
+        return f"form {self.form_id} -> field {self.field_id}"
+
+
 class FormSubmission(models.Model):
     form = models.ForeignKey(FormDefinition, related_name="submissions", on_delete=models.CASCADE)
     submitted_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
@@ -116,6 +210,11 @@ class FormSubmission(models.Model):
                 name="unique_submission_per_user_per_version"
             )
         ]
+        indexes = [
+            # Keyset pagination on (submitted_at, id), globally and per form
+            models.Index(fields=["-submitted_at", "-id"], name="submission_keyset_idx"),
+            models.Index(fields=["form", "-submitted_at", "-id"], name="submission_form_keyset_idx"),
+        ]
 
     def save(self, *args, **kwargs):
         # Auto-fill form_version if not set
@@ -125,3 +224,78 @@ class FormSubmission(models.Model):
 
     def __str__(self):
         return f"Submission for {self.form.name} v{self.form_version} by {self.submitted_by or 'Anonymous'}"
+
+
+class MetricRollup(models.Model):
+    """
+    Pre-aggregated dashboard counters.
+
+    - granularity "total": current number of rows (bucket is the epoch).
+    - granularity "hour" / "day": rows created in the bucket starting at `bucket` (UTC).
+    Rows with `form` set hold per-form submission counts. Each counter is split over up to
+    METRIC_ROLLUP_SHARDS rows (`shard`, picked per writing thread) so concurrent writers do not queue
+    on one row lock;
+    its value is the sum of its shards.
+    """
+
+    METRICS = [
+        ("users", "Users"),
+        ("forms", "Forms"),
+        ("submissions", "Submissions"),
+    ]
+    GRANULARITIES = [
+        ("total", "Total"),
+        ("day", "Day"),
+        ("hour", "Hour"),
+    ]
+
+    metric = models.CharField(max_length=20, choices=METRICS)
+    granularity = models.CharField(max_length=10, choices=GRANULARITIES)
+    bucket = models.DateTimeField()
+    form = models.ForeignKey(FormDefinition, null=True, blank=True, related_name="+", on_delete=models.CASCADE)
+    shard = models.PositiveSmallIntegerField(default=0)
+    count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["metric", "granularity", "bucket", "shard"],
+                condition=models.Q(form__isnull=True),
+                name="unique_metric_rollup"
+            ),
+            models.UniqueConstraint(
+                fields=["metric", "granularity", "bucket", "form", "shard"],
+                condition=models.Q(form__isnull=False),
+                name="unique_form_metric_rollup"
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["granularity", "bucket"], name="metric_rollup_bucket_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.metric}/{self.granularity} {self.bucket:%Y-%m-%d %H:%M}: {self.count}"
+
+
+class SubmissionFilterUsage(models.Model):
+    """
+    How often each form field was used in a data.<field> filter on the submissions API; drives
+    `submission_data_index --hot`. Shared by every worker, unlike a per-process cache.
+    """
+
+    form = models.ForeignKey(FormDefinition, related_name="+", on_delete=models.CASCADE)
+    field_name = models.CharField(max_length=255)
+    uses = models.IntegerField(default=0)
+    last_used_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["form", "field_name"], name="unique_filter_usage_per_field"),
+        ]
+        indexes = [
+            models.Index(fields=["-uses"], name="filter_usage_uses_idx"),
+        ]
+
+    def __str__(self):
+        return f"form {self.form_id} {self.field_name}: {self.uses}"
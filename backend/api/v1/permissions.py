@@ -3,6 +3,15 @@ from rest_framework.permissions import BasePermission, SAFE_METHODS
 
 from rest_framework.permissions import BasePermission, SAFE_METHODS
 
+from .authentication import MetricsScrapeTokenAuthentication
+from .services import RoleService
+
+
+def get_request_roles(request):
+    """Role set for the request user, resolved once per request (see RoleService.get_roles)."""
+    return RoleService.get_roles(request.user, getattr(request, "auth", None))
+
+
 class RoleBasedFormPermission(BasePermission):
     """
     Permissions for managing form definitions (schemas).
@@ -16,14 +25,16 @@ class RoleBasedFormPermission(BasePermission):
         if not request.user or not request.user.is_authenticated:
             return False
 
-        if request.user.groups.filter(name="Admin").exists():
+        roles = get_request_roles(request)
+
+        if "Admin" in roles:
             return True
 
-        if request.user.groups.filter(name="Editor").exists():
+        if "Editor" in roles:
             # Editors: all except DELETE (object-level)
             return True
 
-        if request.user.groups.filter(name="Viewer").exists():
+        if "Viewer" in roles:
             # Viewers can only read
             return request.method in SAFE_METHODS
 
@@ -31,18 +42,19 @@ class RoleBasedFormPermission(BasePermission):
 
     def has_object_permission(self, request, view, obj):
         user = request.user
+        roles = get_request_roles(request)
 
-        if user.groups.filter(name="Admin").exists():
+        if "Admin" in roles:
             return True
 
-        if user.groups.filter(name="Editor").exists():
+        if "Editor" in roles:
             if request.method == "DELETE":
                 # Solo puede eliminar sus propios formularios
                 return obj.created_by_id == user.id
             # Puede hacer cualquier otra acción sobre cualquier formulario
             return True
 
-        if user.groups.filter(name="Viewer").exists():
+        if "Viewer" in roles:
             return request.method in SAFE_METHODS
 
         return False
@@ -62,29 +74,32 @@ class RoleBasedSubmissionPermission(BasePermission):
         if not request.user or not request.user.is_authenticated:
             return False
 
-        if request.user.groups.filter(name="Admin").exists():
+        roles = get_request_roles(request)
+
+        if "Admin" in roles:
             return True
 
-        if request.user.groups.filter(name="Editor").exists():
+        if "Editor" in roles:
             return request.method in SAFE_METHODS or request.method == "POST"
 
-        if request.user.groups.filter(name="Viewer").exists():
+        if "Viewer" in roles:
             return request.method in SAFE_METHODS or request.method == "POST"
 
         return False
 
     def has_object_permission(self, request, view, obj):
         user = request.user
+        roles = get_request_roles(request)
 
-        if user.groups.filter(name="Admin").exists():
+        if "Admin" in roles:
             return True
 
-        if user.groups.filter(name="Editor").exists():
+        if "Editor" in roles:
             if request.method in SAFE_METHODS:
                 return True
-            return obj.submitted_by == user
+            return obj.submitted_by_id == user.id
 
-        if user.groups.filter(name="Viewer").exists():
+        if "Viewer" in roles:
             return request.method in SAFE_METHODS
 
         return False
@@ -104,8 +119,15 @@ class RoleBasedUserPermission(BasePermission):
             return False
 
         # Only Admins can access user endpoints at all
-        return request.user.groups.filter(name="Admin").exists()
+        return "Admin" in get_request_roles(request)
 
     def has_object_permission(self, request, view, obj):
         # Only Admins can manipulate user objects
-        return request.user.groups.filter(name="Admin").exists()
+        return "Admin" in get_request_roles(request)
+
+
+class HasMetricsScrapeToken(BasePermission):
+    """Requests authenticated by MetricsScrapeTokenAuthentication (read-only)."""
+
+    def has_permission(self, request, view):
+        return request.method in SAFE_METHODS and request.auth == MetricsScrapeTokenAuthentication.SCRAPE_AUTH
@@ -6,8 +6,9 @@ from django.contrib.auth.models import User, update_last_login
 from rest_framework.validators import UniqueValidator
 from django.contrib.auth.password_validation import validate_password
 # Models
-from .models import FormDefinition, FormField, FormSubmission, LogEntry, AuditLog
-from .services import RoleService, FormService, FormValidator
+from .models import FieldDefinition, FormDefinition, FormSubmission, LogEntry, AuditLog
+from .authentication import TOKEN_VERSION_CLAIM
+from .services import RoleService, FormService, FormValidator, FormSchemaService, SubmissionCounterService
 # Auth Serializer
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 
@@ -34,7 +35,10 @@ class AuditLogSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = AuditLog
-        fields = ["id", "user", "method", "path", "status_code", "message", "ip_address", "created_at"]
+        fields = [
+            "id", "user", "method", "path", "status_code", "message", "ip_address", "created_at",
+            "duration_ms", "request_bytes", "response_bytes", "sample_rate",
+        ]
 
         def get_user(self, obj):
             return obj.user.username if obj.user else "Anonymous"
@@ -216,6 +220,10 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
         # Custom claims
         token["username"] = user.username
         token["roles"] = list(user.groups.values_list("name", flat=True))
+        token["is_staff"] = user.is_staff
+        token["is_superuser"] = user.is_superuser
+        # Checked by StatelessJWTAuthentication to revoke tokens after role/password changes
+        token[TOKEN_VERSION_CLAIM] = RoleService.token_version(user)
         token["last_login"] = str(user.last_login) if user.last_login else None
 
         return token
@@ -232,10 +240,29 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
 
 class FormFieldSerializer(serializers.ModelSerializer):
     """Basic serializer for fields."""
+    # Position in the form version's layout (not part of the shared FieldDefinition row)
+    order = serializers.IntegerField(min_value=0, default=0)
+
     class Meta:
-        model = FormField
+        model = FieldDefinition
         fields = ["id", "name", "label", "field_type", "required", "options", "order"]
 
+class FormDefinitionListSerializer(serializers.ListSerializer):
+    """
+    Multi-form POSTs (BulkCreateMixin): the whole batch is written by FormService.create_definitions.
+    Lists load the fields of every form on the page with one query.
+    """
+
+    def create(self, validated_data):
+        user = self.context["request"].user
+        return FormService.create_definitions([{**item, "created_by": user} for item in validated_data])
+
+    def to_representation(self, data):
+        # One query for the fields of the whole page
+        forms = list(data.all() if hasattr(data, "all") else data)
+        FieldDefinition.objects.attach(forms)
+        return super().to_representation(forms)
+
 class FormDefinitionSerializer(serializers.ModelSerializer):
     """Serializer delegates versioning logic to FormService."""
     fields = FormFieldSerializer(many=True)
@@ -243,16 +270,16 @@ class FormDefinitionSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = FormDefinition
-        fields = ["id", "name", "description", "fields", "created_at", "created_by", "is_deleted", "version"]
+        # Submission counters change on every submission, so they are not part of these cached,
+        # ETagged bodies: see FormSubmissionCountersSerializer
+        fields = ["id", "name", "description", "fields", "created_at", "created_by", "is_deleted", "version", "is_latest"]
+        read_only_fields = ["is_latest"]
+        list_serializer_class = FormDefinitionListSerializer
 
     def create(self, validated_data):
         fields_data = validated_data.pop("fields", [])
         validated_data["created_by"] = self.context["request"].user
-        form = FormDefinition.objects.create(**validated_data)
-
-        for field_data in fields_data:
-            FormField.objects.create(form=form, **field_data)
-        return form
+        return FormService.create_definition(fields=fields_data, **validated_data)
 
     def update(self, instance, validated_data):
         # Delegate to service
@@ -264,6 +291,45 @@ class FormDefinitionSerializer(serializers.ModelSerializer):
             rep["created_by"] = instance.created_by.username
         return rep
 
+class FormSubmissionCountersListSerializer(serializers.ListSerializer):
+    """Loads the lineage totals of every form in the list with one query."""
+
+    def to_representation(self, data):
+        forms = list(data.all() if hasattr(data, "all") else data)
+        SubmissionCounterService.attach_lineage_totals(forms)
+        return super().to_representation(forms)
+
+class FormSubmissionCountersSerializer(serializers.ModelSerializer):
+    """Live submission counters of a form version and of its lineage (served uncached)."""
+    # Summed over the lineage's versions when read (SubmissionCounterService)
+    lineage_submission_count = serializers.SerializerMethodField()
+    lineage_last_submitted_at = serializers.SerializerMethodField()
+
+    class Meta:
+        model = FormDefinition
+        fields = ["id", "submission_count", "last_submitted_at", "lineage_submission_count", "lineage_last_submitted_at"]
+        read_only_fields = fields
+        list_serializer_class = FormSubmissionCountersListSerializer
+
+    def get_lineage_submission_count(self, instance):
+        return SubmissionCounterService.get_lineage_totals(instance)[0]
+
+    def get_lineage_last_submitted_at(self, instance):
+        last = SubmissionCounterService.get_lineage_totals(instance)[1]
+        return serializers.DateTimeField().to_representation(last) if last else None
+
+class FormSubmissionListSerializer(serializers.ListSerializer):
+    """Lists resolve the schemas of every form on the page at once (FormSchemaService.get_many)."""
+
+    def to_representation(self, data):
+        submissions = list(data.all() if hasattr(data, "all") else data)
+        if "form_fields" in self.child.fields:
+            schemas = self.context.setdefault("form_schemas", {})
+            forms = {s.form_id: s.form for s in submissions if s.form_id not in schemas}
+            if forms:
+                schemas.update(FormSchemaService.get_many(forms.values()))
+        return super().to_representation(submissions)
+
 class FormSubmissionSerializer(serializers.ModelSerializer):
     submitted_by = serializers.ReadOnlyField(source="submitted_by.username")
     form_name = serializers.ReadOnlyField(source="form.name")
@@ -273,9 +339,20 @@ class FormSubmissionSerializer(serializers.ModelSerializer):
         model = FormSubmission
         fields = ["id", "form", "form_name", "form_version", "submitted_by", "data", "submitted_at", "form_fields"]
         read_only_fields = ["submitted_by", "submitted_at", "form_version"]
+        list_serializer_class = FormSubmissionListSerializer
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # ?include_fields=false leaves the form schema out of every row
+        if not self.context.get("include_fields", True):
+            self.fields.pop("form_fields", None)
 
     def get_form_fields(self, obj):
-        return FormFieldSerializer(obj.form.fields.all().order_by("order"), many=True).data
+        # Lists fill the context up front; single rows resolve their schema here
+        schemas = self.context.setdefault("form_schemas", {})
+        if obj.form_id not in schemas:
+            schemas[obj.form_id] = FormSchemaService.get_fields(obj.form)
+        return schemas[obj.form_id]
 
     def validate(self, attrs):
         form = attrs["form"]
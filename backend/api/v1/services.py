@@ -1,11 +1,37 @@
+import copy
+import csv
+import gzip
+import hashlib
+import ipaddress
+import json
+import os
 import re
+import threading
+from collections import Counter, OrderedDict
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from time import monotonic
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.contrib.auth.models import User, Group
-from django.db import models
-from django.db.models import OuterRef, Subquery, Q
+from django.core.cache import cache
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.validators import EmailValidator, URLValidator
+from django.db import IntegrityError, NotSupportedError, connection, transaction
+from django.db.models import (
+    Avg, BooleanField, Case, Count, F, FloatField, Func, Max, Min, OuterRef, Q, Subquery, Sum, Value, When,
+)
+from django.db.models.fields.json import KeyTransform, compile_json_path
+from django.db.models.functions import Coalesce, TruncDay, TruncHour
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
 from rest_framework import serializers
 from rest_framework_simplejwt.tokens import RefreshToken, TokenError
 
-from .models import FormDefinition, FormField, FormSubmission, AuditLog, LogEntry
+from .models import (
+    FieldDefinition, FormDefinition, FormFieldReference, FormSubmission, AuditLog, LogEntry, MetricRollup,
+    SubmissionFilterUsage,
+)
 
 # ==========================
 # USER SERVICES
@@ -14,11 +40,68 @@ from .models import FormDefinition, FormField, FormSubmission, AuditLog, LogEntr
 class RoleService:
     """Central service for assigning roles and updating group/staff flags to users."""
 
+    # Attribute used to memoize the resolved role set on the user instance.
+    # With JWT auth a fresh user is loaded per request, so this is a per-request cache.
+    ROLE_CACHE_ATTR = "_cached_roles"
+
+    @staticmethod
+    def get_roles(user: User, token=None) -> frozenset:
+        """
+        Resolve the user's role names once and memoize them on the user instance.
+        If JWT_ROLES_FROM_TOKEN is enabled and the token carries a `roles` claim,
+        the roles are read from the claim instead of querying auth_group.
+        """
+        if not user or not user.is_authenticated:
+            return frozenset()
+
+        cached = getattr(user, RoleService.ROLE_CACHE_ATTR, None)
+        if cached is not None:
+            return cached
+
+        claim = token.get("roles") if token is not None and hasattr(token, "get") else None
+        if claim is not None and getattr(settings, "JWT_ROLES_FROM_TOKEN", False):
+            roles = frozenset(claim)
+        else:
+            roles = frozenset(user.groups.values_list("name", flat=True))
+
+        setattr(user, RoleService.ROLE_CACHE_ATTR, roles)
+        return roles
+
+    @staticmethod
+    async def aget_roles(user: User, token=None) -> frozenset:
+        """Async get_roles for the async read views (same memoization and claim handling)."""
+        if not user or not user.is_authenticated:
+            return frozenset()
+
+        cached = getattr(user, RoleService.ROLE_CACHE_ATTR, None)
+        if cached is not None:
+            return cached
+
+        claim = token.get("roles") if token is not None and hasattr(token, "get") else None
+        if claim is not None and getattr(settings, "JWT_ROLES_FROM_TOKEN", False):
+            roles = frozenset(claim)
+        else:
+            # By id, so a token-backed user is not hydrated
+            groups = Group.objects.filter(user__id=user.id).values_list("name", flat=True)
+            roles = frozenset([name async for name in groups])
+
+        setattr(user, RoleService.ROLE_CACHE_ATTR, roles)
+        return roles
+
+    @staticmethod
+    def has_role(user: User, *roles: str, token=None) -> bool:
+        return not RoleService.get_roles(user, token).isdisjoint(roles)
+
+    @staticmethod
+    def clear_cached_roles(user: User):
+        user.__dict__.pop(RoleService.ROLE_CACHE_ATTR, None)
+
     @staticmethod
     def assign_role(user: User, role: str):
         user.groups.clear()
         group = Group.objects.get(name=role)
         user.groups.add(group)
+        RoleService.clear_cached_roles(user)
 
         if role == "Admin":
             user.is_staff, user.is_superuser = True, True
@@ -28,10 +111,74 @@ class RoleService:
             user.is_staff, user.is_superuser = False, False
 
         user.save()
+        # Tokens issued with the old roles stop being accepted by StatelessJWTAuthentication
+        RoleService.invalidate_token_version(user.id)
+
+    # ---- token versions (see api.v1.authentication) ----
+
+    TOKEN_VERSION_KEY = "token-version:{}"
+
+    @staticmethod
+    def token_version(user: User, role_names=None) -> str:
+        """
+        Fingerprint of what an access token asserts about the user (roles, staff/superuser flags)
+        plus the password hash. It is derived from the user's state, so nothing has to be stored:
+        any role, flag or password change yields a new version and revokes older tokens.
+        """
+        if role_names is None:
+            role_names = user.groups.values_list("name", flat=True)
+        state = [sorted(role_names), user.is_staff, user.is_superuser, user.password]
+        return hashlib.sha1(json.dumps(state).encode()).hexdigest()[:16]
+
+    @staticmethod
+    def token_version_ttl() -> int:
+        """
+        Seconds a token version stays cached. invalidate_token_version only reaches the worker
+        that made the change unless the cache is shared, so other workers get a short TTL.
+        """
+        ttl = getattr(settings, "JWT_TOKEN_VERSION_TTL", 3600)
+        if ChangeCounterService.is_shared():
+            return ttl
+        return min(ttl, getattr(settings, "JWT_TOKEN_VERSION_LOCAL_TTL", 5))
+
+    @staticmethod
+    def get_token_version(user_id):
+        """Current token version of an active user, served from the cache; None if the user is gone or inactive."""
+        key = RoleService.TOKEN_VERSION_KEY.format(user_id)
+        version = cache.get(key)
+        if version is None:
+            user = User.objects.filter(pk=user_id, is_active=True).first()
+            if user is None:
+                return None
+            version = RoleService.token_version(user)
+            cache.set(key, version, RoleService.token_version_ttl())
+        return version
+
+    @staticmethod
+    async def aget_token_version(user_id):
+        key = RoleService.TOKEN_VERSION_KEY.format(user_id)
+        version = await cache.aget(key)
+        if version is None:
+            user = await User.objects.filter(pk=user_id, is_active=True).afirst()
+            if user is None:
+                return None
+            groups = user.groups.values_list("name", flat=True)
+            names = [name async for name in groups]
+            version = RoleService.token_version(user, names)
+            await cache.aset(key, version, RoleService.token_version_ttl())
+        return version
+
+    @staticmethod
+    def invalidate_token_version(user_id):
+        """Drop the cached version now and after commit; the next request recomputes it from the database."""
+        key = RoleService.TOKEN_VERSION_KEY.format(user_id)
+        cache.delete(key)
+        transaction.on_commit(lambda: cache.delete(key))
 
     @staticmethod
     def get_user_role(user: User) -> str:
-        groups = user.groups.values_list("name", flat=True)
+        # .all() reuses prefetch_related("groups") on list endpoints
+        groups = [group.name for group in user.groups.all()]
         return groups[0] if groups else "Viewer"
 
 class UserService:
@@ -55,27 +202,285 @@ class UserService:
 
         return {"detail": "Password changed successfully. Please log in again."}
 
+# ==========================
+# CHANGE TRACKING
+# ==========================
+
+class ChangeCounterService:
+    """
+    Per-table change counters kept in the Django cache and bumped by the model signals in
+    signals.py (and explicitly after bulk_create, which sends none). Response caches and ETags
+    read a counter instead of aggregating the table. Every worker process must see the same
+    counters, so a per-process backend is only valid with a single worker (see is_shared and the
+    api.E001 system check).
+    """
+
+    KEY = "change-counter:{}"
+    PER_PROCESS_BACKENDS = (
+        "django.core.cache.backends.locmem.LocMemCache",
+        "django.core.cache.backends.dummy.DummyCache",
+    )
+
+    @staticmethod
+    def is_shared() -> bool:
+        """Whether every app server worker reads the same cache: a shared backend, or one worker."""
+        backend = settings.CACHES["default"]["BACKEND"]
+        return backend not in ChangeCounterService.PER_PROCESS_BACKENDS or getattr(settings, "APP_SERVER_WORKERS", 1) <= 1
+
+    @staticmethod
+    def _seed() -> int:
+        # Clock-based so a counter lost to eviction/restart never reuses an older value
+        return int(timezone.now().timestamp() * 1000)
+
+    @staticmethod
+    def values(*names) -> tuple:
+        keys = [ChangeCounterService.KEY.format(name) for name in names]
+        found = cache.get_many(keys)
+        for key in keys:
+            if key not in found:
+                cache.add(key, ChangeCounterService._seed(), timeout=None)
+                found[key] = cache.get(key)
+        return tuple(found[key] for key in keys)
+
+    @staticmethod
+    async def avalues(*names) -> tuple:
+        keys = [ChangeCounterService.KEY.format(name) for name in names]
+        found = await cache.aget_many(keys)
+        for key in keys:
+            if key not in found:
+                await cache.aadd(key, ChangeCounterService._seed(), timeout=None)
+                found[key] = await cache.aget(key)
+        return tuple(found[key] for key in keys)
+
+    @staticmethod
+    def value(name: str) -> int:
+        return ChangeCounterService.values(name)[0]
+
+    @staticmethod
+    def bump(name: str):
+        key = ChangeCounterService.KEY.format(name)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, ChangeCounterService._seed(), timeout=None)
+
+    @staticmethod
+    def bump_on_commit(name: str):
+        """Bump now (the writer's own reads) and again after commit (readers that raced the write)."""
+        ChangeCounterService.bump(name)
+        transaction.on_commit(lambda: ChangeCounterService.bump(name))
+
+    @staticmethod
+    def etag(*parts) -> str:
+        raw = json.dumps(parts, sort_keys=True, default=str)
+        return f'"{hashlib.sha1(raw.encode()).hexdigest()[:32]}"'
+
+    @staticmethod
+    def request_parts(request) -> list:
+        """What a list/detail body depends on besides the data: host (absolute links) and query string."""
+        params = getattr(request, "query_params", request.GET)
+        return [request.get_host(), sorted((key, sorted(values)) for key, values in params.lists())]
+
 # ==========================
 # FORM SERVICES
 # ==========================
 
+class FieldStoreService:
+    """
+    Content-addressed store of field definitions (FieldDefinition).
+
+    A field is identified by the sha256 of its content, so identical fields in any form or
+    version share one row, and a version is an ordered list of ids (FormDefinition.field_layout).
+    Writing a version only inserts the definitions the store has not seen yet.
+    """
+
+    CONTENT_DEFAULTS = {"label": "", "required": False, "options": None}
+
+    @staticmethod
+    def content(field_data: dict) -> dict:
+        content = {**FieldStoreService.CONTENT_DEFAULTS, **field_data}
+        return {key: content[key] for key in ("name", "label", "field_type", "required", "options")}
+
+    @staticmethod
+    def digest(content: dict) -> str:
+        return hashlib.sha256(json.dumps(content, sort_keys=True).encode()).hexdigest()
+
+    @staticmethod
+    def resolve(field_lists: list):
+        """
+        Return (layouts, definitions by id) for several lists of serializer field data, inserting
+        the missing definitions with one bulk INSERT. Raises ValidationError on duplicate names.
+        """
+        contents = {}
+        layouts = []
+        for fields in field_lists:
+            names = [field_data["name"] for field_data in fields]
+            if len(set(names)) != len(names):
+                raise serializers.ValidationError({"fields": ["Each field name must be unique within a form."]})
+            rows = []
+            for position, field_data in enumerate(fields):
+                content = FieldStoreService.content(field_data)
+                digest = FieldStoreService.digest(content)
+                contents.setdefault(digest, content)
+                rows.append((field_data.get("order", 0), position, digest))
+            layouts.append(sorted(rows))
+
+        by_digest = {d.digest: d for d in FieldDefinition.objects.filter(digest__in=contents)}
+        missing = [FieldDefinition(digest=digest, **content) for digest, content in contents.items() if digest not in by_digest]
+        if missing:
+            # ignore_conflicts: a concurrent writer may insert the same content first
+            FieldDefinition.objects.bulk_create(missing, ignore_conflicts=True)
+            by_digest.update(
+                (d.digest, d) for d in FieldDefinition.objects.filter(digest__in=[m.digest for m in missing])
+            )
+
+        definitions = {d.id: d for d in by_digest.values()}
+        return [[[by_digest[digest].id, order] for order, _, digest in rows] for rows in layouts], definitions
+
+    @staticmethod
+    def link(forms: list):
+        """Record the definitions each new version uses (FormFieldReference) with one bulk INSERT."""
+        FormFieldReference.objects.bulk_create([
+            FormFieldReference(form_id=form.id, field_id=field_id)
+            for form in forms
+            for field_id in sorted({field_id for field_id, _ in form.field_layout})
+        ])
+
 class FormService:
     """Service layer for managing form definition updates & versioning."""
 
     @staticmethod
+    @transaction.atomic
+    def create_definition(fields=(), **attrs) -> FormDefinition:
+        """
+        Create a form version and move the lineage's is_latest marker onto it if it is the newest.
+        Only field definitions the store does not already hold are written (FieldStoreService).
+        """
+        (layout,), definitions = FieldStoreService.resolve([fields])
+        version = attrs.get("version", 1)
+        current = (
+            FormDefinition.objects.select_for_update()
+            .filter(name=attrs["name"], is_latest=True)
+            .first()
+        )
+        is_latest = current is None or current.version < version
+        if is_latest and current is not None:
+            current.is_latest = False
+            current.save(update_fields=["is_latest"])
+        form = FormDefinition.objects.create(is_latest=is_latest, field_layout=layout, **attrs)
+        FieldStoreService.link([form])
+        form.set_field_entries(definitions)
+        return form
+
+    @staticmethod
+    @transaction.atomic
+    def create_definitions(items: list) -> list:
+        """
+        Batch counterpart of create_definition for multi-form POSTs: each item is a dict of
+        FormDefinition attributes plus an optional "fields" list. Markers, definitions and fields
+        are written with a fixed number of statements, independent of the batch size.
+        """
+        items = [dict(item) for item in items]
+        layouts, definitions = FieldStoreService.resolve([item.pop("fields", ()) for item in items])
+        for item in items:
+            item.setdefault("version", 1)
+
+        # Newest version of each lineage in the batch vs. the current marker holders
+        newest = {}
+        for item in items:
+            newest[item["name"]] = max(newest.get(item["name"], 0), item["version"])
+        current = {
+            holder.name: holder
+            for holder in FormDefinition.objects.select_for_update().filter(name__in=newest, is_latest=True).only(
+                "name", "version"
+            )
+        }
+        superseded = [name for name, version in newest.items() if name in current and current[name].version < version]
+        if superseded:
+            FormDefinition.objects.filter(name__in=superseded, is_latest=True).update(is_latest=False)
+
+        forms = FormDefinition.objects.bulk_create([
+            FormDefinition(
+                is_latest=item["version"] == newest[item["name"]] and (
+                    item["name"] not in current or current[item["name"]].version < item["version"]
+                ),
+                field_layout=layout,
+                **item,
+            )
+            for item, layout in zip(items, layouts)
+        ])
+        FieldStoreService.link(forms)
+        for form in forms:
+            form.set_field_entries(definitions)
+
+        # bulk_create sends no post_save: do what the FormDefinition receivers in signals.py do
+        if forms:
+            MetricRollupService.record_created("forms", forms[0].created_at, len(forms))
+            deleted = sum(1 for form in forms if form.is_deleted)
+            if deleted:
+                MetricRollupService.adjust_total("forms", -deleted)
+            ChangeCounterService.bump_on_commit(FormCacheService.COUNTER)
+        return forms
+
+    @staticmethod
+    @transaction.atomic
+    def refresh_latest(name: str):
+        """Re-point the is_latest marker of a lineage at its highest remaining version."""
+        ids = list(
+            FormDefinition.objects.select_for_update()
+            .filter(name=name)
+            .order_by("-version")
+            .values_list("id", flat=True)
+        )
+        if not ids:
+            return
+        FormDefinition.objects.filter(name=name, is_latest=True).exclude(id=ids[0]).update(is_latest=False)
+        FormDefinition.objects.filter(id=ids[0], is_latest=False).update(is_latest=True)
+
+    @staticmethod
+    @transaction.atomic
+    def delete_form(instance: FormDefinition):
+        """
+        Destroy a version and its submissions. The submissions go in one DELETE instead of
+        through the cascade, which would send post_delete (and run the per-row bookkeeping of
+        signals.py) once per submission; that bookkeeping is done once here instead.
+        """
+        name = instance.name
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FormSubmission._meta.db_table} WHERE form_id = %s", [instance.pk])
+            deleted = cursor.rowcount
+        if deleted:
+            MetricRollupService.adjust_total("submissions", -deleted)
+            ChangeCounterService.bump_on_commit("submissions")
+            ChangeCounterService.bump_on_commit(SubmissionAnalyticsService.EDIT_COUNTER)
+        instance.delete()
+        FormService.refresh_latest(name)
+
+    @staticmethod
+    @transaction.atomic
     def update_form(instance: FormDefinition, validated_data: dict):
         fields_data = validated_data.pop("fields", None)
 
         # Case A: metadata-only update
         if fields_data is None:
+            old_name = instance.name
             instance.name = validated_data.get("name", instance.name)
             instance.description = validated_data.get("description", instance.description)
             instance.is_deleted = validated_data.get("is_deleted", instance.is_deleted)
-            instance.save()
+            if instance.name != old_name:
+                # Renaming moves the row to another lineage; recompute both markers
+                instance.is_latest = False
+                instance.save()
+                FormService.refresh_latest(old_name)
+                FormService.refresh_latest(instance.name)
+                instance.refresh_from_db(fields=["is_latest"])
+            else:
+                instance.save()
             return instance
 
         # Case B: structural change → create a new version
-        new_form = FormDefinition.objects.create(
+        return FormService.create_definition(
+            fields=fields_data,
             name=validated_data.get("name", instance.name),
             description=validated_data.get("description", instance.description),
             created_by=instance.created_by,
@@ -83,17 +488,23 @@ class FormService:
             version=instance.version + 1,
         )
 
-        for field_data in fields_data:
-            FormField.objects.create(form=new_form, **field_data)
-
-        return new_form
-
 class FormDefinitionService:
     """Business logic for filtering FormDefinition querysets."""
 
+    @staticmethod
+    def get_queryset(user, params):
+        """Forms visible to `user` for list/retrieve (shared by the sync and async views)."""
+        queryset = (
+            # Fields are attached per page by FormDefinitionListSerializer (one query)
+            FormDefinition.objects.select_related("created_by")
+            .order_by("-created_at")
+        )
+        queryset = FormDefinitionService.filter_by_state(queryset, user, params)
+        return FormDefinitionService.filter_latest_only(queryset, params.get("latest_only", "true"))
+
     @staticmethod
     def filter_by_state(queryset, user, params):
-        if user.groups.filter(name="Admin").exists():
+        if RoleService.has_role(user, "Admin"):
             state = params.get("state")
             if state == "deleted":
                 return queryset.filter(is_deleted=True)
@@ -105,153 +516,2011 @@ class FormDefinitionService:
     @staticmethod
     def filter_latest_only(queryset, latest_only):
         if latest_only in ("true", "1"):
-            latest_ids = FormDefinition.objects.filter(
-                name=OuterRef("name")
-            ).order_by("-version").values("id")[:1]
-            return queryset.filter(id=Subquery(latest_ids))
+            return queryset.filter(is_latest=True)
         return queryset
 
+class FormSchemaService:
+    """
+    Cache of serialized field schemas per (form id, version).
+    A form version's fields never change: structural edits create a new FormDefinition.
+    """
+
+    CACHE_TIMEOUT = 60 * 60
+
+    @staticmethod
+    def version_key(form: FormDefinition) -> tuple:
+        # created_at guards against a recycled id (e.g. after a database reset) hitting a stale entry
+        return (form.id, form.version, form.created_at.timestamp())
+
+    @staticmethod
+    def cache_key(form: FormDefinition) -> str:
+        form_id, version, created = FormSchemaService.version_key(form)
+        return f"form-schema:{form_id}:v{version}:{created}"
+
+    @staticmethod
+    def get_fields(form: FormDefinition) -> list:
+        key = FormSchemaService.cache_key(form)
+        schema = cache.get(key)
+        if schema is None:
+            from .serializers import FormFieldSerializer
+            schema = [dict(f) for f in FormFieldSerializer(form.fields, many=True).data]
+            cache.set(key, schema, FormSchemaService.CACHE_TIMEOUT)
+        return schema
+
+    @staticmethod
+    def get_many(forms) -> dict:
+        """{form id: schema} for several forms: one cache round trip, one query for the misses."""
+        from .serializers import FormFieldSerializer
+        keys = {FormSchemaService.cache_key(form): form for form in forms}
+        cached = cache.get_many(list(keys))
+        missing = [form for key, form in keys.items() if key not in cached]
+        if missing:
+            FieldDefinition.objects.attach(missing)
+            fresh = {
+                FormSchemaService.cache_key(form): [dict(f) for f in FormFieldSerializer(form.fields, many=True).data]
+                for form in missing
+            }
+            cache.set_many(fresh, FormSchemaService.CACHE_TIMEOUT)
+            cached.update(fresh)
+        return {form.id: cached[key] for key, form in keys.items()}
+
+    @staticmethod
+    async def aget_many(forms) -> dict:
+        from .serializers import FormFieldSerializer
+        keys = {FormSchemaService.cache_key(form): form for form in forms}
+        cached = await cache.aget_many(list(keys))
+        missing = [form for key, form in keys.items() if key not in cached]
+        if missing:
+            await FieldDefinition.objects.aattach(missing)
+            fresh = {
+                FormSchemaService.cache_key(form): [dict(f) for f in FormFieldSerializer(form.fields, many=True).data]
+                for form in missing
+            }
+            await cache.aset_many(fresh, FormSchemaService.CACHE_TIMEOUT)
+            cached.update(fresh)
+        return {form.id: cached[key] for key, form in keys.items()}
+
+    @staticmethod
+    def invalidate(form: FormDefinition):
+        cache.delete(FormSchemaService.cache_key(form))
+
+class FormCacheService:
+    """
+    Response cache for FormDefinitionViewSet list/retrieve, on the default Django cache
+    (locmem by default, a Redis-protocol server when REDIS_URL is set).
+
+    Keys are namespaced by the "forms" change counter, which every form/field write bumps
+    (see signals.py), so invalidation is a single INCR instead of a key scan, and they include
+    the caller's role-visible scope plus the query string. The ETag is derived from the key, so
+    a matching If-None-Match is answered before any query runs. Submission counters are not
+    part of these bodies (see SubmissionCounterService), so submission writes leave it alone.
+
+    Bodies are only cached when every worker shares the cache (ChangeCounterService.is_shared):
+    a per-process copy would outlive writes handled by another worker for FORM_CACHE_TTL.
+    """
+
+    COUNTER = "forms"
+
+    @staticmethod
+    def timeout() -> int:
+        """Seconds a response body stays cached; 0 disables the body cache (ETags still apply)."""
+        return settings.FORM_CACHE_TTL if ChangeCounterService.is_shared() else 0
+
+    @staticmethod
+    def scope(roles) -> str:
+        # Admins see deleted forms and may use ?state=; everyone else gets the same view
+        return "admin" if "Admin" in roles else "member"
+
+    @staticmethod
+    def response_key(request, action: str, scope: str, pk=None):
+        """Return (cache key, ETag) for one list/retrieve request."""
+        generation = ChangeCounterService.value(FormCacheService.COUNTER)
+        return FormCacheService.key_for(generation, request, action, scope, pk)
+
+    @staticmethod
+    async def aresponse_key(request, action: str, scope: str, pk=None):
+        (generation,) = await ChangeCounterService.avalues(FormCacheService.COUNTER)
+        return FormCacheService.key_for(generation, request, action, scope, pk)
+
+    @staticmethod
+    def key_for(generation, request, action, scope, pk):
+        raw = json.dumps([action, scope, pk, ChangeCounterService.request_parts(request)])
+        digest = hashlib.sha1(raw.encode()).hexdigest()
+        return f"form-cache:{generation}:{digest}", f'"{generation}-{digest[:16]}"'
+
+class FormDiffService:
+    """
+    Server-side diff between two versions of a form lineage.
+
+    Field changes only depend on the two (immutable) versions and are cached under their schema
+    keys. The submission impact is cached under a fingerprint of the compared versions' own
+    submission counters plus the submission edit counter, so submissions to other forms do not
+    invalidate it, and checks at most FORM_DIFF_IMPACT_MAX_ROWS submissions. The metadata
+    comparison is recomputed on every call because it is cheap and editable in place.
+    """
+
+    FIELD_ATTRIBUTES = ("label", "field_type", "required", "options", "order")
+    METADATA = ("name", "description", "is_deleted")
+
+    @staticmethod
+    def diff(base: FormDefinition, target: FormDefinition) -> dict:
+        """What changed going from `base` to `target` (either may be the newer version)."""
+        timeout = getattr(settings, "FORM_DIFF_CACHE_TTL", 3600)
+        key = f"form-diff:{FormSchemaService.cache_key(base)}:{FormSchemaService.cache_key(target)}"
+        fields = cache.get(key)
+        if fields is None:
+            fields = FormDiffService.diff_fields(FormSchemaService.get_fields(base), FormSchemaService.get_fields(target))
+            cache.set(key, fields, timeout)
+
+        older, newer = sorted([base, target], key=lambda form: form.version)
+        versions = FormDiffService.compared_versions(older, newer)
+        fingerprint = ":".join(
+            f"{form_id}.{count}.{last.timestamp() if last else ''}" for form_id, _, count, last in versions
+        )
+        impact_key = "form-diff-impact:" + hashlib.sha256(
+            f"{FormSchemaService.cache_key(newer)}:{fingerprint}:"
+            f"{ChangeCounterService.value(SubmissionAnalyticsService.EDIT_COUNTER)}".encode()
+        ).hexdigest()
+        impact = cache.get(impact_key)
+        if impact is None:
+            impact = FormDiffService.submission_impact(newer, versions)
+            cache.set(impact_key, impact, timeout)
+
+        return {
+            "form": {"id": target.id, "name": target.name, "version": target.version},
+            "against": {"id": base.id, "name": base.name, "version": base.version},
+            "metadata": {
+                attr: {"from": getattr(base, attr), "to": getattr(target, attr)}
+                for attr in FormDiffService.METADATA
+                if getattr(base, attr) != getattr(target, attr)
+            },
+            "fields": fields,
+            "submissions": impact,
+        }
+
+    @staticmethod
+    def diff_fields(base_fields: list, target_fields: list) -> dict:
+        """Fields are matched by name; a modified field lists each changed attribute."""
+        base = {field["name"]: field for field in base_fields}
+        target = {field["name"]: field for field in target_fields}
+        modified = []
+        unchanged = 0
+        for name, field in target.items():
+            if name not in base:
+                continue
+            changes = {
+                attr: {"from": base[name][attr], "to": field[attr]}
+                for attr in FormDiffService.FIELD_ATTRIBUTES
+                if base[name][attr] != field[attr]
+            }
+            if changes:
+                modified.append({"name": name, "changes": changes})
+            else:
+                unchanged += 1
+        return {
+            "added": [field for name, field in target.items() if name not in base],
+            "removed": [field for name, field in base.items() if name not in target],
+            "modified": modified,
+            "unchanged": unchanged,
+        }
+
+    @staticmethod
+    def compared_versions(older: FormDefinition, newer: FormDefinition) -> list:
+        """[(form id, version, submission_count, last_submitted_at)] of each version from `older` up to `newer`."""
+        return list(
+            FormDefinition.objects.filter(name=newer.name, version__gte=older.version, version__lt=newer.version)
+            .order_by("version")
+            .values_list("id", "version", "submission_count", "last_submitted_at")
+        )
+
+    @staticmethod
+    def submission_impact(newer: FormDefinition, versions: list) -> dict:
+        """
+        For every version in `versions` (see compared_versions), how many of its submissions
+        would fail validation under `newer`'s schema. Only the FORM_DIFF_IMPACT_MAX_ROWS most
+        recent submissions are validated: `checked` says how many of each version's `total` were.
+        """
+        compiled = FormValidator.get_compiled(newer)
+        chunk_size = getattr(settings, "SUBMISSION_EXPORT_CHUNK_SIZE", 2000)
+        max_rows = getattr(settings, "FORM_DIFF_IMPACT_MAX_ROWS", 50000)
+        counts = {
+            version: {"version": version, "total": total, "checked": 0, "invalid": 0}
+            for _, version, total, _ in versions
+        }
+        rows = (
+            FormSubmission.objects.filter(form_id__in=[form_id for form_id, _, _, _ in versions])
+            .order_by("-submitted_at", "-id")
+            .values_list("form_version", "data")[:max_rows]
+        )
+        for version, data in rows.iterator(chunk_size=chunk_size):
+            row = counts.setdefault(version, {"version": version, "total": 0, "checked": 0, "invalid": 0})
+            row["checked"] += 1
+            if compiled.validate(data if isinstance(data, dict) else {}):
+                row["invalid"] += 1
+        checked = sum(row["checked"] for row in counts.values())
+        return {
+            "validated_against": newer.version,
+            "truncated": checked >= max_rows and checked < sum(row["total"] for row in counts.values()),
+            "versions": [counts[v] for v in sorted(counts) if counts[v]["total"] or counts[v]["checked"]],
+        }
+
 class FormSubmissionService:
     """Business logic for handling form submissions."""
 
+    @staticmethod
+    def sees_all(user, roles) -> bool:
+        return "Admin" in roles or "Editor" in roles or user.is_superuser
+
+    @staticmethod
+    def get_queryset(user, roles, params, form_pk=None):
+        """
+        Submissions visible to `user` (shared by the sync and async views), optionally narrowed
+        by ?form=, ?form_version= and typed data.* filters (SubmissionQueryService).
+        """
+        queryset = FormSubmission.objects.select_related("form", "submitted_by").order_by("-submitted_at")
+
+        if not FormSubmissionService.sees_all(user, roles):
+            # By id: request.user may be a token-backed user (StatelessJWTAuthentication)
+            queryset = queryset.filter(submitted_by_id=user.id)
+
+        form_id = FormSubmissionService._to_id(form_pk or params.get("form"))
+        if form_id is not None:
+            queryset = queryset.filter(form_id=form_id)
+        elif form_pk:
+            return queryset.none()
+        form_version = params.get("form_version")
+        if form_version:
+            queryset = queryset.filter(form_version=form_version)
+
+        if SubmissionQueryService.has_filters(params):
+            # data.* keys are typed by one form version's schema
+            form = FormDefinition.objects.filter(pk=form_id).first() if form_id is not None else None
+            if form is None:
+                raise serializers.ValidationError({"form": "Filtering by data.* requires an existing form (?form=<id>)."})
+            queryset = SubmissionQueryService.filter(queryset, params, form)
+        return queryset
+
+    @staticmethod
+    def include_fields(params) -> bool:
+        return params.get("include_fields", "true") not in ("false", "0")
+
+    @staticmethod
+    def etag(request, action, user, roles, kwargs, counters) -> str:
+        # Bodies embed form names/fields, so a form change (counters[0]) also changes the ETag
+        scope = "all" if FormSubmissionService.sees_all(user, roles) else user.id
+        return ChangeCounterService.etag(
+            "submissions", action, scope, kwargs, *counters, ChangeCounterService.request_parts(request)
+        )
+
     @staticmethod
     def check_latest_version(form: FormDefinition):
+        if form.is_latest:
+            return
         latest_version = (
-            FormDefinition.objects.filter(name=form.name)
-            .aggregate(max_version=models.Max("version"))
-            .get("max_version", form.version)
+            FormDefinition.objects.filter(name=form.name, is_latest=True)
+            .values_list("version", flat=True)
+            .first()
         )
-        if form.version < latest_version:
+        if latest_version is not None and form.version < latest_version:
             raise serializers.ValidationError(
                 {"detail": f"Form '{form.name}' is outdated. Please use version {latest_version}."}
             )
 
+    @staticmethod
+    def _to_id(value):
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return None
+
+    @staticmethod
+    def bulk_ingest(rows: list, user: User, form_id=None, allow_submitter_override=False) -> dict:
+        """
+        Validate and insert a batch of submissions in one transaction.
+
+        Forms are loaded once with their fields, duplicates are detected with a single
+        set-based query, and valid rows are inserted with bulk_create in chunks.
+        Invalid rows, including duplicates committed concurrently by another writer, are reported
+        by index and do not abort the rest of the batch.
+        """
+        chunk_size = getattr(settings, "SUBMISSION_BULK_CHUNK_SIZE", 1000)
+        errors = []
+
+        def fail(index, detail):
+            errors.append({"index": index, "errors": detail})
+
+        # 1. Shape checks and id coercion (no queries)
+        pending = []
+        for index, row in enumerate(rows):
+            if not isinstance(row, dict) or not isinstance(row.get("data"), dict):
+                fail(index, {"data": ["This field is required and must be an object."]})
+                continue
+            row_form_id = FormSubmissionService._to_id(form_id or row.get("form"))
+            if row_form_id is None:
+                fail(index, {"form": ["A valid form id is required."]})
+                continue
+            submitter_id = user.id
+            if "submitted_by" in row:
+                if not allow_submitter_override:
+                    fail(index, {"submitted_by": ["Only admins can import submissions on behalf of other users."]})
+                    continue
+                submitter_id = row["submitted_by"]
+                if submitter_id is not None:
+                    submitter_id = FormSubmissionService._to_id(submitter_id)
+                    if submitter_id is None:
+                        fail(index, {"submitted_by": ["Must be a user id or null."]})
+                        continue
+            pending.append((index, row_form_id, submitter_id, row["data"]))
+
+        # 2. Load every referenced form, submitter and prior submission once
+        # (field schemas come from FormValidator's compiled cache)
+        forms = FormDefinition.objects.in_bulk({p[1] for p in pending})
+        submitter_ids = {p[2] for p in pending if p[2] is not None}
+        known_users = set(User.objects.filter(id__in=submitter_ids).values_list("id", flat=True))
+        seen = set(
+            FormSubmission.objects.filter(form_id__in=forms.keys(), submitted_by_id__in=known_users)
+            .values_list("form_id", "submitted_by_id", "form_version")
+        )
+        outdated = {}
+
+        # 3. Per-row validation against the compiled schemas
+        to_create = []
+        for index, row_form_id, submitter_id, data in pending:
+            form = forms.get(row_form_id)
+            if form is None:
+                fail(index, {"form": [f"Form {row_form_id} does not exist."]})
+                continue
+            if submitter_id is not None and submitter_id not in known_users:
+                fail(index, {"submitted_by": [f"User {submitter_id} does not exist."]})
+                continue
+            if form.id not in outdated:
+                try:
+                    FormSubmissionService.check_latest_version(form)
+                    outdated[form.id] = None
+                except serializers.ValidationError as e:
+                    outdated[form.id] = e.detail
+            if outdated[form.id] is not None:
+                fail(index, outdated[form.id])
+                continue
+
+            key = (form.id, submitter_id, form.version)
+            if submitter_id is not None and key in seen:
+                fail(index, {"non_field_errors": ["This user has already submitted this form version."]})
+                continue
+            try:
+                FormValidator.validate_submission(form, data)
+            except serializers.ValidationError as e:
+                fail(index, e.detail)
+                continue
+
+            seen.add(key)
+            to_create.append((index, FormSubmission(
+                form=form, submitted_by_id=submitter_id, data=data, form_version=form.version
+            )))
+
+        # 4. Insert everything that passed in a single transaction. A concurrent writer may have
+        # submitted for the same user and version since step 2: the unique constraint rejects the
+        # batch, so re-read the duplicates, report those rows and insert the rest.
+        while True:
+            submissions = [submission for _, submission in to_create]
+            try:
+                with transaction.atomic():
+                    FormSubmission.objects.bulk_create(submissions, batch_size=chunk_size)
+                    MetricRollupService.record_submissions(submissions)
+                    SubmissionCounterService.record(submissions)
+                break
+            except IntegrityError:
+                taken = set(
+                    FormSubmission.objects.filter(
+                        form_id__in={s.form_id for s in submissions},
+                        submitted_by_id__in={s.submitted_by_id for s in submissions if s.submitted_by_id is not None},
+                    ).values_list("form_id", "submitted_by_id", "form_version")
+                )
+                conflicts = {
+                    index for index, s in to_create if (s.form_id, s.submitted_by_id, s.form_version) in taken
+                }
+                if not conflicts:
+                    raise
+                for index in sorted(conflicts):
+                    fail(index, {"non_field_errors": ["This user has already submitted this form version."]})
+                to_create = [(index, s) for index, s in to_create if index not in conflicts]
+                for _, submission in to_create:
+                    # Ids assigned by the rolled-back INSERT
+                    submission.pk = None
+                errors.sort(key=lambda error: error["index"])
+        if to_create:
+            ChangeCounterService.bump_on_commit("submissions")
+
+        return {"created": len(to_create), "failed": len(errors), "errors": errors}
+
+def _is_number(value):
+    return isinstance(value, (int, float))
+
+def _is_bool(value):
+    return isinstance(value, bool)
+
+def _is_text(value):
+    return isinstance(value, str)
+
+def _matches(pattern):
+    compiled = re.compile(pattern)
+    return lambda value: isinstance(value, str) and compiled.fullmatch(value) is not None
+
+def _django_validator(validator):
+    def check(value):
+        if not isinstance(value, str):
+            return False
+        try:
+            validator(value)
+        except DjangoValidationError:
+            return False
+        return True
+    return check
+
+def _iso_parser(parse):
+    def check(value):
+        if not isinstance(value, str):
+            return False
+        try:
+            parse(value)
+        except ValueError:
+            return False
+        return True
+    return check
+
+# field_type -> (predicate, error suffix). Types not listed (button, submit, reset, image) carry no data.
+FIELD_TYPE_CHECKS = {
+    "number": (_is_number, "must be a number"),
+    "range": (_is_number, "must be a number"),
+    "email": (_django_validator(EmailValidator()), "must be a valid email address"),
+    "url": (_django_validator(URLValidator()), "must be a valid URL"),
+    "date": (_iso_parser(date.fromisoformat), "must be a date (YYYY-MM-DD)"),
+    "datetime-local": (_iso_parser(datetime.fromisoformat), "must be a datetime (YYYY-MM-DDTHH:MM)"),
+    "time": (_iso_parser(time.fromisoformat), "must be a time (HH:MM)"),
+    "month": (_matches(r"\d{4}-(0[1-9]|1[0-2])"), "must be a month (YYYY-MM)"),
+    "week": (_matches(r"\d{4}-W(0[1-9]|[1-4]\d|5[0-3])"), "must be a week (YYYY-Www)"),
+    "color": (_matches(r"#[0-9a-fA-F]{6}"), "must be a hex color (#rrggbb)"),
+    "tel": (_matches(r"[0-9+()\-.\s]{3,}"), "must be a phone number"),
+    "text": (_is_text, "must be text"),
+    "textarea": (_is_text, "must be text"),
+    "password": (_is_text, "must be text"),
+    "search": (_is_text, "must be text"),
+    "hidden": (_is_text, "must be text"),
+    "file": (_is_text, "must be a file reference"),
+    "checkbox": (_is_bool, "must be true or false"),
+}
+
+CHOICE_FIELD_TYPES = {"select", "radio", "checkbox"}
+
+
+class CompiledFormValidator:
+    """
+    Validation rules for one (form id, version), built once from its field definitions.
+    Holds only immutable data, so a single instance can be shared across threads and requests.
+    """
+
+    __slots__ = ("form_id", "version", "required", "checks")
+
+    def __init__(self, form_id: int, version: int, fields):
+        required = []
+        checks = []
+        for field in fields:
+            if field.required:
+                required.append(field.name)
+            options = frozenset(o for o in field.options or () if isinstance(o, (str, int, float, bool)))
+            if field.field_type in CHOICE_FIELD_TYPES and options:
+                checks.append((field.name, field.field_type, options, list(field.options), None, None))
+            elif field.field_type in FIELD_TYPE_CHECKS:
+                predicate, message = FIELD_TYPE_CHECKS[field.field_type]
+                checks.append((field.name, field.field_type, None, None, predicate, message))
+
+        self.form_id = form_id
+        self.version = version
+        self.required = tuple(required)
+        self.checks = tuple(checks)
+
+    def validate(self, data: dict) -> dict:
+        errors = {}
+
+        # Required field check
+        for name in self.required:
+            if data.get(name) is None:
+                errors[name] = f"{name} is required"
+
+        for name, field_type, options, option_list, predicate, message in self.checks:
+            value = data.get(name)
+            if value is None or name in errors:
+                continue
+
+            if options is not None:
+                # Checkboxes with options accept several choices
+                values = value if field_type == "checkbox" and isinstance(value, list) else [value]
+                try:
+                    valid = all(v in options for v in values)
+                except TypeError:  # unhashable value
+                    valid = False
+                if not valid:
+                    errors[name] = f"Invalid value for {name}. Must be one of {option_list}"
+            elif value != "" and not predicate(value):
+                errors[name] = f"{name} {message}"
+
+        return errors
+
+
 class FormValidator:
     """Service for validating form submissions against form definitions."""
 
+    _compiled = OrderedDict()
+    _lock = threading.Lock()
+
+    @staticmethod
+    def get_compiled(form: FormDefinition) -> CompiledFormValidator:
+        """Compiled validator for the form version, from a bounded LRU (form versions are immutable)."""
+        key = FormSchemaService.version_key(form)
+        with FormValidator._lock:
+            compiled = FormValidator._compiled.get(key)
+            if compiled is not None:
+                FormValidator._compiled.move_to_end(key)
+                return compiled
+
+        # Reuses the fields when the caller already attached them
+        compiled = CompiledFormValidator(form.id, form.version, form.fields)
+        with FormValidator._lock:
+            FormValidator._compiled[key] = compiled
+            while len(FormValidator._compiled) > getattr(settings, "FORM_VALIDATOR_CACHE_SIZE", 512):
+                FormValidator._compiled.popitem(last=False)
+        return compiled
+
+    @staticmethod
+    def clear_cache():
+        with FormValidator._lock:
+            FormValidator._compiled.clear()
+
     @staticmethod
     def validate_submission(form: FormDefinition, submission_data: dict):
-        errors = {}
+        errors = FormValidator.get_compiled(form).validate(submission_data)
+        if errors:
+            raise serializers.ValidationError(errors)
+
+class _Echo:
+    """File-like object whose write() returns the line, so csv.writer can feed a generator."""
+
+    def write(self, value):
+        return value
 
-        for field in form.fields.all():
-            value = submission_data.get(field.name)
+class SubmissionExportService:
+    """Streams a form's submissions as CSV or NDJSON with constant memory."""
 
-            # Required field check
-            if field.required and value is None:
-                errors[field.name] = f"{field.name} is required"
+    NON_DATA_FIELD_TYPES = {"button", "submit", "reset"}
+    META_COLUMNS = ["submission_id", "submitted_by", "submitted_at", "form_version"]
+    CONTENT_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+    # Leading characters spreadsheets evaluate as a formula (CSV injection)
+    FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+    @staticmethod
+    def get_columns(form: FormDefinition) -> list:
+        """Data columns in the form version's field order."""
+        return [
+            f["name"] for f in FormSchemaService.get_fields(form)
+            if f["field_type"] not in SubmissionExportService.NON_DATA_FIELD_TYPES
+        ]
+
+    @staticmethod
+    def iter_rows(queryset, columns: list):
+        chunk_size = getattr(settings, "SUBMISSION_EXPORT_CHUNK_SIZE", 2000)
+        rows = queryset.order_by("id").values_list(
+            "id", "submitted_by__username", "submitted_at", "form_version", "data"
+        )
+        # iterator() streams through a server-side cursor instead of loading the result set
+        for pk, username, submitted_at, version, data in rows.iterator(chunk_size=chunk_size):
+            data = data if isinstance(data, dict) else {}
+            yield [pk, username, submitted_at.isoformat(), version], [data.get(name) for name in columns]
+
+    @staticmethod
+    def csv_cell(value):
+        """`value` as a CSV cell; text a spreadsheet would run as a formula is quoted with `'`."""
+        if isinstance(value, (list, dict)):
+            value = json.dumps(value)
+        if isinstance(value, str) and value.startswith(SubmissionExportService.FORMULA_PREFIXES):
+            return "'" + value
+        return value
+
+    @staticmethod
+    def stream_csv(queryset, columns: list):
+        writer = csv.writer(_Echo())
+        cell = SubmissionExportService.csv_cell
+        yield writer.writerow([cell(name) for name in SubmissionExportService.META_COLUMNS + columns])
+        for meta, values in SubmissionExportService.iter_rows(queryset, columns):
+            yield writer.writerow([cell(v) for v in meta + values])
+
+    @staticmethod
+    def stream_ndjson(queryset, columns: list):
+        keys = SubmissionExportService.META_COLUMNS + columns
+        for meta, values in SubmissionExportService.iter_rows(queryset, columns):
+            yield json.dumps(dict(zip(keys, meta + values)), default=str) + "\n"
+
+    @staticmethod
+    def stream(queryset, form: FormDefinition, export_format: str):
+        columns = SubmissionExportService.get_columns(form)
+        if export_format == "ndjson":
+            return SubmissionExportService.stream_ndjson(queryset, columns)
+        return SubmissionExportService.stream_csv(queryset, columns)
+
+
+class SubmissionQueryService:
+    """
+    Typed filters on FormSubmission.data: `?data.<field>[__<op>]=<value>`.
+
+    Keys are validated against the form version's fields and values are coerced to the JSON type
+    the submission validator stores for that field type, so `data.age__gte=18` compares numbers.
+    Equality is expressed as containment (`data @> {...}`), served by the GIN jsonb_path_ops
+    index from migration 0011; range, substring and null checks compare `data -> 'key'`, which
+    SubmissionDataIndexService can back with per-field expression indexes.
+    """
+
+    PREFIX = "data."
+    OPERATORS = {"exact", "in", "gt", "gte", "lt", "lte", "icontains", "isnull"}
+    RANGE_OPERATORS = {"gt", "gte", "lt", "lte"}
+    NUMBER_TYPES = {"number", "range"}
+    # ISO-formatted strings order correctly as text
+    ORDERED_TEXT_TYPES = {"date", "datetime-local", "time", "month", "week"}
+
+    @staticmethod
+    def has_filters(params) -> bool:
+        return any(key.startswith(SubmissionQueryService.PREFIX) for key in params)
+
+    @staticmethod
+    def parse_params(params):
+        """[(field name, operator, raw value)] for every data.* parameter."""
+        filters = []
+        for key in params:
+            if not key.startswith(SubmissionQueryService.PREFIX):
                 continue
+            name, _, operator = key[len(SubmissionQueryService.PREFIX):].partition("__")
+            filters.append((name, operator or "exact", params.get(key)))
+        return filters
+
+    @staticmethod
+    def coerce(field: dict, raw: str):
+        """The JSON value a submission stores for `raw` in this field (ValueError if it cannot)."""
+        field_type = field["field_type"]
+        if field_type in SubmissionQueryService.NUMBER_TYPES:
+            number = float(raw)
+            return int(number) if number.is_integer() else number
+        if field_type == "checkbox" and not field.get("options"):
+            if raw.lower() in ("true", "1"):
+                return True
+            if raw.lower() in ("false", "0"):
+                return False
+            raise ValueError(raw)
+        return raw
 
-            # Type check: number
-            if value is not None and field.field_type == "number" and not isinstance(value, (int, float)):
-                errors[field.name] = f"{field.name} must be a number"
+    @staticmethod
+    def condition(field: dict, operator: str, raw: str, key: str) -> Q:
+        """Q for one filter; `key` is the queryset alias of KeyTransform(field name, "data")."""
+        name = field["name"]
+        coerce = SubmissionQueryService.coerce
+        if operator == "isnull":
+            if raw.lower() not in ("true", "false", "1", "0"):
+                raise ValueError(raw)
+            missing = ~Q(data__has_key=name) | SubmissionQueryService.equals(name, None, key)
+            return missing if raw.lower() in ("true", "1") else ~missing
+        if operator in ("exact", "in"):
+            values = [coerce(field, value) for value in (raw.split(",") if operator == "in" else [raw])]
+            # Checkboxes with options store a list of choices
+            as_list = field["field_type"] == "checkbox" and field.get("options")
+            condition = Q()
+            for value in values:
+                condition |= SubmissionQueryService.equals(name, [value] if as_list else value, key)
+            return condition
+        if operator == "icontains":
+            return Q(**{f"{key}__icontains": raw})
+        if field["field_type"] not in SubmissionQueryService.NUMBER_TYPES | SubmissionQueryService.ORDERED_TEXT_TYPES:
+            raise ValueError(operator)
+        return Q(**{f"{key}__{operator}": coerce(field, raw)})
 
-            # Choice check: select
-            if value is not None and field.field_type == "select" and field.options and value not in field.options:
-                errors[field.name] = f"Invalid value for {field.name}. Must be one of {field.options}"
+    @staticmethod
+    def equals(name: str, value, key: str) -> Q:
+        if connection.vendor == "postgresql":
+            # Containment is what the jsonb_path_ops GIN index serves
+            return Q(data__contains={name: value})
+        # Other backends have no JSON containment; compare the key (lists match exactly)
+        return Q(**{key: value})
 
+    @staticmethod
+    def filter(queryset, params, form: FormDefinition):
+        """Apply the data.* filters of `params` for `form`'s schema; ValidationError (400) on bad input."""
+        fields = {field["name"]: field for field in FormSchemaService.get_fields(form)}
+        errors = {}
+        used = set()
+        for index, (name, operator, raw) in enumerate(SubmissionQueryService.parse_params(params)):
+            param = f"{SubmissionQueryService.PREFIX}{name}" + (f"__{operator}" if operator != "exact" else "")
+            if name not in fields:
+                errors[param] = f"Unknown field. Available fields: {', '.join(fields)}."
+                continue
+            if operator not in SubmissionQueryService.OPERATORS:
+                errors[param] = f"Unknown operator. Use one of: {', '.join(sorted(SubmissionQueryService.OPERATORS))}."
+                continue
+            # An alias instead of data__<name>__<op>, which misparses field names that are lookup names
+            key = f"data_filter_{index}"
+            try:
+                condition = SubmissionQueryService.condition(fields[name], operator, raw, key)
+            except ValueError:
+                errors[param] = f"Invalid value for a {fields[name]['field_type']} field with operator {operator}."
+                continue
+            queryset = queryset.alias(**{key: KeyTransform(name, "data")}).filter(condition)
+            used.add(name)
         if errors:
             raise serializers.ValidationError(errors)
+        for name in sorted(used):
+            SubmissionQueryService.record_use(form.id, name)
+        return queryset
+
+    @staticmethod
+    def record_use(form_id, name):
+        """Count one filtered request per (form, field); `submission_data_index --hot` indexes the busiest."""
+        key = {"form_id": form_id, "field_name": name}
+        if SubmissionFilterUsage.objects.filter(**key).update(uses=F("uses") + 1, last_used_at=timezone.now()):
+            return
+        try:
+            with transaction.atomic():
+                SubmissionFilterUsage.objects.create(uses=1, **key)
+        except IntegrityError:
+            # Created concurrently between our UPDATE and INSERT
+            SubmissionFilterUsage.objects.filter(**key).update(uses=F("uses") + 1, last_used_at=timezone.now())
+
+    @staticmethod
+    def usage(form_ids=None, latest_only=False) -> list:
+        """[(form id, field name, uses)], busiest first; `latest_only` skips superseded and deleted versions."""
+        rows = SubmissionFilterUsage.objects.all()
+        if form_ids is not None:
+            rows = rows.filter(form_id__in=form_ids)
+        if latest_only:
+            rows = rows.filter(form__is_latest=True, form__is_deleted=False)
+        return list(rows.order_by("-uses", "form_id", "field_name").values_list("form_id", "field_name", "uses"))
+
+class SubmissionDataIndexService:
+    """
+    Per-field expression indexes on (form_id, data -> 'field') for hot range/ordering filters
+    (PostgreSQL). Equality filters already use the GIN index on the whole document.
+
+    Each index is partial on one form version. New submissions go to the latest version, so
+    indexes are only created for latest versions and `stale` finds those of superseded, deleted
+    or removed versions for `submission_data_index --prune`.
+    """
+
+    PREFIX = "subdata_"
+    FORM_ID = re.compile(r"subdata_(\d+)_")
+
+    @staticmethod
+    def index_name(form_id: int, name: str) -> str:
+        # Field names are free text: keep the name SQL-safe and within 63 characters
+        slug = re.sub(r"[^a-z0-9]+", "_", name.lower()).strip("_")[:24]
+        digest = hashlib.sha1(name.encode()).hexdigest()[:8]
+        return f"{SubmissionDataIndexService.PREFIX}{form_id}_{slug}_{digest}"
+
+    @staticmethod
+    def create(form_id: int, name: str) -> str:
+        index = SubmissionDataIndexService.index_name(form_id, name)
+        with connection.cursor() as cursor:
+            # CONCURRENTLY: no write lock on the submissions table (must run outside a transaction)
+            cursor.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {index} ON v1_formsubmission "
+                f"(form_id, (data -> %s)) WHERE form_id = %s",
+                [name, int(form_id)],
+            )
+        return index
+
+    @staticmethod
+    def drop(index: str):
+        if not index.startswith(SubmissionDataIndexService.PREFIX) or not re.fullmatch(r"[a-z0-9_]+", index):
+            raise ValueError(f"{index} is not a submission data index")
+        with connection.cursor() as cursor:
+            cursor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {index}")
+
+    @staticmethod
+    def existing() -> list:
+        """[(index name, definition)] of the per-field indexes."""
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT indexname, indexdef FROM pg_indexes WHERE tablename = 'v1_formsubmission' "
+                "AND indexname LIKE %s ORDER BY indexname",
+                [SubmissionDataIndexService.PREFIX + "%"],
+            )
+            return cursor.fetchall()
+
+    @staticmethod
+    def stale(indexes: list) -> list:
+        """Names among `indexes` whose form version is no longer the live latest one."""
+        form_ids = {}
+        for name in indexes:
+            match = SubmissionDataIndexService.FORM_ID.match(name)
+            if match:
+                form_ids[name] = int(match.group(1))
+        live = set(
+            FormDefinition.objects.filter(id__in=set(form_ids.values()), is_latest=True, is_deleted=False)
+            .values_list("id", flat=True)
+        )
+        return [name for name, form_id in form_ids.items() if form_id not in live]
+
+class SubmissionCounterService:
+    """
+    Denormalized submission counters on FormDefinition, so form lists and the dashboard never
+    aggregate FormSubmission: submission_count/last_submitted_at of each version.
+
+    Submission writes apply deltas to their version's row inside the writer's transaction, so
+    a write only ever waits on writers of the same version. Lineage totals are derived when
+    read, with one grouped query over FormDefinition (see attach_lineage_totals). Anything that
+    bypasses these paths is repaired by `reconcile`.
+
+    The counters are served uncached by FormDefinitionViewSet.submission_counters, not in the
+    cached and ETagged form bodies, so submissions never invalidate the form response cache.
+    """
+
+    FIELDS = ("submission_count", "last_submitted_at")
+
+    @staticmethod
+    def _later(field: str, timestamp: datetime):
+        return Case(
+            When(Q(**{f"{field}__isnull": True}) | Q(**{f"{field}__lt": timestamp}), then=Value(timestamp)),
+            default=F(field),
+        )
+
+    @staticmethod
+    def record(submissions):
+        """Count new submissions: one UPDATE per form version, in id order (no lock cycles)."""
+        per_form = {}
+        for submission in submissions:
+            count, last = per_form.get(submission.form_id, (0, submission.submitted_at))
+            per_form[submission.form_id] = (count + 1, max(last, submission.submitted_at))
+        for form_id, (count, last) in sorted(per_form.items()):
+            FormDefinition.objects.filter(id=form_id).update(
+                submission_count=F("submission_count") + count,
+                last_submitted_at=SubmissionCounterService._later("last_submitted_at", last),
+            )
+
+    @staticmethod
+    def forget(submission: FormSubmission):
+        """Uncount a deleted submission; a last_submitted_at it set is looked up again."""
+        latest = FormSubmission.objects.filter(form_id=OuterRef("pk")).order_by("-submitted_at").values("submitted_at")
+        FormDefinition.objects.filter(id=submission.form_id).update(
+            submission_count=F("submission_count") - 1,
+            last_submitted_at=Case(
+                When(last_submitted_at__lte=submission.submitted_at, then=Subquery(latest[:1])),
+                default=F("last_submitted_at"),
+            ),
+        )
+
+    @staticmethod
+    def lineage_totals(forms) -> dict:
+        """{name: (submissions, last submitted_at)} over every version of the forms' lineages."""
+        names = {form.name for form in forms}
+        if not names:
+            return {}
+        rows = (
+            FormDefinition.objects.filter(name__in=names).values("name")
+            .annotate(total=Sum("submission_count"), last=Max("last_submitted_at")).order_by()
+        )
+        return {row["name"]: (row["total"] or 0, row["last"]) for row in rows}
+
+    @staticmethod
+    def attach_lineage_totals(forms):
+        """Load the lineage totals of several forms with one query and cache them on each form."""
+        forms = [form for form in forms if "_lineage_totals" not in form.__dict__]
+        totals = SubmissionCounterService.lineage_totals(forms)
+        for form in forms:
+            form._lineage_totals = totals.get(form.name, (0, None))
+
+    @staticmethod
+    def get_lineage_totals(form: FormDefinition) -> tuple:
+        """(submissions, last submitted_at) of the form's lineage; one query unless attached."""
+        SubmissionCounterService.attach_lineage_totals([form])
+        return form._lineage_totals
+
+    @staticmethod
+    @transaction.atomic
+    def reconcile(dry_run: bool = False) -> int:
+        """
+        Recompute every counter from the submissions table (one grouped query) and write the
+        versions that drifted. Returns how many there were.
+        """
+        actual = {
+            row["form_id"]: (row["count"], row["last"])
+            for row in FormSubmission.objects.values("form_id").annotate(count=Count("id"), last=Max("submitted_at")).order_by()
+        }
+        drifted = []
+        for form in FormDefinition.objects.only("id", *SubmissionCounterService.FIELDS).order_by("id"):
+            expected = actual.get(form.id, (0, None))
+            if (form.submission_count, form.last_submitted_at) != expected:
+                form.submission_count, form.last_submitted_at = expected
+                drifted.append(form)
+
+        if drifted and not dry_run:
+            FormDefinition.objects.bulk_update(drifted, SubmissionCounterService.FIELDS, batch_size=1000)
+            ChangeCounterService.bump_on_commit(FormCacheService.COUNTER)
+        return len(drifted)
+
+class JSONNumber(Func):
+    """A top-level key of a JSON column as a float; NULL unless the stored value is a JSON number."""
+
+    output_field = FloatField()
+
+    def __init__(self, column: str, key: str):
+        self.key = key
+        super().__init__(F(column))
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        column, params = compiler.compile(self.get_source_expressions()[0])
+        value = f"({column} -> %s)"
+        sql = f"CASE WHEN jsonb_typeof({value}) = 'number' THEN {value}::double precision END"
+        return sql, (*params, self.key, *params, self.key)
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        column, params = compiler.compile(self.get_source_expressions()[0])
+        path = compile_json_path([self.key])
+        sql = f"CASE WHEN json_type({column}, %s) IN ('integer', 'real') THEN json_extract({column}, %s) END"
+        return sql, (*params, path, *params, path)
+
+    def as_sql(self, compiler, connection, **extra_context):
+        raise NotSupportedError("JSONNumber is implemented for PostgreSQL and SQLite only.")
+
+
+class JSONKeyHas(Func):
+    """
+    True when the value under a top-level key of a JSON column equals `value` or, for a list,
+    contains it (so one expression counts select/radio answers and checkbox choices).
+    """
+
+    output_field = BooleanField()
+
+    def __init__(self, column: str, key: str, value):
+        self.key = key
+        self.value = value
+        super().__init__(F(column))
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        # jsonb containment: a scalar contains an equal scalar, an array contains its elements
+        column, params = compiler.compile(self.get_source_expressions()[0])
+        return f"({column} -> %s) @> %s::jsonb", (*params, self.key, json.dumps(self.value))
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        # json_each yields the elements of an array, or a single row for a scalar
+        column, params = compiler.compile(self.get_source_expressions()[0])
+        sql = f"EXISTS (SELECT 1 FROM json_each({column}, %s) AS item WHERE item.value = %s)"
+        return sql, (*params, compile_json_path([self.key]), self.value)
+
+    def as_sql(self, compiler, connection, **extra_context):
+        raise NotSupportedError("JSONKeyHas is implemented for PostgreSQL and SQLite only.")
+
+
+class JSONKeyFilled(Func):
+    """True when a top-level key of a JSON column holds an answer: not missing, null, "" or []."""
+
+    output_field = BooleanField()
+
+    def __init__(self, column: str, key: str):
+        self.key = key
+        super().__init__(F(column))
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        column, params = compiler.compile(self.get_source_expressions()[0])
+        sql = f"COALESCE(({column} -> %s) NOT IN ('null', '\"\"', '[]'), false)"
+        return sql, (*params, self.key)
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        column, params = compiler.compile(self.get_source_expressions()[0])
+        path = compile_json_path([self.key])
+        sql = (
+            f"COALESCE(json_type({column}, %s) NOT IN ('null', 'array', 'text') "
+            f"OR (json_type({column}, %s) = 'text' AND json_extract({column}, %s) <> '') "
+            f"OR (json_type({column}, %s) = 'array' AND json_array_length({column}, %s) > 0), 0)"
+        )
+        return sql, (*params, path, *params, path, *params, path, *params, path, *params, path)
+
+    def as_sql(self, compiler, connection, **extra_context):
+        raise NotSupportedError("JSONKeyFilled is implemented for PostgreSQL and SQLite only.")
+
+
+class SubmissionAnalyticsService:
+    """
+    Answer statistics for one form version, aggregated in the database over FormSubmission.data:
+    per-option counts for choice fields (select/radio/checkbox options, true/false for plain
+    checkboxes), count/min/max/mean and a histogram for number/range fields, and the fill rate
+    of every field. Two queries per call, whatever the number of fields or submissions.
+
+    A version that is no longer the latest of its lineage is closed (new submissions are
+    rejected), so its result is cached until a submission is edited or deleted.
+    """
+
+    EDIT_COUNTER = "submission-edits"
+    DEFAULT_BUCKETS = 10
+    MAX_BUCKETS = 50
+
+    @staticmethod
+    def buckets(params) -> int:
+        """Histogram bucket count from ?buckets= (ValueError if it is not a positive integer)."""
+        buckets = int(params.get("buckets", SubmissionAnalyticsService.DEFAULT_BUCKETS))
+        if buckets < 1:
+            raise ValueError(buckets)
+        return min(buckets, SubmissionAnalyticsService.MAX_BUCKETS)
+
+    @staticmethod
+    def get(form: FormDefinition, user, roles, buckets: int = DEFAULT_BUCKETS) -> dict:
+        if form.is_latest:
+            return SubmissionAnalyticsService.compute(form, user, roles, buckets)
+        # A closed version can only reopen when every newer version is destroyed, which cascades
+        # to their submissions and so bumps the edit counter too
+        scope = "all" if FormSubmissionService.sees_all(user, roles) else user.id
+        key = f"form-analytics:{FormSchemaService.cache_key(form)}:{scope}:{buckets}:" \
+            f"{ChangeCounterService.value(SubmissionAnalyticsService.EDIT_COUNTER)}"
+        analytics = cache.get(key)
+        if analytics is None:
+            analytics = SubmissionAnalyticsService.compute(form, user, roles, buckets)
+            cache.set(key, analytics, getattr(settings, "FORM_ANALYTICS_CACHE_TTL", 86400))
+        return analytics
+
+    @staticmethod
+    def compute(form: FormDefinition, user, roles, buckets: int) -> dict:
+        fields = [
+            field for field in FormSchemaService.get_fields(form)
+            if field["field_type"] in FIELD_TYPE_CHECKS or field["field_type"] in CHOICE_FIELD_TYPES
+        ]
+        # Same visibility as /forms/{id}/submissions/
+        queryset = FormSubmissionService.get_queryset(user, roles, {}, form.id).order_by()
+
+        aggregates = {"total": Count("pk")}
+        for index, field in enumerate(fields):
+            name = field["name"]
+            aggregates[f"filled_{index}"] = Count("pk", filter=Q(JSONKeyFilled("data", name)))
+            if field["field_type"] in SubmissionQueryService.NUMBER_TYPES:
+                number = JSONNumber("data", name)
+                aggregates[f"count_{index}"] = Count(number)
+                aggregates[f"min_{index}"] = Min(number)
+                aggregates[f"max_{index}"] = Max(number)
+                aggregates[f"mean_{index}"] = Avg(number)
+            for option_index, option in enumerate(SubmissionAnalyticsService.options(field)):
+                aggregates[f"option_{index}_{option_index}"] = Count("pk", filter=Q(JSONKeyHas("data", name, option)))
+        row = queryset.aggregate(**aggregates)
+
+        # Histogram edges depend on min/max, so the buckets are counted in a second query
+        edges = {}
+        histogram = {}
+        for index, field in enumerate(fields):
+            low, high = row.get(f"min_{index}"), row.get(f"max_{index}")
+            if low is None:
+                continue
+            count = buckets if high > low else 1
+            width = (high - low) / count
+            edges[index] = [(low + i * width, high if i == count - 1 else low + (i + 1) * width) for i in range(count)]
+            number = f"number_{index}"
+            queryset = queryset.alias(**{number: JSONNumber("data", field["name"])})
+            for bucket, (start, end) in enumerate(edges[index]):
+                upper = Q(**{f"{number}__lte": end}) if bucket == count - 1 else Q(**{f"{number}__lt": end})
+                histogram[f"bucket_{index}_{bucket}"] = Count("pk", filter=Q(**{f"{number}__gte": start}) & upper)
+        if histogram:
+            row.update(queryset.aggregate(**histogram))
+
+        total = row["total"]
+        results = []
+        for index, field in enumerate(fields):
+            filled = row[f"filled_{index}"]
+            result = {
+                "name": field["name"],
+                "label": field["label"],
+                "field_type": field["field_type"],
+                "required": field["required"],
+                "filled": filled,
+                "fill_rate": round(filled / total, 4) if total else None,
+            }
+            options = SubmissionAnalyticsService.options(field)
+            if options:
+                result["choices"] = [
+                    {"value": option, "count": row[f"option_{index}_{option_index}"]}
+                    for option_index, option in enumerate(options)
+                ]
+                if not SubmissionAnalyticsService.is_multi_choice(field):
+                    # Answers outside the current options (e.g. stored before an options change)
+                    result["other"] = filled - sum(choice["count"] for choice in result["choices"])
+            if field["field_type"] in SubmissionQueryService.NUMBER_TYPES:
+                mean = row[f"mean_{index}"]
+                result["stats"] = {
+                    "count": row[f"count_{index}"],
+                    "min": row[f"min_{index}"],
+                    "max": row[f"max_{index}"],
+                    "mean": round(mean, 4) if mean is not None else None,
+                }
+                result["histogram"] = [
+                    {"from": start, "to": end, "count": row[f"bucket_{index}_{bucket}"]}
+                    for bucket, (start, end) in enumerate(edges.get(index, []))
+                ]
+            results.append(result)
+
+        return {
+            "form": {"id": form.id, "name": form.name, "version": form.version, "is_latest": form.is_latest},
+            "submissions": total,
+            "fields": results,
+        }
+
+    @staticmethod
+    def options(field: dict) -> list:
+        if field["field_type"] == "checkbox" and not field.get("options"):
+            return [True, False]
+        if field["field_type"] in CHOICE_FIELD_TYPES:
+            return [o for o in field.get("options") or () if isinstance(o, (str, int, float, bool))]
+        return []
+
+    @staticmethod
+    def is_multi_choice(field: dict) -> bool:
+        return field["field_type"] == "checkbox" and bool(field.get("options"))
 
 # ==========================
 # LOGGING SERVICES
 # ==========================
 
 class AuditLogService:
-    """Service for retrieving and filtering audit logs."""
+    """
+    Service for retrieving and filtering audit logs.
+
+    Every predicate is shaped to hit an index: exact/range matches on method, status_code and
+    created_at (btree), user matches resolved to user ids first, and substring matches on
+    path/message served by the UPPER(...) gin_trgm_ops indexes from migration 0008.
+    date_from/date_to become plain created_at range predicates, which also lets Postgres prune
+    the monthly partitions (see LogPartitionService).
+    """
+
+    # field:value or field:"quoted value"
+    TOKEN_RE = re.compile(r'(\w+):("([^"]*)"|\S+)')
+    STATUS_RE = re.compile(r"(>=|<=|>|<)?(\d{3})")
 
     @staticmethod
-    def get_queryset(params):
-        queryset = AuditLog.objects.all().order_by("-created_at")
+    def parse_search(search: str):
+        """Split a search string into [(field, value), ...] tokens and the remaining free text."""
+        tokens = []
 
-        user = params.get("user")
-        method = params.get("method")
-        status_code = params.get("status_code")
+        def collect(match):
+            field = match.group(1).lower()
+            value = match.group(3) if match.group(3) is not None else match.group(2)
+            tokens.append((field, value))
+            return " "
 
-        if user:
-            if user.isdigit():
-                queryset = queryset.filter(user=user)
-            else:
-                queryset = queryset.filter(
-                    Q(user__username__icontains=user)
-                    | Q(user__email__icontains=user)
-                    | Q(user__first_name__icontains=user)
-                    | Q(user__last_name__icontains=user)
-                )
+        free_text = " ".join(AuditLogService.TOKEN_RE.sub(collect, search).split())
+        return tokens, free_text
+
+    @staticmethod
+    def user_filter(value: str) -> Q:
+        if value.isdigit():
+            return Q(user_id=int(value))
+        # The user table is small: resolve matching ids first instead of OR-ing across the join
+        user_ids = User.objects.filter(
+            Q(username__icontains=value)
+            | Q(email__icontains=value)
+            | Q(first_name__icontains=value)
+            | Q(last_name__icontains=value)
+        ).values("id")
+        return Q(user_id__in=user_ids)
+
+    @staticmethod
+    def status_filter(value: str):
+        value = value.lower()
+        if len(value) == 3 and value[0].isdigit() and value[1:] == "xx":
+            base = int(value[0]) * 100
+            return Q(status_code__gte=base, status_code__lt=base + 100)
+        match = AuditLogService.STATUS_RE.fullmatch(value)
+        if not match:
+            return None
+        lookup = {">=": "gte", "<=": "lte", ">": "gt", "<": "lt", None: "exact"}[match.group(1)]
+        return Q(**{f"status_code__{lookup}": int(match.group(2))})
+
+    @staticmethod
+    def ip_filter(value: str) -> Q:
+        try:
+            return Q(ip_address=str(ipaddress.ip_address(value)))
+        except ValueError:
+            return Q(ip_address__startswith=value)
+
+    @staticmethod
+    def date_filter(value: str, lookup: str):
+        try:
+            day = parse_date(value)
+            moment = parse_datetime(value) if day is None else None
+        except ValueError:
+            return None
+        if day is not None:
+            # A bare date covers the whole day
+            moment = datetime.combine(day, time.min)
+            if lookup == "lte":
+                moment += timedelta(days=1)
+                lookup = "lt"
+        if moment is None:
+            return None
+        if timezone.is_naive(moment):
+            moment = timezone.make_aware(moment, dt_timezone.utc)
+        return Q(**{f"created_at__{lookup}": moment})
+
+    @staticmethod
+    def token_filter(field: str, value: str):
+        """Map one field:value token to an index-friendly predicate (None = invalid value)."""
+        if field == "user":
+            return AuditLogService.user_filter(value)
+        if field == "method":
+            return Q(method=value.upper())
+        if field in ("status", "status_code"):
+            return AuditLogService.status_filter(value)
+        if field == "ip":
+            return AuditLogService.ip_filter(value)
+        if field == "path":
+            return Q(path__icontains=value)
+        if field == "message":
+            return Q(message__icontains=value)
+        if field in ("from", "since"):
+            return AuditLogService.date_filter(value, "gte")
+        if field in ("to", "until"):
+            return AuditLogService.date_filter(value, "lte")
+        return Q()  # unknown fields are ignored
+
+    @staticmethod
+    def free_text_filter(text: str) -> Q:
+        condition = AuditLogService.user_filter(text) | Q(path__icontains=text) | Q(message__icontains=text)
+        try:
+            condition |= Q(ip_address=str(ipaddress.ip_address(text)))
+        except ValueError:
+            pass
+        return condition
+
+    @staticmethod
+    def change_marker():
+        """
+        (newest id, oldest id, newest created_at) of the whole table, for ETag / Last-Modified.
+        Rows are append-only and only removed by retention from the old end, so any change to
+        any filtered view moves one of these; each is a single index probe.
+        """
+        marker = AuditLog.objects.aggregate(newest=Max("id"), oldest=Min("id"), latest=Max("created_at"))
+        return marker["newest"], marker["oldest"], marker["latest"]
+
+    @staticmethod
+    def get_queryset(params):
+        queryset = AuditLog.objects.select_related("user").order_by("-created_at")
 
-        if method:
-            queryset = queryset.filter(method__iexact=method)
-        if status_code:
-            queryset = queryset.filter(status_code=status_code)
+        tokens = [
+            (field, params.get(param))
+            for field, param in (
+                ("user", "user"), ("method", "method"), ("status", "status_code"),
+                ("from", "date_from"), ("to", "date_to"),
+            )
+            if params.get(param)
+        ]
 
         # Global search (field:value or free text)
+        free_text = ""
         search = params.get("search")
         if search:
-            # advanced query syntax like user:john status:500
-            field_queries = re.findall(r"(\w+):([^\s]+)", search)
-            for field, value in field_queries:
-                if field == "user":
-                    if value.isdigit():
-                        queryset = queryset.filter(user=value)
-                    else:
-                        queryset = queryset.filter(
-                            Q(user__username__icontains=value)
-                            | Q(user__email__icontains=value)
-                            | Q(user__first_name__icontains=value)
-                            | Q(user__last_name__icontains=value)
-                        )
-                elif field == "method":
-                    queryset = queryset.filter(method__iexact=value)
-                elif field in ["status", "status_code"]:
-                    queryset = queryset.filter(status_code=value)
-                elif field == "ip":
-                    queryset = queryset.filter(ip_address__icontains=value)
-                elif field == "path":
-                    queryset = queryset.filter(path__icontains=value)
-                elif field == "message":
-                    queryset = queryset.filter(message__icontains=value)
-
-                # remove processed part
-                search = search.replace(f"{field}:{value}", "").strip()
-
-            # fallback free text
-            if search:
-                queryset = queryset.filter(
-                      Q(user__username__icontains=search)
-                    | Q(user__email__icontains=search)
-                    | Q(user__first_name__icontains=search)
-                    | Q(user__last_name__icontains=search)
-                    | Q(path__icontains=search)
-                    | Q(message__icontains=search)
-                    | Q(ip_address__icontains=search)
-                )
-                
+            # advanced query syntax like user:john status:5xx path:"/api/v1/forms"
+            search_tokens, free_text = AuditLogService.parse_search(search)
+            tokens.extend(search_tokens)
+
+        for field, value in tokens:
+            condition = AuditLogService.token_filter(field, value)
+            if condition is None:
+                return queryset.none()
+            queryset = queryset.filter(condition)
+
+        # fallback free text
+        if free_text:
+            queryset = queryset.filter(AuditLogService.free_text_filter(free_text))
+
         return queryset
 
 class LogEntryService:
     """Service for retrieving log entries."""
 
     @staticmethod
-    def get_queryset():
-        return LogEntry.objects.all().order_by("-created_at")
+    def get_queryset(params=None):
+        queryset = LogEntry.objects.all().order_by("-created_at")
+        params = params or {}
+        for param, lookup in (("date_from", "gte"), ("date_to", "lte")):
+            if params.get(param):
+                condition = AuditLogService.date_filter(params[param], lookup)
+                if condition is None:
+                    return queryset.none()
+                queryset = queryset.filter(condition)
+        return queryset
+
+class LogPartitionService:
+    """
+    Monthly range partitions on created_at for the audit and application log tables (PostgreSQL).
+
+    Partitions are named <table>_pYYYYMM and cover [first of month, first of next month) in UTC;
+    <table>_default catches rows outside the created range. Partitions whose month is older than
+    the table's retention are detached, written to <LOG_ARCHIVE_DIR>/<partition>.ndjson.gz and
+    dropped. The tables are converted by migration 0009; `manage_log_partitions` runs the rotation.
+    """
+
+    TABLES = (AuditLog._meta.db_table, LogEntry._meta.db_table)
+    ARCHIVE_CHUNK_SIZE = 5000
+    PARTITION_RE = re.compile(r"^(?P<table>\w+)_p(?P<year>\d{4})(?P<month>\d{2})$")
+
+    @staticmethod
+    def month_start(moment: datetime) -> datetime:
+        moment = moment.astimezone(dt_timezone.utc)
+        return datetime(moment.year, moment.month, 1, tzinfo=dt_timezone.utc)
+
+    @staticmethod
+    def add_months(month: datetime, months: int) -> datetime:
+        index = month.year * 12 + month.month - 1 + months
+        return datetime(index // 12, index % 12 + 1, 1, tzinfo=dt_timezone.utc)
+
+    @staticmethod
+    def partition_name(table: str, month: datetime) -> str:
+        return f"{table}_p{month:%Y%m}"
+
+    @staticmethod
+    def parse_partition_name(name: str):
+        """Return (table, month) for a <table>_pYYYYMM name, or None."""
+        match = LogPartitionService.PARTITION_RE.match(name)
+        if not match or not 1 <= int(match.group("month")) <= 12:
+            return None
+        month = datetime(int(match.group("year")), int(match.group("month")), 1, tzinfo=dt_timezone.utc)
+        return match.group("table"), month
+
+    @staticmethod
+    def retention_cutoff(months: int, now=None):
+        """
+        Partitions ending on or before the cutoff are expired. `months` full months are always
+        kept on top of the current one; 0 (or less) disables retention.
+        """
+        if months <= 0:
+            return None
+        current = LogPartitionService.month_start(now or timezone.now())
+        return LogPartitionService.add_months(current, -months)
+
+    @staticmethod
+    def months_between(first: datetime, last: datetime):
+        month = LogPartitionService.month_start(first)
+        while month <= last:
+            yield month
+            month = LogPartitionService.add_months(month, 1)
+
+    @staticmethod
+    def expired(names, cutoff):
+        """Names of the partitions (from `names`) that end on or before `cutoff`, oldest first."""
+        if cutoff is None:
+            return []
+        expired = []
+        for name in names:
+            parsed = LogPartitionService.parse_partition_name(name)
+            if parsed and LogPartitionService.add_months(parsed[1], 1) <= cutoff:
+                expired.append((parsed[1], name))
+        return [name for _, name in sorted(expired)]
+
+    # ---- catalog lookups ----
+
+    @staticmethod
+    def is_partitioned(table: str) -> bool:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid "
+                "WHERE c.relname = %s AND c.relnamespace = current_schema()::regnamespace",
+                [table],
+            )
+            return cursor.fetchone() is not None
+
+    @staticmethod
+    def attached_partitions(table: str) -> list:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+                "WHERE i.inhparent = %s::regclass ORDER BY c.relname",
+                [table],
+            )
+            return [name for (name,) in cursor.fetchall() if LogPartitionService.parse_partition_name(name)]
+
+    @staticmethod
+    def detached_partitions(table: str) -> list:
+        """Partition-named tables no longer attached, e.g. left over by an interrupted archive run."""
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT c.relname FROM pg_class c "
+                "WHERE c.relkind = 'r' AND c.relnamespace = current_schema()::regnamespace "
+                "AND c.relname ~ %s AND NOT EXISTS (SELECT 1 FROM pg_inherits i WHERE i.inhrelid = c.oid) "
+                "ORDER BY c.relname",
+                [f"^{table}_p[0-9]{{6}}$"],
+            )
+            return [name for (name,) in cursor.fetchall()]
+
+    # ---- rotation ----
+
+    @staticmethod
+    def create_partition(table: str, month: datetime) -> str:
+        """
+        Create and attach the partition for `month`. Rows that already landed in the default
+        partition for that month are moved into it first, otherwise ATTACH would be rejected.
+        """
+        name = LogPartitionService.partition_name(table, month)
+        start, end = month, LogPartitionService.add_months(month, 1)
+        bounds = f"FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f"CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS)")
+            cursor.execute(
+                f"WITH moved AS (DELETE FROM {table}_default WHERE created_at >= %s AND created_at < %s RETURNING *) "
+                f"INSERT INTO {name} SELECT * FROM moved",
+                [start, end],
+            )
+            cursor.execute(f"ALTER TABLE {table} ATTACH PARTITION {name} FOR VALUES {bounds}")
+        return name
+
+    @staticmethod
+    def missing_months(table: str, since=None, now=None, premake=None) -> list:
+        """Months from `since` (default: now) through now + premake that have no partition yet."""
+        now = now or timezone.now()
+        if premake is None:
+            premake = settings.LOG_PARTITION_PREMAKE_MONTHS
+        last = LogPartitionService.add_months(LogPartitionService.month_start(now), premake)
+        existing = set(LogPartitionService.attached_partitions(table))
+        return [
+            month
+            for month in LogPartitionService.months_between(min(since or now, now), last)
+            if LogPartitionService.partition_name(table, month) not in existing
+        ]
+
+    @staticmethod
+    def ensure_partitions(table: str, since=None, now=None, premake=None) -> list:
+        return [
+            LogPartitionService.create_partition(table, month)
+            for month in LogPartitionService.missing_months(table, since, now, premake)
+        ]
+
+    @staticmethod
+    def expired_partitions(table: str, retention_months: int, now=None) -> list:
+        """Attached and already-detached partitions that fall outside the retention window."""
+        cutoff = LogPartitionService.retention_cutoff(retention_months, now)
+        names = LogPartitionService.attached_partitions(table) + LogPartitionService.detached_partitions(table)
+        return LogPartitionService.expired(names, cutoff)
+
+    @staticmethod
+    def apply_retention(table: str, retention_months: int, archive_dir: str, now=None) -> list:
+        """
+        Detach, archive and drop expired partitions. Returns [(partition, archive path, rows)].
+        A partition is only dropped once its archive file has been written completely.
+        """
+        attached = set(LogPartitionService.attached_partitions(table))
+        archived = []
+        for name in LogPartitionService.expired_partitions(table, retention_months, now):
+            if name in attached:
+                with connection.cursor() as cursor:
+                    cursor.execute(f"ALTER TABLE {table} DETACH PARTITION {name}")
+            path, rows = LogPartitionService.archive_partition(name, archive_dir)
+            with connection.cursor() as cursor:
+                cursor.execute(f"DROP TABLE {name}")
+            archived.append((name, path, rows))
+        return archived
+
+    # ---- archival ----
+
+    @staticmethod
+    def iter_json_rows(name: str, chunk_size=None):
+        """Yield each row of table `name` as a JSON document, in id order, one chunk per query."""
+        chunk_size = chunk_size or LogPartitionService.ARCHIVE_CHUNK_SIZE
+        last_id = -1
+        while True:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"SELECT t.id, row_to_json(t)::text FROM {name} t WHERE t.id > %s ORDER BY t.id LIMIT %s",
+                    [last_id, chunk_size],
+                )
+                rows = cursor.fetchall()
+            if not rows:
+                return
+            for _, document in rows:
+                yield document
+            last_id = rows[-1][0]
+
+    @staticmethod
+    def write_archive(path: str, documents) -> int:
+        """Write JSON documents to `path` as gzipped NDJSON; the file only appears once complete."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        partial = f"{path}.partial"
+        count = 0
+        with gzip.open(partial, "wt", encoding="utf-8") as archive:
+            for document in documents:
+                archive.write(document)
+                archive.write("\n")
+                count += 1
+        os.replace(partial, path)
+        return count
+
+    @staticmethod
+    def archive_partition(name: str, archive_dir: str):
+        path = os.path.join(archive_dir, f"{name}.ndjson.gz")
+        return path, LogPartitionService.write_archive(path, LogPartitionService.iter_json_rows(name))
 
 # ==========================
 # DASHBOARD SERVICES
 # ==========================
 
+class MetricRollupService:
+    """
+    Maintains the MetricRollup counters that back the dashboard.
+
+    Each worker thread writes to its own shard of a counter (see MetricRollup), so concurrent
+    requests do not wait on each other's row locks; `prune_metric_rollups` folds the shards of
+    closed buckets back together and drops expired hourly buckets.
+    """
+
+    EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+    @staticmethod
+    def hour_start(ts: datetime) -> datetime:
+        return ts.astimezone(dt_timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+    @staticmethod
+    def day_start(ts: datetime) -> datetime:
+        return MetricRollupService.hour_start(ts).replace(hour=0)
+
+    @staticmethod
+    def pick_shard() -> int:
+        """This worker thread's shard: stable, so each thread keeps updating the same rows."""
+        shards = max(1, getattr(settings, "METRIC_ROLLUP_SHARDS", 8))
+        return hash((os.getpid(), threading.get_ident())) % shards
+
+    @staticmethod
+    def increment(metric: str, granularity: str, bucket: datetime, delta: int = 1, form_id=None, shard: int = 0):
+        """Add `delta` to one rollup row, creating it on first use."""
+        key = {"metric": metric, "granularity": granularity, "bucket": bucket, "form_id": form_id, "shard": shard}
+        if MetricRollup.objects.filter(**key).update(count=F("count") + delta):
+            return
+        try:
+            with transaction.atomic():
+                MetricRollup.objects.create(count=delta, **key)
+        except IntegrityError:
+            # Created concurrently between our UPDATE and INSERT
+            MetricRollup.objects.filter(**key).update(count=F("count") + delta)
+
+    @staticmethod
+    def adjust_total(metric: str, delta: int, shard: int = None):
+        if shard is None:
+            shard = MetricRollupService.pick_shard()
+        MetricRollupService.increment(metric, "total", MetricRollupService.EPOCH, delta, shard=shard)
+
+    @staticmethod
+    def record_created(metric: str, created_at: datetime, count: int = 1, form_id=None):
+        """Count `count` new rows created at `created_at` in the total, hourly and daily buckets."""
+        shard = MetricRollupService.pick_shard()
+        MetricRollupService.adjust_total(metric, count, shard)
+        MetricRollupService.increment(metric, "hour", MetricRollupService.hour_start(created_at), count, shard=shard)
+        day = MetricRollupService.day_start(created_at)
+        MetricRollupService.increment(metric, "day", day, count, shard=shard)
+        if form_id is not None:
+            MetricRollupService.increment(metric, "day", day, count, form_id=form_id, shard=shard)
+
+    @staticmethod
+    def record_submissions(submissions):
+        """
+        Rollup for rows inserted with bulk_create (which sends no post_save): one UPSERT per
+        touched counter, always in the same order, all on one shard.
+        """
+        shard = MetricRollupService.pick_shard()
+        hours = Counter(MetricRollupService.hour_start(s.submitted_at) for s in submissions)
+        days = Counter(MetricRollupService.day_start(s.submitted_at) for s in submissions)
+        form_days = Counter((MetricRollupService.day_start(s.submitted_at), s.form_id) for s in submissions)
+
+        MetricRollupService.adjust_total("submissions", len(submissions), shard)
+        for hour, count in sorted(hours.items()):
+            MetricRollupService.increment("submissions", "hour", hour, count, shard=shard)
+        for day, count in sorted(days.items()):
+            MetricRollupService.increment("submissions", "day", day, count, shard=shard)
+        for (day, form_id), count in sorted(form_days.items()):
+            MetricRollupService.increment("submissions", "day", day, count, form_id=form_id, shard=shard)
+
+    @staticmethod
+    @transaction.atomic
+    def compact(now: datetime = None) -> int:
+        """
+        Fold the shards of closed hour/day buckets into shard 0 (they receive no more writes).
+        Returns the number of shard rows removed.
+        """
+        now = now or timezone.now()
+        closed = (
+            Q(granularity="hour", bucket__lt=MetricRollupService.hour_start(now))
+            | Q(granularity="day", bucket__lt=MetricRollupService.day_start(now))
+        )
+        rows = list(
+            MetricRollup.objects.select_for_update().filter(closed, shard__gt=0).order_by("id")
+            .values_list("id", "metric", "granularity", "bucket", "form_id", "count")
+        )
+        folded = Counter()
+        for _, metric, granularity, bucket, form_id, count in rows:
+            folded[(metric, granularity, bucket, form_id or 0)] += count
+        MetricRollup.objects.filter(id__in=[row[0] for row in rows]).delete()
+        for (metric, granularity, bucket, form_id), count in sorted(folded.items()):
+            MetricRollupService.increment(metric, granularity, bucket, count, form_id=form_id or None)
+        return len(rows)
+
+    @staticmethod
+    def prune(retention_days: int, now: datetime = None) -> int:
+        """Delete hourly buckets older than `retention_days` (0 keeps all); daily buckets are kept."""
+        if retention_days <= 0:
+            return 0
+        cutoff = MetricRollupService.hour_start(now or timezone.now()) - timedelta(days=retention_days)
+        deleted, _ = MetricRollup.objects.filter(granularity="hour", bucket__lt=cutoff).delete()
+        return deleted
+
+    @staticmethod
+    @transaction.atomic
+    def rebuild():
+        """Recompute every rollup from the source tables (used to reconcile drift)."""
+        Rollup = MetricRollup
+        sources = [
+            ("users", User.objects.all(), "date_joined", {}),
+            ("forms", FormDefinition.objects.all(), "created_at", {"is_deleted": False}),
+            ("submissions", FormSubmission.objects.all(), "submitted_at", {}),
+        ]
+
+        Rollup.objects.all().delete()
+        rows = []
+        for metric, queryset, field, active in sources:
+            rows.append(Rollup(
+                metric=metric, granularity="total", bucket=MetricRollupService.EPOCH,
+                count=queryset.filter(**active).count(),
+            ))
+            for granularity, trunc in (("hour", TruncHour), ("day", TruncDay)):
+                buckets = (
+                    queryset.annotate(bucket=trunc(field, tzinfo=dt_timezone.utc))
+                    .values("bucket").annotate(n=Count("id")).order_by()
+                )
+                rows.extend(
+                    Rollup(metric=metric, granularity=granularity, bucket=b["bucket"], count=b["n"])
+                    for b in buckets
+                )
+            if metric == "submissions":
+                buckets = (
+                    queryset.annotate(bucket=TruncDay(field, tzinfo=dt_timezone.utc))
+                    .values("form_id", "bucket").annotate(n=Count("id")).order_by()
+                )
+                rows.extend(
+                    Rollup(metric=metric, granularity="day", bucket=b["bucket"], form_id=b["form_id"], count=b["n"])
+                    for b in buckets
+                )
+        Rollup.objects.bulk_create(rows, batch_size=1000)
+        return len(rows)
+
+
 class DashboardService:
     """Service for aggregating dashboard metrics."""
 
+    METRICS = ("users", "forms", "submissions")
+    TOP_FORMS = 10
+
     @staticmethod
-    def get_metrics():
-        total_users = User.objects.count()
-        total_forms = FormDefinition.objects.filter(is_deleted=False).count()
-        total_submissions = FormSubmission.objects.count()
+    def get_metrics(days: int = 7, hours: int = 24):
+        """
+        Dashboard counters read from MetricRollup: a bounded number of rows regardless of table
+        sizes. The result is cached for DASHBOARD_CACHE_TTL seconds.
+        """
+        return DashboardService.get_snapshot(days, hours)[0]
 
-        return {
-            "users": {"count": total_users, "history": [5, 10, 20, 25, 30, total_users]},
-            "forms": {"count": total_forms, "history": [2, 4, 7, 8, 10, total_forms]},
-            "submissions": {
-                "count": total_submissions,
-                "history": [10, 20, 35, 40, 50, total_submissions],
-            },
-        }
+    @staticmethod
+    def get_snapshot(days: int = 7, hours: int = 24):
+        """
+        (metrics, etag, generated_at) cached together, so the validators always describe the
+        body actually served and a 304 needs nothing but a cache read.
+        """
+        snapshot = cache.get(DashboardService.snapshot_key(days, hours))
+        if snapshot is None:
+            metrics = DashboardService.build_metrics(days, hours)
+            etag = ChangeCounterService.etag(metrics)
+            snapshot = (metrics, etag, timezone.now())
+            cache.set(DashboardService.snapshot_key(days, hours), snapshot, getattr(settings, "DASHBOARD_CACHE_TTL", 30))
+        return snapshot
+
+    @staticmethod
+    async def aget_snapshot(days: int = 7, hours: int = 24):
+        """Async get_snapshot: a cache read; only a miss (once per TTL) runs the rollup queries in a thread."""
+        snapshot = await cache.aget(DashboardService.snapshot_key(days, hours))
+        if snapshot is None:
+            snapshot = await sync_to_async(DashboardService.get_snapshot)(days, hours)
+        return snapshot
+
+    @staticmethod
+    def snapshot_key(days: int, hours: int) -> str:
+        return f"dashboard-metrics:{days}:{hours}"
+
+    @staticmethod
+    def build_metrics(days: int, hours: int):
+        now = timezone.now()
+        first_day = MetricRollupService.day_start(now) - timedelta(days=days - 1)
+        first_hour = MetricRollupService.hour_start(now) - timedelta(hours=hours - 1)
+        day_buckets = [first_day + timedelta(days=i) for i in range(days)]
+        hour_buckets = [first_hour + timedelta(hours=i) for i in range(hours)]
+
+        totals = dict.fromkeys(DashboardService.METRICS, 0)
+        daily = {m: dict.fromkeys(day_buckets, 0) for m in DashboardService.METRICS}
+        hourly = {m: dict.fromkeys(hour_buckets, 0) for m in DashboardService.METRICS}
+        per_form = {}
+
+        rows = MetricRollup.objects.filter(
+            Q(granularity="total")
+            | Q(granularity="day", bucket__gte=first_day)
+            | Q(granularity="hour", bucket__gte=first_hour, form__isnull=True)
+        ).values_list("metric", "granularity", "bucket", "form_id", "count")
+
+        for metric, granularity, bucket, form_id, count in rows:
+            # A counter is the sum of its shard rows
+            if granularity == "total":
+                totals[metric] += count
+            elif form_id is not None:
+                buckets = per_form.setdefault(form_id, dict.fromkeys(day_buckets, 0))
+                buckets[bucket] = buckets.get(bucket, 0) + count
+            elif granularity == "day":
+                daily[metric][bucket] = daily[metric].get(bucket, 0) + count
+            elif bucket in hourly[metric]:
+                hourly[metric][bucket] += count
+
+        result = {}
+        for metric in DashboardService.METRICS:
+            new_per_day = list(daily[metric].values())
+            # Running total at the end of each day, ending at the current count
+            history, running = [], totals[metric]
+            for added in reversed(new_per_day):
+                history.append(running)
+                running -= added
+            result[metric] = {
+                "count": totals[metric],
+                "history": list(reversed(history)),
+                "daily": [{"date": d.date().isoformat(), "count": c} for d, c in daily[metric].items()],
+                "hourly": [{"hour": h.isoformat(), "count": c} for h, c in hourly[metric].items()],
+            }
+
+        result["submissions"]["per_form"] = DashboardService.form_rates(per_form, days, day_buckets[-1])
+        result["submissions"]["top_forms"] = DashboardService.top_forms()
+        return result
+
+    @staticmethod
+    def top_forms():
+        """Lineages with the most submissions, summed from the per-version FormDefinition counters."""
+        versions = FormDefinition.objects.filter(name=OuterRef("name")).order_by().values("name")
+        forms = (
+            FormDefinition.objects.filter(is_latest=True, is_deleted=False)
+            .annotate(
+                total=Subquery(versions.annotate(total=Sum("submission_count")).values("total")),
+                last=Subquery(versions.annotate(last=Max("last_submitted_at")).values("last")),
+            )
+            .filter(total__gt=0)
+            .order_by("-total", "id")
+            .values("id", "name", "version", "total", "last")
+        )[:DashboardService.TOP_FORMS]
+        return [
+            {
+                "form_id": form["id"],
+                "name": form["name"],
+                "version": form["version"],
+                "total": form["total"],
+                "last_submitted_at": form["last"],
+            }
+            for form in forms
+        ]
+
+    @staticmethod
+    def form_rates(per_form: dict, days: int, today: datetime):
+        ranked = sorted(per_form.items(), key=lambda item: sum(item[1].values()), reverse=True)
+        ranked = ranked[:DashboardService.TOP_FORMS]
+        names = FormDefinition.objects.in_bulk([form_id for form_id, _ in ranked])
+        rates = []
+        for form_id, buckets in ranked:
+            form = names.get(form_id)
+            if form is None:
+                continue
+            total = sum(buckets.values())
+            rates.append({
+                "form_id": form_id,
+                "name": form.name,
+                "version": form.version,
+                "today": buckets.get(today, 0),
+                "last_days": total,
+                "per_day": round(total / days, 2),
+                "total": form.submission_count,
+                "last_submitted_at": form.last_submitted_at,
+            })
+        return rates
+
+# ==========================
+# REQUEST INSTRUMENTATION
+# ==========================
+
+class _RouteStats:
+    """Counters and histogram buckets of one (route, method), guarded by RequestMetricsService._lock."""
+
+    __slots__ = ("statuses", "latency", "queries", "sizes", "latency_sum", "db_time_sum", "query_sum", "size_sum")
+
+    def __init__(self):
+        self.statuses = Counter()
+        self.latency = [0] * (len(RequestMetricsService.LATENCY_BUCKETS) + 1)
+        self.queries = [0] * (len(RequestMetricsService.QUERY_BUCKETS) + 1)
+        self.sizes = [0] * (len(RequestMetricsService.SIZE_BUCKETS) + 1)
+        self.latency_sum = 0.0
+        self.db_time_sum = 0.0
+        self.query_sum = 0
+        self.size_sum = 0
+
+    def as_dict(self) -> dict:
+        """Plain copy for the cache (see RequestMetricsService.publish)."""
+        return {name: copy.copy(getattr(self, name)) for name in self.__slots__}
+
+    def add(self, other: dict):
+        """Add the counts of another worker's as_dict() snapshot."""
+        self.statuses.update(other["statuses"])
+        for name in ("latency", "queries", "sizes"):
+            mine = getattr(self, name)
+            for index, count in enumerate(other[name][:len(mine)]):
+                mine[index] += count
+        for name in ("latency_sum", "db_time_sum", "query_sum", "size_sum"):
+            setattr(self, name, getattr(self, name) + other[name])
+
+
+class RequestMetricsService:
+    """
+    Per-route request metrics aggregated in process memory by InstrumentationMiddleware and
+    rendered in the Prometheus text format: latency, DB queries and DB time per request, response
+    size. Routes are resolved URL names, so /forms/1/ and /forms/2/ share a series.
+
+    Every worker process counts in its own registry and, at most every
+    REQUEST_METRICS_PUBLISH_INTERVAL seconds, publishes a copy to the shared cache under a slot
+    it takes once. The endpoint sums its own registry with the other workers' copies, so one
+    scrape covers every worker (up to one interval behind). Copies of workers that stopped expire
+    after REQUEST_METRICS_WORKER_TTL, which Prometheus sees as a counter reset.
+    """
+
+    LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+    QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+    SIZE_BUCKETS = (100, 1000, 10_000, 100_000, 1_000_000, 10_000_000)
+    PREFIX = "dfb"
+    CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+    SLOT_KEY = "request-metrics:slots"
+    SNAPSHOT_KEY = "request-metrics:worker:{}"
+    # Newest slots read per scrape: restarted workers take new ones
+    MAX_WORKER_SLOTS = 256
+
+    _routes = {}
+    _lock = threading.Lock()
+    _slot = None  # (pid, slot) of this worker
+    _published = 0.0
+
+    @staticmethod
+    def _bucket(bounds, value) -> int:
+        for index, bound in enumerate(bounds):
+            if value <= bound:
+                return index
+        return len(bounds)
+
+    @staticmethod
+    def record(route: str, method: str, status_code: int, duration: float, queries: int, db_time: float, size):
+        bucket = RequestMetricsService._bucket
+        latency = bucket(RequestMetricsService.LATENCY_BUCKETS, duration)
+        query_bucket = bucket(RequestMetricsService.QUERY_BUCKETS, queries)
+        size_bucket = bucket(RequestMetricsService.SIZE_BUCKETS, size) if size is not None else None
+        with RequestMetricsService._lock:
+            stats = RequestMetricsService._routes.get((route, method))
+            if stats is None:
+                stats = RequestMetricsService._routes[(route, method)] = _RouteStats()
+            stats.statuses[f"{status_code // 100}xx"] += 1
+            stats.latency[latency] += 1
+            stats.latency_sum += duration
+            stats.queries[query_bucket] += 1
+            stats.query_sum += queries
+            stats.db_time_sum += db_time
+            if size_bucket is not None:
+                stats.sizes[size_bucket] += 1
+                stats.size_sum += size
+            now = monotonic()
+            due = now - RequestMetricsService._published >= getattr(settings, "REQUEST_METRICS_PUBLISH_INTERVAL", 15)
+            if due:
+                # Claimed under the lock: one thread per worker publishes
+                RequestMetricsService._published = now
+        if due:
+            RequestMetricsService.publish()
+
+    @staticmethod
+    def reset():
+        with RequestMetricsService._lock:
+            RequestMetricsService._routes.clear()
+            RequestMetricsService._published = 0.0
+
+    @staticmethod
+    def worker_slot() -> int:
+        """This process's slot number, taken from the shared cache on first use (and after a fork)."""
+        pid = os.getpid()
+        if RequestMetricsService._slot is None or RequestMetricsService._slot[0] != pid:
+            cache.add(RequestMetricsService.SLOT_KEY, 0, timeout=None)
+            try:
+                slot = cache.incr(RequestMetricsService.SLOT_KEY)
+            except ValueError:
+                # Evicted between add and incr
+                cache.add(RequestMetricsService.SLOT_KEY, 1, timeout=None)
+                slot = 1
+            RequestMetricsService._slot = (pid, slot)
+        return RequestMetricsService._slot[1]
+
+    @staticmethod
+    def snapshot() -> dict:
+        with RequestMetricsService._lock:
+            return {key: stats.as_dict() for key, stats in RequestMetricsService._routes.items()}
+
+    @staticmethod
+    def publish():
+        """Copy this worker's registry to the shared cache for the other workers' scrapes."""
+        cache.set(
+            RequestMetricsService.SNAPSHOT_KEY.format(RequestMetricsService.worker_slot()),
+            RequestMetricsService.snapshot(),
+            getattr(settings, "REQUEST_METRICS_WORKER_TTL", 3600),
+        )
+
+    @staticmethod
+    def collect() -> list:
+        """[((route, method), _RouteStats)] summed over this worker and the others' published copies."""
+        own = RequestMetricsService.worker_slot()
+        last = cache.get(RequestMetricsService.SLOT_KEY) or 0
+        keys = [
+            RequestMetricsService.SNAPSHOT_KEY.format(slot)
+            for slot in range(max(1, last - RequestMetricsService.MAX_WORKER_SLOTS + 1), last + 1)
+            if slot != own
+        ]
+        # This worker's own registry is read live rather than from its (older) copy
+        snapshots = [RequestMetricsService.snapshot(), *cache.get_many(keys).values()]
+        routes = {}
+        for snapshot in snapshots:
+            for key, data in snapshot.items():
+                routes.setdefault(tuple(key), _RouteStats()).add(data)
+        return sorted(routes.items())
+
+    @staticmethod
+    def _labels(**labels) -> str:
+        def escape(value):
+            return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        return "{" + ",".join(f'{name}="{escape(value)}"' for name, value in labels.items()) + "}"
+
+    @staticmethod
+    def _histogram(lines, name, labels, bounds, counts, total):
+        running = 0
+        for bound, count in zip((*bounds, "+Inf"), counts):
+            running += count
+            lines.append(f"{name}_bucket{RequestMetricsService._labels(**labels, le=bound)} {running}")
+        lines.append(f"{name}_sum{RequestMetricsService._labels(**labels)} {total}")
+        lines.append(f"{name}_count{RequestMetricsService._labels(**labels)} {running}")
+
+    @staticmethod
+    def render_prometheus() -> str:
+        routes = RequestMetricsService.collect()
+
+        prefix = RequestMetricsService.PREFIX
+        families = [
+            ("http_requests_total", "counter", "Requests by resolved route, method and status class."),
+            ("http_request_duration_seconds", "histogram", "Request latency measured by InstrumentationMiddleware."),
+            ("db_queries_per_request", "histogram", "SQL statements executed per request."),
+            ("db_time_seconds_total", "counter", "Time spent executing SQL, summed over requests."),
+            ("http_response_size_bytes", "histogram", "Response body size (non-streaming responses)."),
+        ]
+        lines = []
+        for family, kind, help_text in families:
+            name = f"{prefix}_{family}"
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for (route, method), stats in routes:
+                labels = {"route": route, "method": method}
+                if family == "http_requests_total":
+                    for status, count in sorted(stats.statuses.items()):
+                        lines.append(f"{name}{RequestMetricsService._labels(**labels, status=status)} {count}")
+                elif family == "http_request_duration_seconds":
+                    RequestMetricsService._histogram(
+                        lines, name, labels, RequestMetricsService.LATENCY_BUCKETS, stats.latency, stats.latency_sum
+                    )
+                elif family == "db_queries_per_request":
+                    RequestMetricsService._histogram(
+                        lines, name, labels, RequestMetricsService.QUERY_BUCKETS, stats.queries, stats.query_sum
+                    )
+                elif family == "db_time_seconds_total":
+                    lines.append(f"{name}{RequestMetricsService._labels(**labels)} {stats.db_time_sum}")
+                else:
+                    RequestMetricsService._histogram(
+                        lines, name, labels, RequestMetricsService.SIZE_BUCKETS, stats.sizes, stats.size_sum
+                    )
+        return "\n".join(lines) + "\n"
@@ -1,7 +1,21 @@
-from django.db.models.signals import post_migrate
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db.backends.signals import connection_created
+from django.db.models.signals import m2m_changed, post_migrate, post_init, post_save, post_delete
 from django.dispatch import receiver
 from django.core.management import call_command
 
+from .middleware import install_query_counter
+from .models import FormDefinition, FormSubmission
+from .services import (
+    ChangeCounterService,
+    FormCacheService,
+    MetricRollupService,
+    RoleService,
+    SubmissionAnalyticsService,
+    SubmissionCounterService,
+)
+
 @receiver(post_migrate)
 def create_roles_after_migrate(sender, **kwargs):
     """
@@ -10,3 +24,125 @@ def create_roles_after_migrate(sender, **kwargs):
     # Only run for your API app migrations (avoid running for every contrib app)
     if sender.name == "api.v1":
         call_command("create_roles", "--api-version", "v1")
+
+# ==========================
+# TOKEN VERSIONS
+# ==========================
+
+# Role, flag and password changes made outside RoleService.assign_role (admin site, shell,
+# password change) also revoke outstanding tokens
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_token_version(sender, instance, raw=False, **kwargs):
+    if not raw:
+        RoleService.invalidate_token_version(instance.pk)
+
+@receiver(m2m_changed, sender=User.groups.through)
+def invalidate_group_token_version(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse and action == "pre_clear":
+        # group.user_set.clear(): collect the members before they are removed
+        user_ids = list(instance.user_set.values_list("id", flat=True))
+    elif action in ("post_add", "post_remove", "post_clear"):
+        user_ids = (pk_set or []) if reverse else [instance.pk]
+    else:
+        return
+    for user_id in user_ids:
+        RoleService.invalidate_token_version(user_id)
+
+# ==========================
+# CHANGE COUNTERS (response caches / ETags)
+# ==========================
+
+# Every form write (create, new version, metadata edit, soft delete, destroy) goes through
+# save()/delete() on FormDefinition (FieldDefinition rows are immutable and only reached through
+# a form's field_layout); FormService's queryset.update() calls on is_latest always run inside
+# one of those, and create_definitions bumps the counter itself, so these receivers see every change.
+@receiver(post_save, sender=FormDefinition)
+@receiver(post_delete, sender=FormDefinition)
+def bump_form_counter(sender, raw=False, **kwargs):
+    if not raw:
+        ChangeCounterService.bump_on_commit(FormCacheService.COUNTER)
+
+# Bulk ingestion bumps this counter itself (bulk_create sends no signals)
+@receiver(post_save, sender=FormSubmission)
+@receiver(post_delete, sender=FormSubmission)
+def bump_submission_counter(sender, raw=False, **kwargs):
+    if not raw:
+        ChangeCounterService.bump_on_commit("submissions")
+
+# Cached analytics of closed form versions only change through these (bulk ingestion only creates)
+@receiver(post_save, sender=FormSubmission)
+@receiver(post_delete, sender=FormSubmission)
+def bump_submission_edit_counter(sender, created=False, raw=False, **kwargs):
+    if not raw and not created:
+        ChangeCounterService.bump_on_commit(SubmissionAnalyticsService.EDIT_COUNTER)
+
+# ==========================
+# FORM SUBMISSION COUNTERS
+# ==========================
+
+# Runs in the writer's transaction (FormSubmissionViewSet.perform_create, Model.delete), so the
+# row and its form's counters commit together; bulk ingestion calls the service itself
+@receiver(post_save, sender=FormSubmission)
+def count_submission_created(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        SubmissionCounterService.record([instance])
+
+@receiver(post_delete, sender=FormSubmission)
+def count_submission_deleted(sender, instance, **kwargs):
+    SubmissionCounterService.forget(instance)
+
+# ==========================
+# DASHBOARD ROLLUPS
+# ==========================
+
+@receiver(post_save, sender=User)
+def rollup_user_created(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        MetricRollupService.record_created("users", instance.date_joined)
+
+@receiver(post_delete, sender=User)
+def rollup_user_deleted(sender, instance, **kwargs):
+    MetricRollupService.adjust_total("users", -1)
+
+@receiver(post_init, sender=FormDefinition)
+def remember_form_state(sender, instance, **kwargs):
+    # Read from __dict__ so deferred loads don't trigger a query
+    instance._loaded_is_deleted = instance.__dict__.get("is_deleted")
+
+@receiver(post_save, sender=FormDefinition)
+def rollup_form_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        # History counts every new version; the total only counts active forms
+        MetricRollupService.record_created("forms", instance.created_at)
+        if instance.is_deleted:
+            MetricRollupService.adjust_total("forms", -1)
+    elif instance._loaded_is_deleted is not None and instance._loaded_is_deleted != instance.is_deleted:
+        MetricRollupService.adjust_total("forms", -1 if instance.is_deleted else 1)
+    instance._loaded_is_deleted = instance.is_deleted
+
+@receiver(post_delete, sender=FormDefinition)
+def rollup_form_deleted(sender, instance, **kwargs):
+    if not instance.is_deleted:
+        MetricRollupService.adjust_total("forms", -1)
+
+@receiver(post_save, sender=FormSubmission)
+def rollup_submission_created(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        MetricRollupService.record_created("submissions", instance.submitted_at, form_id=instance.form_id)
+
+@receiver(post_delete, sender=FormSubmission)
+def rollup_submission_deleted(sender, instance, **kwargs):
+    MetricRollupService.adjust_total("submissions", -1)
+
+# ==========================
+# REQUEST INSTRUMENTATION
+# ==========================
+
+@receiver(connection_created)
+def instrument_connection(sender, connection, **kwargs):
+    # Counts SQL for InstrumentationMiddleware; costs one context lookup per query outside requests
+    if getattr(settings, "REQUEST_METRICS", False):
+        install_query_counter(connection)
@@ -1,7 +1,77 @@
-from django.test import TestCase
-from rest_framework.test import APIClient
-from django.contrib.auth.models import User, Group
-from api.v1.models import FormDefinition, FormSubmission
+import csv
+import gzip
+import importlib
+import io
+import json
+import logging
+import os
+import tempfile
+import threading
+from datetime import datetime, timedelta, timezone as dt_timezone
+from io import StringIO
+from unittest import mock, skipUnless
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser, Group, User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.db.models import ProtectedError, Sum
+from django.http import HttpResponse
+from django.test import AsyncRequestFactory, Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import clear_url_caches, resolve
+from django.utils import timezone
+from rest_framework.exceptions import AuthenticationFailed, ValidationError
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+
+import api.v1.urls
+import backend.urls
+from api.v1.async_views import dashboard_metrics_view, form_detail_view, form_list_view, submission_list_view
+from api.v1.authentication import StatelessJWTAuthentication, TokenBackedUser
+from api.v1.checks import check_shared_cache
+from api.v1.logging_handlers import BufferedDatabaseLogHandler
+from api.v1.middleware import AuditMiddleware, AuditRouter
+from api.v1.mixins import ConditionalGetMixin
+from api.v1.models import AuditLog, FieldDefinition, FormDefinition, FormSubmission, LogEntry, MetricRollup
+from api.v1.services import (
+    ChangeCounterService,
+    FormCacheService,
+    FormService,
+    FormSubmissionService,
+    FormValidator,
+    LogEntryService,
+    LogPartitionService,
+    MetricRollupService,
+    RequestMetricsService,
+    RoleService,
+    SubmissionCounterService,
+    SubmissionDataIndexService,
+    SubmissionQueryService,
+)
+
+
+class BaseAPITestCase(TestCase):
+    """
+    Shared fixture: an empty cache (cached responses, schemas and change counters outlive each
+    test's transaction), the three role groups and an unauthenticated API client.
+    """
+
+    PASSWORD = "pass123"
+
+    def setUp(self):
+        cache.clear()
+        self.groups = {role: Group.objects.get_or_create(name=role)[0] for role in ("Admin", "Editor", "Viewer")}
+        self.client = APIClient()
+
+    def create_user(self, username, role=None, **extra):
+        user = User.objects.create_user(username=username, password=self.PASSWORD, **extra)
+        if role is not None:
+            user.groups.add(self.groups[role])
+        return user
 
 
 class FormDefinitionAndSubmissionAPITests(TestCase):
@@ -112,3 +182,1626 @@ class FormDefinitionAndSubmissionAPITests(TestCase):
         submission = FormSubmission.objects.create(form=self.form, submitted_by=self.admin_user, data={})
         response = self.client.delete(f"/api/v1/submissions/{submission.id}/")
         self.assertEqual(response.status_code, 204)
+
+
+class RoleResolutionTests(BaseAPITestCase):
+    """
+    Role lookups are resolved once per request and shared by permissions, services and views.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.editor_user = self.create_user("editor_roles", "Editor")
+        self.form = FormDefinition.objects.create(name="Roles Form", created_by=self.editor_user)
+        self.submission = FormSubmission.objects.create(form=self.form, submitted_by=self.editor_user, data={})
+
+    def count_group_queries(self, callback):
+        with CaptureQueriesContext(connection) as ctx:
+            response = callback()
+        return response, sum(1 for q in ctx.captured_queries if "auth_group" in q["sql"])
+
+    def test_submission_detail_resolves_roles_once(self):
+        """has_permission, get_queryset and has_object_permission share a single group lookup."""
+        user = User.objects.get(pk=self.editor_user.pk)
+        self.client.force_authenticate(user=user)
+        response, group_queries = self.count_group_queries(
+            lambda: self.client.get(f"/api/v1/submissions/{self.submission.id}/")
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(group_queries, 1)
+
+    @override_settings(JWT_ROLES_FROM_TOKEN=True)
+    def test_roles_read_from_jwt_claim(self):
+        """With JWT_ROLES_FROM_TOKEN the `roles` claim replaces the group query entirely."""
+        token = self.client.post(
+            "/api/v1/auth/token/", {"username": "editor_roles", "password": self.PASSWORD}, format="json"
+        ).data["access"]
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        response, group_queries = self.count_group_queries(lambda: self.client.get("/api/v1/forms/"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(group_queries, 0)
+
+    def test_assign_role_clears_cached_roles(self):
+        self.assertEqual(RoleService.get_roles(self.editor_user), frozenset({"Editor"}))
+        RoleService.assign_role(self.editor_user, "Viewer")
+        self.assertEqual(RoleService.get_roles(self.editor_user), frozenset({"Viewer"}))
+
+
+class SubmissionFormFieldsTests(BaseAPITestCase):
+    """
+    The submissions list resolves each form schema once per response, and can omit it.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.admin_user = self.create_user("admin_schema", "Admin")
+        self.form = FormService.create_definition(name="Schema Form", created_by=self.admin_user, fields=[
+            {"name": "age", "field_type": "number", "order": 1},
+            {"name": "full_name", "field_type": "text", "order": 0},
+        ])
+        for i in range(5):
+            user = self.create_user(f"submitter_{i}")
+            FormSubmission.objects.create(form=self.form, submitted_by=user, data={"age": i})
+        self.client.force_authenticate(user=self.admin_user)
+
+    def test_form_fields_loaded_once_per_response(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get("/api/v1/submissions/")
+        self.assertEqual(response.status_code, 200)
+        field_queries = [q for q in ctx.captured_queries if "v1_fielddefinition" in q["sql"]]
+        self.assertEqual(len(field_queries), 1)
+        self.assertEqual(
+            [f["name"] for f in response.data["results"][0]["form_fields"]], ["full_name", "age"]
+        )
+
+    def test_include_fields_false_omits_schema(self):
+        response = self.client.get("/api/v1/submissions/?include_fields=false")
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("form_fields", response.data["results"][0])
+
+
+class QueryBudgetTests(BaseAPITestCase):
+    """
+    Pins the number of SQL queries per endpoint and role so N+1 regressions fail loudly.
+    Every fixture has several rows, so a per-row query would exceed the budget.
+    """
+
+    ROWS = 4
+
+    def setUp(self):
+        super().setUp()
+        self.users = {
+            role: self.create_user(f"budget_{role.lower()}", role, is_staff=role == "Admin")
+            for role in ("Admin", "Editor", "Viewer")
+        }
+
+        for i in range(self.ROWS):
+            form = FormService.create_definition(name=f"Budget Form {i}", created_by=self.users["Admin"], fields=[
+                {"name": "full_name", "field_type": "text", "order": 0},
+                {"name": "age", "field_type": "number", "order": 1},
+            ])
+            for user in self.users.values():
+                FormSubmission.objects.create(form=form, submitted_by=user, data={"age": i})
+            AuditLog.objects.create(
+                user=self.users["Admin"], method="POST", path="/api/v1/forms/", status_code=201
+            )
+        self.form = form
+        self.submission = FormSubmission.objects.filter(submitted_by=self.users["Viewer"]).first()
+
+    def assert_budget(self, role, url, queries):
+        # Fresh instance so the per-request role cache starts empty, as it would under JWT auth
+        self.client.force_authenticate(user=User.objects.get(pk=self.users[role].pk))
+        # Budgets pin the uncached path (see FormResponseCacheTests for cache hits)
+        cache.clear()
+        with self.assertNumQueries(queries):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_form_list_budget(self):
+        # roles, count, forms (+created_by join), fields prefetch
+        for role in ("Admin", "Editor", "Viewer"):
+            with self.subTest(role=role):
+                response = self.assert_budget(role, "/api/v1/forms/", 4)
+                self.assertEqual(response.data["count"], self.ROWS)
+
+    def test_form_detail_budget(self):
+        for role in ("Admin", "Editor", "Viewer"):
+            with self.subTest(role=role):
+                # roles, form, fields
+                self.assert_budget(role, f"/api/v1/forms/{self.form.id}/", 3)
+
+    def test_form_submission_counters_budget(self):
+        ids = ",".join(str(pk) for pk in FormDefinition.objects.values_list("id", flat=True))
+        for role in ("Admin", "Editor", "Viewer"):
+            with self.subTest(role=role):
+                # roles, forms, lineage submission totals
+                response = self.assert_budget(role, f"/api/v1/forms/submission-counters/?ids={ids}", 3)
+                self.assertEqual(len(response.data), self.ROWS)
+
+    def test_submission_list_budget(self):
+        # roles, count, submissions (+form and user joins), fields of every form on the page
+        for role, rows in (("Admin", self.ROWS * 3), ("Editor", self.ROWS * 3), ("Viewer", self.ROWS)):
+            with self.subTest(role=role):
+                response = self.assert_budget(role, "/api/v1/submissions/", 4)
+                self.assertEqual(response.data["count"], rows)
+
+    def test_submission_list_budget_without_fields(self):
+        for role in ("Admin", "Editor", "Viewer"):
+            with self.subTest(role=role):
+                self.assert_budget(role, "/api/v1/submissions/?include_fields=false", 3)
+
+    def test_submission_detail_budget(self):
+        for role in ("Admin", "Editor", "Viewer"):
+            with self.subTest(role=role):
+                self.assert_budget(role, f"/api/v1/submissions/{self.submission.id}/?include_fields=false", 2)
+
+    def test_user_list_budget(self):
+        # roles, count, users, groups prefetch
+        self.assert_budget("Admin", "/api/v1/users/", 4)
+
+    def test_audit_log_list_budget(self):
+        # ETag marker (max/min id), count, logs (+user join)
+        response = self.assert_budget("Admin", "/api/v1/audit-logs/", 3)
+        self.assertEqual(response.data["count"], self.ROWS)
+
+
+class LatestVersionMarkerTests(BaseAPITestCase):
+    """
+    FormDefinition.is_latest tracks the newest version of each lineage.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.admin_user = self.create_user("admin_latest", "Admin")
+        self.client.force_authenticate(user=self.admin_user)
+        self.form = FormDefinition.objects.create(name="Lineage", created_by=self.admin_user)
+
+    def create_new_version(self):
+        payload = {"fields": [{"name": "age", "field_type": "number", "order": 0}]}
+        response = self.client.patch(f"/api/v1/forms/{self.form.id}/", payload, format="json")
+        self.assertEqual(response.status_code, 200)
+        return FormDefinition.objects.get(pk=response.data["id"])
+
+    def test_structural_update_moves_latest_marker(self):
+        new_form = self.create_new_version()
+        self.form.refresh_from_db()
+        self.assertTrue(new_form.is_latest)
+        self.assertFalse(self.form.is_latest)
+
+        response = self.client.get("/api/v1/forms/")
+        self.assertEqual([f["id"] for f in response.data["results"]], [new_form.id])
+
+    def test_submission_to_outdated_version_rejected(self):
+        self.create_new_version()
+        response = self.client.post("/api/v1/submissions/", {"form": self.form.id, "data": {}}, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("version 2", str(response.data))
+
+    def test_destroying_latest_promotes_previous_version(self):
+        new_form = self.create_new_version()
+        response = self.client.delete(f"/api/v1/forms/{new_form.id}/")
+        self.assertEqual(response.status_code, 204)
+        self.form.refresh_from_db()
+        self.assertTrue(self.form.is_latest)
+
+
+class BufferedDatabaseLogHandlerTests(TestCase):
+    """
+    Audit records are queued and written in batches instead of one INSERT per record.
+    """
+
+    def make_record(self, message="POST /api/v1/forms/ -> 201"):
+        record = logging.LogRecord("audit", logging.INFO, __file__, 0, message, None, None)
+        record.audit = {"user": None, "method": "POST", "path": "/api/v1/forms/", "status_code": 201, "ip": "127.0.0.1"}
+        return record
+
+    def test_records_written_in_one_batch(self):
+        handler = BufferedDatabaseLogHandler(batch_size=10, background=False)
+        for _ in range(3):
+            handler.emit(self.make_record())
+        self.assertEqual(AuditLog.objects.count(), 0)
+
+        with self.assertNumQueries(1):
+            handler.flush()
+        self.assertEqual(AuditLog.objects.count(), 3)
+        self.assertEqual(handler.stats["written"], 3)
+        handler.close()
+
+    def test_created_at_is_the_record_time(self):
+        handler = BufferedDatabaseLogHandler(batch_size=10, background=False)
+        logged_at = timezone.now() - timedelta(minutes=5)
+        audit_record = self.make_record()
+        app_record = logging.LogRecord("api", logging.WARNING, __file__, 0, "slow query", None, None)
+        for record in (audit_record, app_record):
+            record.created = logged_at.timestamp()
+            handler.emit(record)
+        handler.flush()
+        self.assertEqual(AuditLog.objects.get().created_at, logged_at)
+        self.assertEqual(LogEntry.objects.get().created_at, logged_at)
+        handler.close()
+
+    def test_write_errors_are_counted_and_logged(self):
+        handler = BufferedDatabaseLogHandler(batch_size=10, background=False)
+        for _ in range(2):
+            handler.emit(self.make_record())
+        with mock.patch.object(AuditLog.objects, "bulk_create", side_effect=RuntimeError("db down")):
+            with self.assertLogs("api.v1.logging_handlers", "ERROR") as logs:
+                handler.flush()
+        self.assertEqual(handler.stats["failed"], 2)
+        self.assertIn("db down", logs.output[0])
+        handler.close()
+
+    def test_full_queue_drops_and_counts(self):
+        handler = BufferedDatabaseLogHandler(batch_size=10, max_queue_size=2, background=False)
+        for _ in range(3):
+            handler.emit(self.make_record())
+        self.assertEqual(handler.stats["enqueued"], 2)
+        self.assertEqual(handler.stats["dropped"], 1)
+        handler.close()
+
+    def test_background_writer_flushes_on_size_and_close(self):
+        batches = []
+        first_batch = threading.Event()
+
+        class RecordingHandler(BufferedDatabaseLogHandler):
+            def write_batch(self, batch):
+                batches.append(len(batch))
+                first_batch.set()
+
+        handler = RecordingHandler(batch_size=2, flush_interval=30)
+        for _ in range(3):
+            handler.emit(self.make_record())
+        self.assertTrue(first_batch.wait(timeout=5))
+        handler.close()
+        self.assertEqual(sum(batches), 3)
+        self.assertEqual(batches[0], 2)
+
+
+class BulkSubmissionIngestTests(BaseAPITestCase):
+    """
+    /forms/{id}/submissions/bulk/ validates a batch once and inserts it with bulk_create.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.admin_user = self.create_user("admin_bulk", "Admin")
+        self.viewer_user = self.create_user("viewer_bulk", "Viewer")
+        self.form = FormService.create_definition(
+            name="Paper Form", created_by=self.admin_user,
+            fields=[{"name": "age", "field_type": "number", "required": True}],
+        )
+        self.submitters = User.objects.bulk_create([User(username=f"paper_{i}") for i in range(20)])
+        self.url = f"/api/v1/forms/{self.form.id}/submissions/bulk/"
+
+    def test_bulk_ingest_reports_row_errors_without_aborting(self):
+        FormSubmission.objects.create(form=self.form, submitted_by=self.submitters[0], data={"age": 1})
+        rows = [{"submitted_by": u.id, "data": {"age": 30}} for u in self.submitters]
+        rows.append({"submitted_by": None, "data": {}})  # missing required field
+        rows.append({"submitted_by": self.submitters[1].id, "data": {"age": 5}})  # duplicate within batch
+
+        self.client.force_authenticate(user=self.admin_user)
+        response = self.client.post(self.url, rows, format="json")
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["created"], 19)
+        self.assertEqual([e["index"] for e in response.data["errors"]], [0, 20, 21])
+        self.assertEqual(FormSubmission.objects.filter(form=self.form).count(), 20)
+
+    def test_bulk_ingest_reports_rows_lost_to_a_concurrent_writer(self):
+        validate = FormValidator.validate_submission
+
+        def submit_concurrently(form, data):
+            # Another request commits a submission for row 2's user after the duplicate check
+            if data.get("age") == 2:
+                FormSubmission.objects.create(form=self.form, submitted_by=self.submitters[2], data={"age": 0})
+            return validate(form, data)
+
+        rows = [{"submitted_by": u.id, "data": {"age": i}} for i, u in enumerate(self.submitters[:5])]
+        rows.append({"data": {}})
+        self.client.force_authenticate(user=self.admin_user)
+        with mock.patch.object(FormValidator, "validate_submission", side_effect=submit_concurrently):
+            response = self.client.post(self.url, rows, format="json")
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["created"], 4)
+        self.assertEqual([e["index"] for e in response.data["errors"]], [2, 5])
+        self.assertEqual(FormSubmission.objects.filter(form=self.form).count(), 5)
+        self.assertEqual(FormDefinition.objects.get(pk=self.form.pk).submission_count, 5)
+
+    def test_bulk_ingest_query_count_is_independent_of_batch_size(self):
+        # Warm the global dashboard rollup buckets with an import into another form
+        other = FormService.create_definition(
+            name="Other Paper Form", created_by=self.admin_user, fields=[{"name": "age", "field_type": "number"}]
+        )
+        self.client.force_authenticate(user=self.admin_user)
+        self.client.post(f"/api/v1/forms/{other.id}/submissions/bulk/", [{"data": {"age": 1}}], format="json")
+
+        rows = [{"submitted_by": u.id, "data": {"age": i}} for i, u in enumerate(self.submitters)]
+        self.client.force_authenticate(user=User.objects.get(pk=self.admin_user.pk))
+        # roles, form, fields (validator compile), users, duplicates, insert (+ savepoint pair),
+        # 3 global rollup counters, new per-form rollup row (update + savepoint pair + insert),
+        # version submission counter, audit row
+        with self.assertNumQueries(17):
+            response = self.client.post(self.url, rows, format="json")
+        self.assertEqual(response.data["created"], len(self.submitters))
+
+    def test_non_admin_cannot_import_for_other_users(self):
+        self.client.force_authenticate(user=self.viewer_user)
+        rows = [{"data": {"age": 1}}, {"submitted_by": self.submitters[0].id, "data": {"age": 2}}]
+        response = self.client.post(self.url, rows, format="json")
+        self.assertEqual(response.data["created"], 1)
+        self.assertEqual(response.data["errors"][0]["index"], 1)
+        self.assertTrue(FormSubmission.objects.filter(submitted_by=self.viewer_user).exists())
+
+
+class CompiledFormValidatorTests(TestCase):
+    """
+    FormValidator compiles each form version once and validates every declared field type.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="validator_owner", password="pass123")
+        specs = [
+            ("email", "email", None), ("site", "url", None), ("born", "date", None),
+            ("meeting", "datetime-local", None), ("alarm", "time", None), ("month", "month", None),
+            ("week", "week", None), ("color", "color", None), ("phone", "tel", None),
+            ("score", "range", None), ("age", "number", None), ("agree", "checkbox", None),
+            ("tags", "checkbox", ["a", "b"]), ("size", "radio", ["S", "M"]), ("gender", "select", ["M", "F"]),
+        ]
+        fields = [
+            {"name": name, "field_type": field_type, "options": options, "order": order}
+            for order, (name, field_type, options) in enumerate(specs)
+        ]
+        fields.append({"name": "full_name", "field_type": "text", "required": True, "order": 99})
+        self.form = FormService.create_definition(name="Typed Form", created_by=self.user, fields=fields)
+
+    def validate(self, data):
+        try:
+            FormValidator.validate_submission(self.form, data)
+        except ValidationError as e:
+            return set(e.detail)
+        return set()
+
+    def test_valid_values_for_every_type(self):
+        valid = {
+            "full_name": "Ana", "email": "ana@example.com", "site": "https://example.com", "born": "1990-05-01",
+            "meeting": "2025-01-01T10:30", "alarm": "08:15", "month": "2025-02", "week": "2025-W07",
+            "color": "#a1b2c3", "phone": "+506 8888-8888", "score": 7, "age": 30, "agree": True,
+            "tags": ["a", "b"], "size": "M", "gender": "F",
+        }
+        self.assertEqual(self.validate(valid), set())
+
+    def test_invalid_values_for_every_type(self):
+        invalid = {
+            "email": "nope", "site": "not a url", "born": "1990-13-01", "meeting": "tomorrow", "alarm": "25:00",
+            "month": "2025-13", "week": "2025-W60", "color": "red", "phone": "call me", "score": "high",
+            "age": "30", "agree": "yes", "tags": ["c"], "size": "XL", "gender": ["M"],
+        }
+        self.assertEqual(self.validate(invalid), set(invalid) | {"full_name"})
+
+    def test_compiled_once_per_version(self):
+        FormValidator.clear_cache()
+        self.validate({"full_name": "Ana"})
+        with self.assertNumQueries(0):
+            self.validate({"full_name": "Ana"})
+
+
+class KeysetPaginationTests(BaseAPITestCase):
+    """
+    ?pagination=cursor switches submissions and audit logs to keyset pagination on (timestamp, id).
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.admin_user = self.create_user("admin_keyset", "Admin", is_staff=True)
+        self.form = FormDefinition.objects.create(name="Keyset Form", created_by=self.admin_user)
+        submitters = User.objects.bulk_create([User(username=f"keyset_{i}") for i in range(7)])
+        FormSubmission.objects.bulk_create([
+            FormSubmission(form=self.form, submitted_by=u, data={}, form_version=1) for u in submitters
+        ])
+        # Force timestamp ties so the id tiebreaker matters
+        FormSubmission.objects.update(submitted_at=timezone.now())
+        AuditLog.objects.bulk_create([
+            AuditLog(method="POST", path="/api/v1/forms/", status_code=201) for _ in range(3)
+        ])
+        self.client.force_authenticate(user=self.admin_user)
+
+    def walk(self, url):
+        ids = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            ids.extend(row["id"] for row in response.data["results"])
+            url = response.data["next"]
+        return ids
+
+    def test_walks_every_submission_once_in_order(self):
+        ids = self.walk("/api/v1/submissions/?pagination=cursor&page_size=2&include_fields=false")
+        expected = list(FormSubmission.objects.order_by("-submitted_at", "-id").values_list("id", flat=True))
+        self.assertEqual(ids, expected)
+
+    def test_cursor_pages_skip_count_unless_requested(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get("/api/v1/audit-logs/?pagination=cursor")
+        self.assertIsNone(response.data["count"])
+        self.assertFalse(any("COUNT(" in q["sql"] for q in ctx.captured_queries))
+
+        response = self.client.get("/api/v1/audit-logs/?pagination=cursor&count=exact")
+        self.assertEqual(response.data["count"], 3)
+
+    def test_cursor_mode_rejects_ordering(self):
+        response = self.client.get("/api/v1/audit-logs/?pagination=cursor&ordering=status_code")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("ordering", response.data)
+        # Page-number mode still honours it
+        response = self.client.get("/api/v1/audit-logs/?ordering=status_code")
+        self.assertEqual(response.status_code, 200)
+
+    def test_invalid_cursor_returns_404(self):
+        response = self.client.get("/api/v1/submissions/?cursor=not-a-cursor")
+        self.assertEqual(response.status_code, 404)
+
+    def test_page_number_pagination_is_still_default(self):
+        response = self.client.get("/api/v1/submissions/?page=2&page_size=5")
+        self.assertEqual(response.data["count"], 7)
+        self.assertEqual(len(response.data["results"]), 2)
+
+
+class SubmissionExportTests(BaseAPITestCase):
+    """
+    /forms/{id}/submissions/export/ streams submissions flattened into one column per field.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.editor_user = self.create_user("editor_export", "Editor")
+        self.form = FormService.create_definition(name="Export Form", created_by=self.editor_user, fields=[
+            {"name": "age", "field_type": "number", "order": 1},
+            {"name": "full_name", "field_type": "text", "order": 0},
+            {"name": "send", "field_type": "submit", "order": 2},
+        ])
+        FormSubmission.objects.create(form=self.form, submitted_by=self.editor_user, data={"full_name": "Ana", "age": 31})
+        FormSubmission.objects.create(form=self.form, submitted_by=None, data={"full_name": "Luis, Jr."})
+        self.client.force_authenticate(user=self.editor_user)
+        self.url = f"/api/v1/forms/{self.form.id}/submissions/export/"
+
+    def read(self, response):
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return b"".join(response.streaming_content).decode()
+
+    def test_csv_export(self):
+        rows = list(csv.reader(io.StringIO(self.read(self.client.get(self.url)))))
+        self.assertEqual(rows[0], ["submission_id", "submitted_by", "submitted_at", "form_version", "full_name", "age"])
+        self.assertEqual([r[4:] for r in rows[1:]], [["Ana", "31"], ["Luis, Jr.", ""]])
+        self.assertEqual(rows[1][1], "editor_export")
+
+    def test_csv_export_neutralizes_formulas(self):
+        FormSubmission.objects.create(form=self.form, submitted_by=None, data={"full_name": "=HYPERLINK(\"x\")", "age": -3})
+        FormSubmission.objects.create(form=self.form, submitted_by=None, data={"full_name": "@SUM(A1)", "age": 1})
+        rows = list(csv.reader(io.StringIO(self.read(self.client.get(self.url)))))
+        # Text cells are quoted; numbers (even negative ones) are left as they are
+        self.assertEqual([r[4:] for r in rows[3:]], [["'=HYPERLINK(\"x\")", "-3"], ["'@SUM(A1)", "1"]])
+
+    def test_ndjson_export(self):
+        lines = self.read(self.client.get(self.url + "?export_format=ndjson")).splitlines()
+        records = [json.loads(line) for line in lines]
+        self.assertEqual(records[0]["full_name"], "Ana")
+        self.assertEqual(records[0]["age"], 31)
+        self.assertIsNone(records[1]["age"])
+        self.assertNotIn("send", records[0])
+
+    def test_deleted_form_export_is_admin_only(self):
+        FormDefinition.objects.filter(pk=self.form.pk).update(is_deleted=True)
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+        self.client.force_authenticate(user=self.create_user("admin_export", "Admin"))
+        rows = list(csv.reader(io.StringIO(self.read(self.client.get(self.url)))))
+        self.assertEqual(len(rows), 3)
+
+    def test_export_requires_form_route(self):
+        response = self.client.get("/api/v1/submissions/export/")
+        self.assertEqual(response.status_code, 400)
+
+
+class DashboardRollupTests(BaseAPITestCase):
+    """
+    Dashboard metrics come from MetricRollup counters maintained on insert/delete.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.user = self.create_user("dashboard_user")
+        self.form = FormDefinition.objects.create(name="Dashboard Form", created_by=self.user)
+        self.deleted_form = FormDefinition.objects.create(name="Retired Form", created_by=self.user)
+        self.deleted_form.is_deleted = True
+        self.deleted_form.save()
+        self.submissions = [
+            FormSubmission.objects.create(form=self.form, submitted_by=u, data={})
+            for u in [User.objects.create(username=f"dash_{i}") for i in range(3)]
+        ]
+        self.submissions[0].delete()
+        self.client.force_authenticate(user=self.user)
+
+    def test_metrics_from_rollups(self):
+        with self.assertNumQueries(3):  # rollup rows, per-form names, top forms (FormDefinition counters)
+            response = self.client.get("/api/v1/dashboard/metrics/")
+        data = response.data
+        self.assertEqual(data["users"]["count"], User.objects.count())
+        self.assertEqual(data["forms"]["count"], 1)
+        self.assertEqual(data["submissions"]["count"], 2)
+        self.assertEqual(len(data["submissions"]["history"]), 7)
+        self.assertEqual(data["submissions"]["history"][-1], 2)
+        self.assertEqual(data["submissions"]["daily"][-1]["count"], 3)
+        self.assertEqual(data["submissions"]["per_form"][0]["form_id"], self.form.id)
+        self.assertEqual(data["submissions"]["top_forms"][0]["total"], 2)
+
+        # Cached for DASHBOARD_CACHE_TTL
+        with self.assertNumQueries(0):
+            self.client.get("/api/v1/dashboard/metrics/")
+        cache.clear()
+
+    def totals(self):
+        rows = MetricRollup.objects.filter(granularity="total").values("metric").annotate(n=Sum("count"))
+        return {row["metric"]: row["n"] for row in rows}
+
+    def test_rebuild_matches_incremental_totals(self):
+        incremental = self.totals()
+        call_command("rebuild_metric_rollups", stdout=StringIO())
+        self.assertEqual(incremental, self.totals())
+
+    @override_settings(METRIC_ROLLUP_SHARDS=4)
+    def test_prune_folds_shards_and_drops_expired_hours(self):
+        old = timezone.now() - timedelta(days=30)
+        yesterday = timezone.now() - timedelta(days=1)
+        for shard in range(4):
+            MetricRollupService.increment("submissions", "hour", MetricRollupService.hour_start(old), 1, shard=shard)
+            MetricRollupService.increment("submissions", "day", MetricRollupService.day_start(yesterday), 2, shard=shard)
+        totals = self.totals()
+
+        call_command("prune_metric_rollups", "--retention=7", stdout=StringIO())
+
+        self.assertFalse(MetricRollup.objects.filter(granularity="hour", bucket__lt=yesterday - timedelta(days=7)).exists())
+        day = MetricRollup.objects.filter(
+            metric="submissions", granularity="day", bucket=MetricRollupService.day_start(yesterday), form=None
+        )
+        self.assertEqual(list(day.values_list("shard", "count")), [(0, 8)])
+        # Totals and today's buckets are untouched
+        self.assertEqual(totals, self.totals())
+        today = MetricRollup.objects.filter(
+            metric="submissions", granularity="day", bucket=MetricRollupService.day_start(timezone.now()), form=None
+        )
+        self.assertEqual(today.aggregate(n=Sum("count"))["n"], 3)
+
+
+class AuditLogSearchTests(BaseAPITestCase):
+    """
+    AuditLogService maps search tokens to index-friendly predicates.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.admin_user = self.create_user("search_admin", is_staff=True)
+        self.alice = User.objects.create(username="alice", email="alice@example.com")
+        AuditLog.objects.bulk_create([
+            AuditLog(user=self.alice, method="POST", path="/api/v1/forms/", status_code=201,
+                     message="POST /api/v1/forms/ -> 201", ip_address="10.0.0.1"),
+            AuditLog(user=None, method="DELETE", path="/api/v1/submissions/9/", status_code=403,
+                     message="DELETE /api/v1/submissions/9/ -> 403", ip_address="10.0.0.2"),
+            AuditLog(user=None, method="PATCH", path="/api/v1/users/3/", status_code=500,
+                     message="PATCH /api/v1/users/3/ -> 500", ip_address="192.168.1.5"),
+        ])
+        self.client.force_authenticate(user=self.admin_user)
+
+    def search(self, query):
+        response = self.client.get("/api/v1/audit-logs/", {"search": query})
+        self.assertEqual(response.status_code, 200)
+        return sorted(row["path"] for row in response.data["results"])
+
+    def test_tokens(self):
+        self.assertEqual(self.search("user:ali"), ["/api/v1/forms/"])
+        self.assertEqual(self.search("method:delete"), ["/api/v1/submissions/9/"])
+        self.assertEqual(self.search("status:4xx"), ["/api/v1/submissions/9/"])
+        self.assertEqual(self.search("status:>=403"), ["/api/v1/submissions/9/", "/api/v1/users/3/"])
+        self.assertEqual(self.search("ip:192.168.1.5"), ["/api/v1/users/3/"])
+        self.assertEqual(self.search('message:"-> 500"'), ["/api/v1/users/3/"])
+        self.assertEqual(self.search("status:abc"), [])
+
+    def test_free_text_and_combined(self):
+        self.assertEqual(self.search("submissions"), ["/api/v1/submissions/9/"])
+        self.assertEqual(self.search("alice"), ["/api/v1/forms/"])
+        self.assertEqual(self.search("method:patch users"), ["/api/v1/users/3/"])
+
+    def test_date_range(self):
+        today = timezone.now().date()
+        response = self.client.get("/api/v1/audit-logs/", {"date_from": today.isoformat(), "date_to": today.isoformat()})
+        self.assertEqual(response.data["count"], 3)
+        response = self.client.get("/api/v1/audit-logs/", {"date_to": (today - timedelta(days=1)).isoformat()})
+        self.assertEqual(response.data["count"], 0)
+
+
+class LogPartitionServiceTests(TestCase):
+    """
+    Month arithmetic, retention selection and archive writing behind `manage_log_partitions`.
+    The partition DDL itself only runs on PostgreSQL.
+    """
+
+    def month(self, year, month):
+        return datetime(year, month, 1, tzinfo=dt_timezone.utc)
+
+    def test_month_helpers(self):
+        self.assertEqual(LogPartitionService.add_months(self.month(2026, 11), 3), self.month(2027, 2))
+        self.assertEqual(LogPartitionService.add_months(self.month(2026, 1), -1), self.month(2025, 12))
+        self.assertEqual(LogPartitionService.partition_name("v1_auditlog", self.month(2026, 3)), "v1_auditlog_p202603")
+        self.assertEqual(LogPartitionService.parse_partition_name("v1_auditlog_p202603"), ("v1_auditlog", self.month(2026, 3)))
+        self.assertIsNone(LogPartitionService.parse_partition_name("v1_auditlog_default"))
+        self.assertIsNone(LogPartitionService.parse_partition_name("v1_auditlog_p202613"))
+
+    def test_expired_partitions(self):
+        now = datetime(2026, 10, 17, 12, tzinfo=dt_timezone.utc)
+        cutoff = LogPartitionService.retention_cutoff(3, now)
+        self.assertEqual(cutoff, self.month(2026, 7))
+        names = ["v1_logentry_p202607", "v1_logentry_p202606", "v1_logentry_default", "v1_logentry_p202510"]
+        self.assertEqual(LogPartitionService.expired(names, cutoff), ["v1_logentry_p202510", "v1_logentry_p202606"])
+        self.assertEqual(LogPartitionService.expired(names, LogPartitionService.retention_cutoff(0, now)), [])
+
+    def test_write_archive(self):
+        with tempfile.TemporaryDirectory() as archive_dir:
+            path = os.path.join(archive_dir, "nested", "v1_auditlog_p202601.ndjson.gz")
+            rows = LogPartitionService.write_archive(path, (json.dumps({"id": i}) for i in range(3)))
+            self.assertEqual(rows, 3)
+            self.assertEqual(os.listdir(os.path.dirname(path)), ["v1_auditlog_p202601.ndjson.gz"])
+            with gzip.open(path, "rt", encoding="utf-8") as archive:
+                self.assertEqual([json.loads(line)["id"] for line in archive], [0, 1, 2])
+
+    def test_command_requires_postgres(self):
+        if connection.vendor == "postgresql":
+            self.skipTest("Vendor guard only applies to non-PostgreSQL databases")
+        with self.assertRaises(CommandError):
+            call_command("manage_log_partitions", "--dry-run")
+
+    def test_log_entry_date_range(self):
+        LogEntry.objects.create(level="INFO", message="hello", logger_name="app")
+        today = timezone.now().date()
+        self.assertEqual(LogEntryService.get_queryset({"date_from": today.isoformat()}).count(), 1)
+        self.assertEqual(LogEntryService.get_queryset({"date_to": (today - timedelta(days=1)).isoformat()}).count(), 0)
+        self.assertEqual(LogEntryService.get_queryset({"date_from": "not-a-date"}).count(), 0)
+
+
+
+@skipUnless(connection.vendor == "postgresql", "Log partitioning runs on PostgreSQL only")
+class LogPartitionPostgresTests(TestCase):
+    """
+    Migration 0009 converted the log tables (the test database is built by running it), later
+    migrations altered the partitioned parents, and `manage_log_partitions` rotates them.
+    Runs in CI against the PostgreSQL service.
+    """
+
+    def test_log_tables_are_partitioned_with_current_columns(self):
+        for table in LogPartitionService.TABLES:
+            self.assertTrue(LogPartitionService.is_partitioned(table))
+            self.assertTrue(LogPartitionService.attached_partitions(table))
+        # Columns added by 0013 on the parent reach every partition
+        log = AuditLog.objects.create(method="POST", path="/api/v1/forms/", status_code=201, duration_ms=1.5, sample_rate=0.5)
+        self.assertEqual(AuditLog.objects.values_list("duration_ms", "sample_rate").get(pk=log.pk), (1.5, 0.5))
+
+    def test_rotation_moves_default_rows_then_archives_and_drops(self):
+        table = AuditLog._meta.db_table
+        old_month = LogPartitionService.add_months(LogPartitionService.month_start(timezone.now()), -24)
+        log = AuditLog.objects.create(method="DELETE", path="/api/v1/forms/1/", status_code=204)
+        # Older than any partition: the row moves to <table>_default
+        AuditLog.objects.filter(pk=log.pk).update(created_at=old_month + timedelta(days=3))
+
+        self.assertEqual(LogPartitionService.create_partition(table, old_month), LogPartitionService.partition_name(table, old_month))
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT count(*) FROM {LogPartitionService.partition_name(table, old_month)}")
+            self.assertEqual(cursor.fetchone()[0], 1)
+
+        with tempfile.TemporaryDirectory() as archive_dir:
+            out = StringIO()
+            call_command(
+                "manage_log_partitions", f"--table={table}", "--retention=12",
+                f"--archive-dir={archive_dir}", stdout=out,
+            )
+            path = os.path.join(archive_dir, f"{LogPartitionService.partition_name(table, old_month)}.ndjson.gz")
+            with gzip.open(path, "rt", encoding="utf-8") as archive:
+                self.assertEqual(len(archive.readlines()), 1)
+        self.assertNotIn(LogPartitionService.partition_name(table, old_month), LogPartitionService.attached_partitions(table))
+        self.assertFalse(AuditLog.objects.filter(pk=log.pk).exists())
+
+class FormResponseCacheTests(BaseAPITestCase):
+    """
+    GET /forms/ and /forms/{id}/ are served from FormCacheService until a form write bumps
+    its generation; ETags allow 304 answers.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.admin_user = self.create_user("cache_admin", "Admin", is_staff=True)
+        self.viewer = self.create_user("cache_viewer", "Viewer")
+        self.form = FormService.create_definition(
+            name="Cached", created_by=self.admin_user, fields=[{"name": "q1", "field_type": "text"}]
+        )
+        self.deleted = FormDefinition.objects.create(name="Gone", created_by=self.admin_user, is_deleted=True)
+
+    def get(self, user, url, **headers):
+        # Fresh instance so the per-request role cache starts empty
+        user = User.objects.get(pk=user.pk)
+        self.client.force_authenticate(user=user)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, headers=headers)
+        response.query_count = len(queries)
+        return response
+
+    def test_cache_hit_and_etag(self):
+        url = f"/api/v1/forms/{self.form.id}/"
+        first = self.get(self.viewer, url)
+        self.assertEqual(first.status_code, 200)
+        # Only the role lookup runs on a hit
+        second = self.get(self.viewer, url)
+        self.assertEqual(second.query_count, 1)
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(second["ETag"], first["ETag"])
+
+        not_modified = self.get(self.viewer, url, **{"If-None-Match": first["ETag"]})
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified.query_count, 1)
+
+    @override_settings(APP_SERVER_WORKERS=3)
+    def test_bodies_not_cached_on_a_per_process_cache(self):
+        url = f"/api/v1/forms/{self.form.id}/"
+        first = self.get(self.viewer, url)
+        second = self.get(self.viewer, url)
+        self.assertGreater(second.query_count, 1)
+        self.assertEqual(second.data, first.data)
+
+    def test_scope_separates_admin_and_member_views(self):
+        url = "/api/v1/forms/?state=deleted"
+        self.assertEqual(self.get(self.viewer, url).data["count"], 1)
+        admin_response = self.get(self.admin_user, url)
+        self.assertEqual([row["name"] for row in admin_response.data["results"]], ["Gone"])
+
+    def test_writes_invalidate(self):
+        list_url = "/api/v1/forms/"
+        detail_url = f"/api/v1/forms/{self.form.id}/"
+        etag = self.get(self.admin_user, detail_url)["ETag"]
+        self.assertEqual(self.get(self.admin_user, list_url).data["count"], 2)
+
+        self.client.force_authenticate(user=self.admin_user)
+        # metadata update
+        self.client.patch(detail_url, {"description": "changed"}, format="json")
+        response = self.get(self.admin_user, detail_url, **{"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["description"], "changed")
+
+        # create
+        self.client.post(list_url, {"name": "Fresh", "fields": []}, format="json")
+        self.assertEqual(self.get(self.admin_user, list_url).data["count"], 3)
+
+        # soft delete, then destroy
+        self.client.patch(detail_url, {"is_deleted": True}, format="json")
+        self.assertEqual(self.get(self.viewer, list_url).data["count"], 1)
+        self.client.force_authenticate(user=self.admin_user)
+        self.client.delete(detail_url)
+        self.assertEqual(self.get(self.admin_user, detail_url).status_code, 404)
+
+
+class ConditionalGetTests(BaseAPITestCase):
+    """
+    Submissions, audit logs and dashboard metrics answer 304 while their validators match.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.admin_user = self.create_user("cond_admin", "Admin", is_staff=True)
+        self.form = FormDefinition.objects.create(name="Conditional", created_by=self.admin_user)
+        self.submit()
+        self.client.force_authenticate(user=self.admin_user)
+
+    def submit(self):
+        # One submission per user and form version, so each comes from a new user
+        user = User.objects.create(username=f"cond_user_{FormSubmission.objects.count()}")
+        return FormSubmission.objects.create(form=self.form, submitted_by=user, data={})
+
+    def assert_revalidates(self, url, change):
+        first = self.client.get(url)
+        self.assertEqual(first.status_code, 200)
+        self.assertIn("ETag", first)
+        again = self.client.get(url, headers={"If-None-Match": first["ETag"]})
+        self.assertEqual(again.status_code, 304)
+        self.assertEqual(again.content, b"")
+
+        change()
+        changed = self.client.get(url, headers={"If-None-Match": first["ETag"]})
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed["ETag"], first["ETag"])
+        return first
+
+    def test_submissions(self):
+        url = f"/api/v1/forms/{self.form.id}/submissions/"
+        self.assert_revalidates(url, self.submit)
+        # Bulk ingestion sends no signals but bumps the counter itself
+        etag = self.client.get(url)["ETag"]
+        FormSubmissionService.bulk_ingest([{"data": {}}], self.admin_user, form_id=self.form.id)
+        self.assertEqual(self.client.get(url, headers={"If-None-Match": etag}).status_code, 200)
+
+    def test_audit_logs(self):
+        def log():
+            AuditLog.objects.create(method="POST", path="/api/v1/forms/", status_code=201)
+
+        log()
+        last_modified = self.client.get("/api/v1/audit-logs/")["Last-Modified"]
+        since = self.client.get("/api/v1/audit-logs/", headers={"If-Modified-Since": last_modified})
+        self.assertEqual(since.status_code, 304)
+        self.assert_revalidates("/api/v1/audit-logs/?search=status:201", log)
+
+    def test_dashboard(self):
+        def change():
+            self.submit()
+            cache.clear()   # let the snapshot expire
+
+        self.assert_revalidates("/api/v1/dashboard/metrics/", change)
+
+    def test_views_without_validators_serve_plain_gets(self):
+        request = APIRequestFactory().get("/", HTTP_IF_NONE_MATCH='"stale"')
+        response = ConditionalGetMixin().conditional_response(request, lambda: HttpResponse(b"body"))
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("ETag", response)
+
+    def test_several_workers_require_a_shared_cache(self):
+        self.assertEqual(check_shared_cache(None), [])
+        with override_settings(APP_SERVER_WORKERS=3):
+            self.assertEqual([error.id for error in check_shared_cache(None)], ["api.E001"])
+        redis = {"default": {"BACKEND": "django.core.cache.backends.redis.RedisCache", "LOCATION": "redis://cache:6379/0"}}
+        with override_settings(APP_SERVER_WORKERS=3, CACHES=redis):
+            self.assertEqual(check_shared_cache(None), [])
+
+
+class StatelessJWTAuthenticationTests(BaseAPITestCase):
+    """
+    StatelessJWTAuthentication serves reads from token claims and revokes tokens once the
+    user's roles, flags or password change.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.user = self.create_user("stateless", "Editor", email="stateless@example.com", is_staff=True)
+        self.token = self.client.post(
+            "/api/v1/auth/token/", {"username": "stateless", "password": self.PASSWORD}, format="json"
+        ).data["access"]
+
+    def authenticate(self, method="get"):
+        django_request = getattr(APIRequestFactory(), method)("/", HTTP_AUTHORIZATION=f"Bearer {self.token}")
+        return StatelessJWTAuthentication().authenticate(Request(django_request))
+
+    def test_read_request_uses_token_claims(self):
+        self.authenticate()   # warm the token-version cache
+        with self.assertNumQueries(0):
+            user, _ = self.authenticate()
+            self.assertIsInstance(user, TokenBackedUser)
+            self.assertEqual((user.id, user.username, user.is_staff), (self.user.id, "stateless", True))
+            self.assertEqual(RoleService.get_roles(user), frozenset({"Editor"}))
+        # ORM-only attributes hydrate the User row once
+        with self.assertNumQueries(1):
+            self.assertEqual(user.email, "stateless@example.com")
+            self.assertEqual(user.date_joined, self.user.date_joined)
+
+    def test_write_request_loads_model_user(self):
+        user, _ = self.authenticate("post")
+        self.assertIsInstance(user, User)
+
+    def test_role_change_revokes_token(self):
+        self.authenticate()
+        RoleService.assign_role(self.user, "Viewer")
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+
+    def test_token_version_ttl_is_short_without_a_shared_cache(self):
+        self.assertEqual(RoleService.token_version_ttl(), settings.JWT_TOKEN_VERSION_TTL)
+        with override_settings(APP_SERVER_WORKERS=3):
+            self.assertEqual(RoleService.token_version_ttl(), settings.JWT_TOKEN_VERSION_LOCAL_TTL)
+
+    def test_password_change_and_deactivation_revoke_token(self):
+        self.authenticate()
+        self.user.set_password("changed123")
+        self.user.save()
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+
+
+class AsyncReadViewTests(BaseAPITestCase):
+    """
+    The async read views (ASYNC_READ_VIEWS) answer like the DRF viewsets and pass other methods through.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.viewer = self.create_user("async_viewer", "Viewer")
+        self.nobody = self.create_user("async_nobody")
+        self.form = FormService.create_definition(
+            name="Async", created_by=self.viewer, fields=[{"name": "q1", "field_type": "text"}]
+        )
+        for index in range(3):
+            FormDefinition.objects.create(name=f"Async {index}", created_by=self.viewer)
+        FormSubmission.objects.create(form=self.form, form_version=1, submitted_by=self.viewer, data={"q1": "a"})
+        self.token = self.access_token("async_viewer")
+
+    def access_token(self, username):
+        return APIClient().post(
+            "/api/v1/auth/token/", {"username": username, "password": self.PASSWORD}, format="json"
+        ).data["access"]
+
+    async def call(self, view, path, method="get", token=None, **kwargs):
+        headers = {"Authorization": f"Bearer {token or self.token}"} if token != "" else {}
+        request = getattr(AsyncRequestFactory(), method)(path, headers=headers)
+        response = await view(request, **kwargs)
+        response.json_data = json.loads(response.content) if response.content else None
+        return response
+
+    async def sync_get(self, path, token=None):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {token or self.token}")
+        return await sync_to_async(client.get)(path)
+
+    async def test_form_list_and_detail_match_sync_views(self):
+        path = "/api/v1/forms/?page_size=2&page=2"
+        response = await self.call(form_list_view, path)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json_data, (await self.sync_get(path)).json())
+        self.assertEqual(response.json_data["count"], 4)
+        self.assertEqual(response.json_data["previous"], "http://testserver/api/v1/forms/?page_size=2")
+
+        path = f"/api/v1/forms/{self.form.id}/"
+        response = await self.call(form_detail_view, path, pk=str(self.form.id))
+        sync_response = await self.sync_get(path)
+        self.assertEqual(response.json_data, sync_response.json())
+        # Same cache entry and ETag as the sync view
+        self.assertEqual(response["ETag"], sync_response["ETag"])
+
+    async def test_submission_list_and_conditional_get(self):
+        path = f"/api/v1/forms/{self.form.id}/submissions/"
+        response = await self.call(submission_list_view, path, form_pk=str(self.form.id))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json_data, (await self.sync_get(path)).json())
+        self.assertEqual(response.json_data["results"][0]["form_fields"][0]["name"], "q1")
+
+        request = AsyncRequestFactory().get(
+            path, headers={"Authorization": f"Bearer {self.token}", "If-None-Match": response["ETag"]}
+        )
+        self.assertEqual((await submission_list_view(request, form_pk=str(self.form.id))).status_code, 304)
+
+    async def test_dashboard_metrics(self):
+        path = "/api/v1/dashboard/metrics/?days=3"
+        response = await self.call(dashboard_metrics_view, path)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json_data, (await self.sync_get(path)).json())
+
+    async def test_errors_and_passthrough(self):
+        unauthenticated = await self.call(form_list_view, "/api/v1/forms/", token="")
+        self.assertEqual(unauthenticated.status_code, 401)
+        self.assertIn("Bearer", unauthenticated["WWW-Authenticate"])
+
+        no_role_token = await sync_to_async(self.access_token)("async_nobody")
+        self.assertEqual((await self.call(form_list_view, "/api/v1/forms/", token=no_role_token)).status_code, 403)
+        self.assertEqual((await self.call(form_detail_view, "/api/v1/forms/999/", pk="999")).status_code, 404)
+
+        # Writes go to the DRF viewset, which applies its own permissions (Viewers are read-only)
+        response = await self.call(form_list_view, "/api/v1/forms/", method="post")
+        self.assertEqual(response.status_code, 403)
+
+    def use_async_urls(self):
+        """Route the API through urls_async as with ASYNC_READ_VIEWS on (the URLconf reads it at import)."""
+        with override_settings(ASYNC_READ_VIEWS=True):
+            importlib.reload(api.v1.urls)
+            importlib.reload(backend.urls)
+            clear_url_caches()
+        self.addCleanup(clear_url_caches)
+        self.addCleanup(importlib.reload, backend.urls)
+        self.addCleanup(importlib.reload, api.v1.urls)
+
+    def test_async_urls_leave_form_actions_to_the_router(self):
+        self.use_async_urls()
+        self.assertIs(resolve(f"/api/v1/forms/{self.form.id}/").func, form_detail_view)
+        self.assertEqual(resolve("/api/v1/forms/submission-counters/").url_name, "form-submission-counters")
+
+    def test_jwt_writes_pass_csrf_middleware(self):
+        self.create_user("async_admin", "Admin")
+        client = Client(enforce_csrf_checks=True, headers={"Authorization": f"Bearer {self.access_token('async_admin')}"})
+        self.use_async_urls()
+        self.assertIs(resolve("/api/v1/forms/").func, form_list_view)
+
+        payload = {"name": "Written", "fields": [{"name": "q1", "field_type": "text"}]}
+        response = client.post("/api/v1/forms/", payload, content_type="application/json")
+        self.assertEqual(response.status_code, 201)
+        path = f"/api/v1/forms/{response.json()['id']}/"
+        response = client.put(path, {**payload, "description": "v2"}, content_type="application/json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(client.delete(f"/api/v1/forms/{response.json()['id']}/").status_code, 204)
+
+
+class FormBulkWriteTests(BaseAPITestCase):
+    """
+    Form creation and versioning write fields with bulk_create inside one transaction, so the
+    statement count does not grow with the number of fields or forms.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.admin_user = self.create_user("bulk_form_admin", "Admin", is_staff=True)
+        self.client.force_authenticate(user=self.admin_user)
+        # Create today's dashboard rollup rows, so every measured POST only updates them
+        self.client.post("/api/v1/forms/", self.payload("Warm-up", 1), format="json")
+
+    @staticmethod
+    def payload(name, field_count):
+        fields = [{"name": f"q{i}", "label": f"Q{i}", "field_type": "text", "order": i} for i in range(field_count)]
+        return {"name": name, "description": "", "fields": fields}
+
+    def post(self, data, url="/api/v1/forms/"):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(url, data, format="json")
+        self.assertIn(response.status_code, (200, 201), response.data)
+        # Statements that write (serializer validation still runs its per-form uniqueness checks)
+        response.query_count = sum(
+            1 for query in queries if query["sql"].split(" ", 1)[0] in ("INSERT", "UPDATE", "DELETE")
+        )
+        return response
+
+    def test_field_count_does_not_change_statement_count(self):
+        # 100 fields stay below SQLite's bind-parameter limit, where bulk_create splits the INSERT
+        small = self.post(self.payload("Small", 3))
+        large = self.post(self.payload("Large", 100))
+        self.assertEqual(large.query_count, small.query_count)
+        self.assertEqual(len(large.data["fields"]), 100)
+        self.assertEqual(len(FormDefinition.objects.get(name="Large").fields), 100)
+
+        # A new version goes through the same path
+        response = self.client.patch(
+            f"/api/v1/forms/{large.data['id']}/", {"fields": self.payload("Large", 101)["fields"]}, format="json"
+        )
+        self.assertEqual((response.data["version"], len(response.data["fields"])), (2, 101))
+
+    def test_batch_post_uses_fixed_statement_count(self):
+        two = self.post([self.payload(f"Two {i}", 5) for i in range(2)])
+        ten = self.post([self.payload(f"Ten {i}", 10) for i in range(10)])
+        self.assertEqual(ten.query_count, two.query_count)
+        self.assertEqual([len(form["fields"]) for form in ten.data], [10] * 10)
+        self.assertTrue(all(form["is_latest"] for form in ten.data))
+
+    def test_batch_moves_latest_marker(self):
+        original = FormService.create_definition(name="Lineage", created_by=self.admin_user)
+        forms = FormService.create_definitions([
+            {"name": "Lineage", "version": 2, "created_by": self.admin_user},
+            {"name": "Lineage", "version": 3, "created_by": self.admin_user},
+        ])
+        original.refresh_from_db()
+        self.assertEqual([form.is_latest for form in forms], [False, True])
+        self.assertFalse(original.is_latest)
+
+    def test_failure_leaves_no_partial_version(self):
+        duplicate = [{"name": "same", "field_type": "text"}, {"name": "same", "field_type": "number"}]
+        with self.assertRaises(ValidationError):
+            FormService.create_definition(fields=duplicate, name="Broken", created_by=self.admin_user)
+        self.assertFalse(FormDefinition.objects.filter(name="Broken").exists())
+
+
+class FieldStoreTests(BaseAPITestCase):
+    """
+    Field definitions are content-addressed: versions share unchanged rows and only new or
+    edited fields are written.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.admin_user = self.create_user("store_admin", "Admin", is_staff=True)
+        self.client.force_authenticate(user=self.admin_user)
+        self.fields = [
+            {"name": f"q{i}", "label": f"Question {i}", "field_type": "text", "required": False, "options": None, "order": i}
+            for i in range(20)
+        ]
+        self.form = self.client.post(
+            "/api/v1/forms/", {"name": "Survey", "description": "", "fields": self.fields}, format="json"
+        ).data
+
+    def test_new_version_only_writes_changed_fields(self):
+        self.assertEqual(FieldDefinition.objects.count(), 20)
+        fields = [dict(field) for field in self.fields]
+        fields[3]["label"] = "Reworded"
+        response = self.client.patch(f"/api/v1/forms/{self.form['id']}/", {"fields": fields}, format="json")
+
+        self.assertEqual(response.data["version"], 2)
+        self.assertEqual(FieldDefinition.objects.count(), 21)
+        old_ids = [field["id"] for field in self.form["fields"]]
+        new_ids = [field["id"] for field in response.data["fields"]]
+        self.assertEqual([a == b for a, b in zip(old_ids, new_ids)].count(False), 1)
+
+    def test_payload_shape_and_order(self):
+        fields = [dict(field, order=19 - field["order"]) for field in self.fields[:3]]
+        response = self.client.patch(f"/api/v1/forms/{self.form['id']}/", {"fields": fields}, format="json")
+
+        # Reordering reuses the stored definitions
+        self.assertEqual([field["name"] for field in response.data["fields"]], ["q2", "q1", "q0"])
+        self.assertEqual([field["order"] for field in response.data["fields"]], [17, 18, 19])
+        self.assertEqual(
+            set(response.data["fields"][0]), {"id", "name", "label", "field_type", "required", "options", "order"}
+        )
+        detail = self.client.get(f"/api/v1/forms/{response.data['id']}/")
+        self.assertEqual(detail.data["fields"], response.data["fields"])
+
+    def test_list_loads_fields_with_one_query(self):
+        self.client.post("/api/v1/forms/", {"name": "Other", "description": "", "fields": self.fields[:2]}, format="json")
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/api/v1/forms/")
+        self.assertEqual(response.data["count"], 2)
+        self.assertEqual(sum("v1_fielddefinition" in query["sql"] for query in queries), 1)
+
+    def test_definitions_in_use_cannot_be_deleted(self):
+        field = FieldDefinition.objects.get(id=self.form["fields"][0]["id"])
+        with self.assertRaises(ProtectedError):
+            field.delete()
+        with self.assertRaises(ProtectedError):
+            FieldDefinition.objects.all().delete()
+
+        FormDefinition.objects.get(id=self.form["id"]).delete()
+        field.delete()
+        self.assertEqual(FieldDefinition.objects.count(), 19)
+
+    def test_duplicate_field_names_are_rejected(self):
+        fields = [self.fields[0], dict(self.fields[1], name="q0")]
+        response = self.client.post("/api/v1/forms/", {"name": "Dupes", "description": "", "fields": fields}, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(FormDefinition.objects.filter(name="Dupes").exists())
+
+
+class FormDiffTests(BaseAPITestCase):
+    """/forms/{id}/diff/?against= compares two versions of a lineage server-side."""
+
+    def setUp(self):
+        super().setUp()
+        self.admin_user = self.create_user("diff_admin", "Admin", is_staff=True)
+        self.client.force_authenticate(user=self.admin_user)
+        fields = [
+            {"name": "name", "field_type": "text", "order": 0},
+            {"name": "age", "field_type": "number", "order": 1},
+            {"name": "nickname", "field_type": "text", "order": 2},
+        ]
+        self.v1 = self.client.post("/api/v1/forms/", {"name": "Census", "fields": fields}, format="json").data
+        for index, data in enumerate([{"name": "Ana", "age": 30}, {"name": "Luis"}, {"age": 4}]):
+            user = self.create_user(f"census_{index}")
+            FormSubmission.objects.create(form_id=self.v1["id"], form_version=1, submitted_by=user, data=data)
+
+        fields = [
+            {"name": "name", "field_type": "text", "order": 0, "required": True},
+            {"name": "age", "field_type": "number", "order": 1, "label": "Age"},
+            {"name": "country", "field_type": "text", "order": 2},
+        ]
+        self.v2 = self.client.patch(
+            f"/api/v1/forms/{self.v1['id']}/", {"fields": fields, "description": "Second round"}, format="json"
+        ).data
+
+    def test_diff_reports_field_and_metadata_changes(self):
+        response = self.client.get(f"/api/v1/forms/{self.v2['id']}/diff/?against=1")
+        self.assertEqual(response.status_code, 200)
+        fields = response.data["fields"]
+        self.assertEqual([field["name"] for field in fields["added"]], ["country"])
+        self.assertEqual([field["name"] for field in fields["removed"]], ["nickname"])
+        self.assertEqual(
+            {item["name"]: item["changes"] for item in fields["modified"]},
+            {"name": {"required": {"from": False, "to": True}}, "age": {"label": {"from": "", "to": "Age"}}},
+        )
+        self.assertEqual(response.data["metadata"], {"description": {"from": "", "to": "Second round"}})
+
+        # Submissions of v1 missing the now-required "name"
+        self.assertEqual(
+            response.data["submissions"],
+            {
+                "validated_against": 2,
+                "truncated": False,
+                "versions": [{"version": 1, "total": 3, "checked": 3, "invalid": 1}],
+            },
+        )
+
+    @override_settings(FORM_DIFF_IMPACT_MAX_ROWS=2)
+    def test_impact_scan_is_capped(self):
+        impact = self.client.get(f"/api/v1/forms/{self.v2['id']}/diff/?against=1").data["submissions"]
+        self.assertTrue(impact["truncated"])
+        self.assertEqual([(row["total"], row["checked"]) for row in impact["versions"]], [(3, 2)])
+
+    def test_diff_is_cached_and_follows_new_submissions(self):
+        url = f"/api/v1/forms/{self.v1['id']}/diff/?against=2"
+        first = self.client.get(url)
+        self.assertEqual([field["name"] for field in first.data["fields"]["added"]], ["nickname"])
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(url)
+        self.assertFalse(any("v1_formsubmission" in query["sql"] for query in queries))
+
+        # Submissions to another lineage leave the cached impact alone
+        other = FormDefinition.objects.create(name="Other", created_by=self.admin_user)
+        FormSubmission.objects.create(form=other, form_version=1, submitted_by=self.admin_user, data={})
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(url)
+        self.assertFalse(any("v1_formsubmission" in query["sql"] for query in queries))
+
+        user = self.create_user("census_late")
+        FormSubmission.objects.create(form_id=self.v1["id"], form_version=1, submitted_by=user, data={})
+        self.assertEqual(self.client.get(url).data["submissions"]["versions"][0]["total"], 4)
+
+    def test_invalid_against(self):
+        url = f"/api/v1/forms/{self.v2['id']}/diff/"
+        self.assertEqual(self.client.get(url).status_code, 400)
+        self.assertEqual(self.client.get(url + "?against=9").status_code, 404)
+
+
+class SubmissionDataFilterTests(BaseAPITestCase):
+    """data.<field>[__op]=value filters are validated against the form schema and typed by field."""
+
+    def setUp(self):
+        super().setUp()
+        self.admin_user = self.create_user("filter_admin", "Admin")
+        self.form = FormService.create_definition(name="Survey", created_by=self.admin_user, fields=[
+            {"name": "country", "field_type": "select", "options": ["CR", "PA"], "order": 0},
+            {"name": "age", "field_type": "number", "order": 1},
+            {"name": "born", "field_type": "date", "order": 2},
+            {"name": "subscribed", "field_type": "checkbox", "order": 3},
+        ])
+        rows = [
+            {"country": "CR", "age": 17, "born": "2008-05-01", "subscribed": True},
+            {"country": "CR", "age": 34, "born": "1991-02-10", "subscribed": False},
+            {"country": "PA", "age": 52, "born": "1973-11-30"},
+        ]
+        for index, data in enumerate(rows):
+            user = User.objects.create_user(username=f"respondent_{index}")
+            FormSubmission.objects.create(form=self.form, form_version=1, submitted_by=user, data=data)
+        self.client.force_authenticate(user=self.admin_user)
+
+    def ages(self, query, nested=True):
+        base = f"/api/v1/forms/{self.form.id}/submissions/" if nested else "/api/v1/submissions/"
+        response = self.client.get(f"{base}?include_fields=false&{query}")
+        self.assertEqual(response.status_code, 200, response.data)
+        return sorted(row["data"]["age"] for row in response.data["results"])
+
+    def test_typed_filters(self):
+        self.assertEqual(self.ages("data.country=CR&data.age__gte=18"), [34])
+        self.assertEqual(self.ages("data.age__lt=40"), [17, 34])
+        self.assertEqual(self.ages("data.country__in=PA,CR"), [17, 34, 52])
+        self.assertEqual(self.ages("data.born__gte=1990-01-01"), [17, 34])
+        self.assertEqual(self.ages("data.subscribed=false"), [34])
+        self.assertEqual(self.ages("data.subscribed__isnull=true"), [52])
+        self.assertEqual(self.ages(f"form={self.form.id}&data.country=PA", nested=False), [52])
+
+    def test_invalid_filters_are_rejected(self):
+        url = f"/api/v1/forms/{self.form.id}/submissions/"
+        for query in ("data.city=X", "data.age=old", "data.country__gte=CR", "data.age__regex=1"):
+            response = self.client.get(f"{url}?{query}")
+            self.assertEqual(response.status_code, 400, query)
+        # Data filters need a form schema
+        self.assertEqual(self.client.get("/api/v1/submissions/?data.age=1").status_code, 400)
+
+    def test_filter_usage_is_counted(self):
+        self.ages("data.age__gte=18")
+        self.ages("data.age__gte=30&data.country=CR")
+        self.ages("data.age__gte=18&data.age__lt=40")
+        with self.assertNumQueries(1):
+            usage = {(form_id, name): uses for form_id, name, uses in SubmissionQueryService.usage([self.form.id])}
+        # One use per request, however many filters it puts on the field
+        self.assertEqual(usage, {(self.form.id, "age"): 3, (self.form.id, "country"): 1})
+
+    def test_superseded_versions_are_not_indexed(self):
+        self.ages("data.age__gte=18")
+        newer = FormService.create_definition(name="Survey", version=2, created_by=self.admin_user, fields=[
+            {"name": "age", "field_type": "number", "order": 0},
+        ])
+        self.client.get(f"/api/v1/forms/{newer.id}/submissions/?data.age__gte=18")
+
+        self.assertEqual(SubmissionQueryService.usage(latest_only=True), [(newer.id, "age", 1)])
+        indexes = [
+            SubmissionDataIndexService.index_name(self.form.id, "age"),
+            SubmissionDataIndexService.index_name(newer.id, "age"),
+            SubmissionDataIndexService.index_name(0, "age"),
+        ]
+        self.assertEqual(SubmissionDataIndexService.stale(indexes), [indexes[0], indexes[2]])
+
+
+class SubmissionAnalyticsTests(BaseAPITestCase):
+    """/forms/{id}/analytics/ aggregates answers in SQL; closed versions are cached."""
+
+    def setUp(self):
+        super().setUp()
+        self.admin_user = self.create_user("analytics_admin", "Admin", is_staff=True)
+        self.client.force_authenticate(user=self.admin_user)
+        fields = [
+            {"name": "color", "field_type": "select", "options": ["red", "blue"], "order": 0},
+            {"name": "toppings", "field_type": "checkbox", "options": ["cheese", "ham", "olives"], "order": 1},
+            {"name": "age", "field_type": "number", "order": 2},
+            {"name": "subscribe", "field_type": "checkbox", "order": 3},
+            {"name": "comment", "field_type": "text", "order": 4},
+        ]
+        self.form = self.client.post("/api/v1/forms/", {"name": "Survey", "fields": fields}, format="json").data
+        answers = [
+            {"color": "red", "toppings": ["cheese", "ham"], "age": 10, "subscribe": True, "comment": "ok"},
+            {"color": "red", "toppings": ["cheese"], "age": 20, "subscribe": False, "comment": ""},
+            {"color": "blue", "toppings": [], "age": 40.5, "subscribe": True},
+            {"color": "green"},
+        ]
+        for index, data in enumerate(answers):
+            user = self.create_user(f"respondent_{index}")
+            FormSubmission.objects.create(form_id=self.form["id"], form_version=1, submitted_by=user, data=data)
+
+    def get_fields(self, form_id, query=""):
+        response = self.client.get(f"/api/v1/forms/{form_id}/analytics/{query}")
+        self.assertEqual(response.status_code, 200)
+        return response.data["submissions"], {field["name"]: field for field in response.data["fields"]}
+
+    def test_aggregates(self):
+        total, fields = self.get_fields(self.form["id"], "?buckets=3")
+        self.assertEqual(total, 4)
+
+        self.assertEqual(fields["color"]["choices"], [{"value": "red", "count": 2}, {"value": "blue", "count": 1}])
+        self.assertEqual(fields["color"]["other"], 1)
+        self.assertEqual(
+            fields["toppings"]["choices"],
+            [{"value": "cheese", "count": 2}, {"value": "ham", "count": 1}, {"value": "olives", "count": 0}],
+        )
+        self.assertEqual(fields["toppings"]["filled"], 2)
+        self.assertEqual(fields["subscribe"]["choices"], [{"value": True, "count": 2}, {"value": False, "count": 1}])
+
+        self.assertEqual(fields["age"]["stats"], {"count": 3, "min": 10, "max": 40.5, "mean": 23.5})
+        self.assertEqual([bucket["count"] for bucket in fields["age"]["histogram"]], [2, 0, 1])
+        self.assertEqual(fields["age"]["histogram"][-1]["to"], 40.5)
+
+        self.assertEqual(fields["comment"]["filled"], 1)
+        self.assertEqual(fields["comment"]["fill_rate"], 0.25)
+
+    def test_invalid_buckets(self):
+        response = self.client.get(f"/api/v1/forms/{self.form['id']}/analytics/?buckets=0")
+        self.assertEqual(response.status_code, 400)
+
+    def test_closed_versions_are_cached_until_a_submission_changes(self):
+        fields = [{"name": "color", "field_type": "select", "options": ["red", "blue"], "order": 0}]
+        self.client.patch(f"/api/v1/forms/{self.form['id']}/", {"fields": fields}, format="json")
+
+        self.assertEqual(self.get_fields(self.form["id"])[0], 4)
+        with CaptureQueriesContext(connection) as queries:
+            self.get_fields(self.form["id"])
+        self.assertFalse(any("v1_formsubmission" in query["sql"] for query in queries))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            FormSubmission.objects.filter(form_id=self.form["id"]).first().delete()
+        self.assertEqual(self.get_fields(self.form["id"])[0], 3)
+
+
+class SubmissionCounterTests(BaseAPITestCase):
+    """FormDefinition carries submission counters maintained on submission writes."""
+
+    def setUp(self):
+        super().setUp()
+        self.admin_user = self.create_user("counter_admin", "Admin", is_staff=True)
+        self.client.force_authenticate(user=self.admin_user)
+        fields = [{"name": "age", "field_type": "number", "order": 0}]
+        self.v1 = self.client.post("/api/v1/forms/", {"name": "Counted", "fields": fields}, format="json").data
+
+    def submit(self, form_id, username):
+        self.client.force_authenticate(user=self.create_user(username, "Viewer"))
+        response = self.client.post(f"/api/v1/forms/{form_id}/submissions/", {"data": {"age": 1}}, format="json")
+        self.client.force_authenticate(user=self.admin_user)
+        self.assertEqual(response.status_code, 201, response.data)
+        return response.data
+
+    def counters(self, form_id):
+        form = FormDefinition.objects.get(pk=form_id)
+        return form.submission_count, SubmissionCounterService.get_lineage_totals(form)[0], form.last_submitted_at
+
+    def test_counters_follow_creates_deletes_and_versions(self):
+        first = self.submit(self.v1["id"], "counted_1")
+        second = self.submit(self.v1["id"], "counted_2")
+        count, lineage, last = self.counters(self.v1["id"])
+        self.assertEqual((count, lineage), (2, 2))
+        self.assertEqual(last, FormSubmission.objects.get(pk=second["id"]).submitted_at)
+
+        fields = [{"name": "age", "field_type": "number", "order": 0}, {"name": "city", "field_type": "text", "order": 1}]
+        v2 = self.client.patch(f"/api/v1/forms/{self.v1['id']}/", {"fields": fields}, format="json").data
+        self.assertEqual(self.counters(v2["id"])[:2], (0, 2))
+        self.submit(v2["id"], "counted_3")
+        self.assertEqual(self.counters(v2["id"])[:2], (1, 3))
+        self.assertEqual(self.counters(self.v1["id"])[:2], (2, 3))
+
+        self.client.delete(f"/api/v1/submissions/{second['id']}/")
+        count, lineage, last = self.counters(self.v1["id"])
+        self.assertEqual((count, lineage), (1, 2))
+        self.assertEqual(last, FormSubmission.objects.get(pk=first["id"]).submitted_at)
+
+        # Destroying a version takes its submissions out of the lineage totals
+        self.client.delete(f"/api/v1/forms/{v2['id']}/")
+        self.assertEqual(self.counters(self.v1["id"])[:2], (1, 1))
+
+    def test_destroying_a_version_deletes_its_submissions_in_one_statement(self):
+        for i in range(3):
+            self.submit(self.v1["id"], f"cascade_{i}")
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.delete(f"/api/v1/forms/{self.v1['id']}/")
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(FormSubmission.objects.exists())
+        deletes = [sql for sql in (query["sql"].replace('"', "") for query in queries) if sql.startswith("DELETE FROM v1_formsubmission")]
+        self.assertEqual(len(deletes), 1)
+        # No per-row uncounting of the deleted submissions
+        self.assertFalse(any(query["sql"].startswith('UPDATE "v1_formdefinition"') for query in queries))
+
+    def test_submissions_do_not_invalidate_form_cache(self):
+        generation = ChangeCounterService.value(FormCacheService.COUNTER)
+        self.submit(self.v1["id"], "uncached_1")
+        self.assertEqual(ChangeCounterService.value(FormCacheService.COUNTER), generation)
+
+    def test_counters_endpoint_reads_without_touching_submissions(self):
+        self.submit(self.v1["id"], "listed_1")
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(f"/api/v1/forms/submission-counters/?ids={self.v1['id']},999")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 1)
+        self.assertEqual((response.data[0]["submission_count"], response.data[0]["lineage_submission_count"]), (1, 1))
+        self.assertIsNotNone(response.data[0]["last_submitted_at"])
+        self.assertFalse(any("v1_formsubmission" in query["sql"] for query in queries))
+
+    def test_form_bodies_and_etags_do_not_carry_counters(self):
+        detail = self.client.get(f"/api/v1/forms/{self.v1['id']}/")
+        self.assertNotIn("submission_count", detail.data)
+        self.submit(self.v1["id"], "etag_1")
+        response = self.client.get(f"/api/v1/forms/{self.v1['id']}/", HTTP_IF_NONE_MATCH=detail["ETag"])
+        self.assertEqual(response.status_code, 304)
+        counters = self.client.get(f"/api/v1/forms/submission-counters/?ids={self.v1['id']}").data
+        self.assertEqual(counters[0]["submission_count"], 1)
+
+    def test_counters_endpoint_applies_visibility_and_validates_ids(self):
+        FormDefinition.objects.filter(pk=self.v1["id"]).update(is_deleted=True)
+        path = f"/api/v1/forms/submission-counters/?ids={self.v1['id']}"
+        self.assertEqual(len(self.client.get(path).data), 1)
+        self.client.force_authenticate(user=self.create_user("counter_viewer", "Viewer"))
+        self.assertEqual(self.client.get(path).data, [])
+        self.assertEqual(self.client.get("/api/v1/forms/submission-counters/?ids=1,x").status_code, 400)
+
+    def test_reconcile_repairs_drift(self):
+        self.submit(self.v1["id"], "drift_1")
+        FormDefinition.objects.filter(pk=self.v1["id"]).update(submission_count=7, last_submitted_at=None)
+        call_command("reconcile_submission_counters", stdout=StringIO())
+        self.assertEqual(self.counters(self.v1["id"])[:2], (1, 1))
+        self.assertIsNotNone(self.counters(self.v1["id"])[2])
+
+
+class AuditRoutingTests(BaseAPITestCase):
+    """AuditMiddleware routes come from settings, are sampled per route and record timing/sizes."""
+
+    def setUp(self):
+        super().setUp()
+        self.admin_user = self.create_user("routing_admin", "Admin", is_staff=True)
+        self.client.force_authenticate(user=self.admin_user)
+
+    def test_router_matches_first_route_per_method(self):
+        router = AuditRouter([
+            {"pattern": r"/api/v1/(forms/[^/]+/)?submissions/", "methods": ["POST"], "sample_rate": 0.1},
+            {"pattern": r"/api/v1/forms/"},
+        ])
+        self.assertEqual(router.match("POST", "/api/v1/forms/3/submissions/")["sample_rate"], 0.1)
+        self.assertEqual(router.match("DELETE", "/api/v1/forms/3/submissions/1/")["sample_rate"], 1.0)
+        self.assertIsNone(router.match("PUT", "/api/v1/submissions/1/"))
+        self.assertIsNone(router.match("POST", "/api/v2/forms/"))
+        self.assertNotIn("GET", router.by_method)
+
+    def test_sampled_route_excludes_bulk_ingest(self):
+        router = AuditRouter(settings.AUDIT_ROUTES, settings.AUDIT_METHODS)
+        sampled = settings.AUDIT_ROUTES[0]
+        self.assertEqual(router.match("POST", "/api/v1/submissions/")["pattern"], sampled["pattern"])
+        self.assertEqual(router.match("POST", "/api/v1/forms/3/submissions/")["pattern"], sampled["pattern"])
+        self.assertEqual(router.match("POST", "/api/v1/submissions/bulk/")["sample_rate"], 1.0)
+        self.assertNotEqual(router.match("POST", "/api/v1/submissions/bulk/")["pattern"], sampled["pattern"])
+
+    def test_logged_rows_carry_duration_and_sizes(self):
+        payload = {"name": "Audited", "fields": [{"name": "a", "field_type": "text", "order": 0}]}
+        response = self.client.post("/api/v1/forms/", payload, format="json")
+        self.client.get("/api/v1/forms/")
+
+        log = AuditLog.objects.get()
+        self.assertEqual((log.method, log.path, log.status_code), ("POST", "/api/v1/forms/", 201))
+        self.assertEqual(log.response_bytes, len(response.content))
+        self.assertGreater(log.request_bytes, 0)
+        self.assertGreaterEqual(log.duration_ms, 0)
+        self.assertEqual(log.sample_rate, 1.0)
+
+    @override_settings(AUDIT_ROUTES=[
+        {"pattern": r"/api/v1/forms/", "sample_rate": 0},
+        {"pattern": r"/api/v1/users/"},
+    ])
+    def test_sample_rate_zero_skips_route(self):
+        client = APIClient()  # new handler: middleware compiles the overridden routes
+        client.force_authenticate(user=self.admin_user)
+        client.post("/api/v1/forms/", {"name": "Unsampled", "fields": []}, format="json")
+        self.assertFalse(AuditLog.objects.exists())
+        client.post("/api/v1/users/", {"username": "sampled_user", "password": "Pass12345!x"}, format="json")
+        self.assertEqual(AuditLog.objects.filter(path="/api/v1/users/").count(), 1)
+
+    async def test_async_middleware_only_hops_for_audited_requests(self):
+        async def view(request):
+            return HttpResponse(b"created", status=201)
+
+        middleware = AuditMiddleware(view)
+        for method in ("get", "post"):
+            request = getattr(AsyncRequestFactory(), method)("/api/v1/auth/register/")
+            request.user = AnonymousUser()
+            self.assertEqual((await middleware(request)).status_code, 201)
+
+        log = await AuditLog.objects.aget()
+        self.assertEqual((log.method, log.response_bytes), ("POST", 7))
+
+
+class RequestMetricsTests(BaseAPITestCase):
+    """InstrumentationMiddleware aggregates per-route metrics served at /dashboard/metrics/prometheus/."""
+
+    def setUp(self):
+        super().setUp()
+        RequestMetricsService.reset()
+        self.admin_user = self.create_user("metrics_admin", "Admin", is_staff=True)
+        self.client.force_authenticate(user=self.admin_user)
+
+    def metric(self, text, line_start):
+        lines = [line for line in text.splitlines() if line.startswith(line_start)]
+        self.assertEqual(len(lines), 1, line_start)
+        return float(lines[0].rsplit(" ", 1)[1])
+
+    def test_routes_are_labelled_by_url_name(self):
+        form = FormService.create_definition(
+            name="Measured", created_by=self.admin_user, fields=[{"name": "a", "field_type": "text"}]
+        )
+        with CaptureQueriesContext(connection) as queries:
+            first = self.client.get(f"/api/v1/forms/{form.id}/")
+        self.client.get(f"/api/v1/forms/{form.id + 1000}/")
+        self.client.get("/api/v1/no-such-endpoint/")
+
+        text = self.client.get("/api/v1/dashboard/metrics/prometheus/").content.decode()
+        labels = 'route="form-detail",method="GET"'
+        self.assertEqual(self.metric(text, f'dfb_http_requests_total{{{labels},status="2xx"}}'), 1)
+        self.assertEqual(self.metric(text, f'dfb_http_requests_total{{{labels},status="4xx"}}'), 1)
+        self.assertEqual(self.metric(text, f"dfb_http_request_duration_seconds_count{{{labels}}}"), 2)
+        self.assertEqual(self.metric(text, f'dfb_http_request_duration_seconds_bucket{{{labels},le="+Inf"}}'), 2)
+        self.assertGreaterEqual(self.metric(text, f"dfb_db_queries_per_request_sum{{{labels}}}"), len(queries))
+        self.assertGreaterEqual(self.metric(text, f"dfb_http_response_size_bytes_sum{{{labels}}}"), len(first.content))
+        self.assertIn('route="unresolved"', text)
+
+    def test_admin_only(self):
+        viewer = self.create_user("metrics_viewer", "Viewer")
+        self.client.force_authenticate(user=viewer)
+        self.assertEqual(self.client.get("/api/v1/dashboard/metrics/prometheus/").status_code, 403)
+
+        self.client.force_authenticate(user=self.admin_user)
+        response = self.client.get("/api/v1/dashboard/metrics/prometheus/")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain; version=0.0.4"))
+        self.assertIn("# TYPE dfb_http_request_duration_seconds histogram", response.content.decode())
+
+    def test_other_workers_are_summed(self):
+        RequestMetricsService.record("form-list", "GET", 200, 0.02, 3, 0.001, 512)
+        RequestMetricsService.record("form-list", "GET", 404, 0.01, 1, 0.001, 64)
+        other_worker = RequestMetricsService.snapshot()
+        RequestMetricsService.reset()
+
+        # Another worker has taken the next slot and published what it counted
+        slot = RequestMetricsService.worker_slot() + 1
+        cache.set(RequestMetricsService.SLOT_KEY, slot, timeout=None)
+        cache.set(RequestMetricsService.SNAPSHOT_KEY.format(slot), other_worker)
+        RequestMetricsService.record("form-list", "GET", 200, 0.03, 2, 0.001, 256)
+
+        text = self.client.get("/api/v1/dashboard/metrics/prometheus/").content.decode()
+        labels = 'route="form-list",method="GET"'
+        self.assertEqual(self.metric(text, f'dfb_http_requests_total{{{labels},status="2xx"}}'), 2)
+        self.assertEqual(self.metric(text, f'dfb_http_requests_total{{{labels},status="4xx"}}'), 1)
+        self.assertEqual(self.metric(text, f"dfb_db_queries_per_request_sum{{{labels}}}"), 6)
+
+    @override_settings(METRICS_SCRAPE_TOKEN="scrape-secret")
+    def test_static_scrape_token(self):
+        scraper = APIClient()
+        url = "/api/v1/dashboard/metrics/prometheus/"
+        self.assertEqual(scraper.get(url).status_code, 401)
+        self.assertEqual(scraper.get(url, HTTP_AUTHORIZATION="Bearer wrong").status_code, 401)
+        response = scraper.get(url, HTTP_AUTHORIZATION="Bearer scrape-secret")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("# TYPE dfb_http_requests_total counter", response.content.decode())
+        # The token only opens the metrics endpoint
+        self.assertEqual(scraper.get("/api/v1/forms/", HTTP_AUTHORIZATION="Bearer scrape-secret").status_code, 401)
@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.urls import path, include
 
 urlpatterns = [
@@ -16,3 +17,7 @@ urlpatterns = [
     # Logs module
     path("", include("api.v1.custom_urls.urls_logs")),
 ]
+
+if settings.ASYNC_READ_VIEWS:
+    # Async read endpoints take precedence over the routers for the paths they serve
+    urlpatterns.insert(0, path("", include("api.v1.custom_urls.urls_async")))
@@ -1,22 +1,45 @@
+from django.conf import settings
 from django.contrib.auth.models import User
+from django.db import transaction
+from django.http import HttpResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 
 from rest_framework import generics, status, viewsets, filters
 from rest_framework.response import Response
-from rest_framework.pagination import PageNumberPagination
 from rest_framework.views import APIView
 from rest_framework_simplejwt.views import TokenObtainPairView
 from rest_framework.decorators import action
 from rest_framework.permissions import AllowAny, IsAuthenticated, IsAdminUser
+from rest_framework.settings import api_settings
 
 # Models
-from .models import FormDefinition, FormSubmission
+from .models import FormDefinition
 
 #Services
-from .services import FormDefinitionService, FormSubmissionService, UserService, AuditLogService, LogEntryService, DashboardService
+from .services import (
+    ChangeCounterService,
+    FormService,
+    FormCacheService,
+    FormDefinitionService,
+    FormDiffService,
+    FormSubmissionService,
+    SubmissionAnalyticsService,
+    SubmissionCounterService,
+    SubmissionExportService,
+    UserService,
+    AuditLogService,
+    LogEntryService,
+    DashboardService,
+    RequestMetricsService,
+)
+
+from .authentication import MetricsScrapeTokenAuthentication
 
 # Custom Permissions
 from .permissions import (
+    get_request_roles,
+    HasMetricsScrapeToken,
     RoleBasedFormPermission,
     RoleBasedSubmissionPermission,
     RoleBasedUserPermission,
@@ -27,6 +50,7 @@ from .serializers import (
     AdminRegisterSerializer,
     CustomTokenObtainPairSerializer,
     FormDefinitionSerializer,
+    FormSubmissionCountersSerializer,
     FormSubmissionSerializer,
     LogEntrySerializer,
     PasswordChangeSerializer,
@@ -34,25 +58,25 @@ from .serializers import (
     SelfRegisterSerializer,
 )
 
-from .mixins import BulkCreateMixin
-
-class StandardResultsSetPagination(PageNumberPagination):
-    page_size = 10
-    page_size_query_param = "page_size"
-    max_page_size = 100
+from .mixins import (
+    BulkCreateMixin,
+    CachedReadMixin,
+    ConditionalGetMixin,
+    not_modified_response,
+    set_validators,
+)
+from .pagination import StandardResultsSetPagination, OptionalKeysetPagination
 
-class FormDefinitionViewSet(BulkCreateMixin, viewsets.ModelViewSet):
+class FormDefinitionViewSet(CachedReadMixin, BulkCreateMixin, viewsets.ModelViewSet):
     serializer_class = FormDefinitionSerializer
     permission_classes = [IsAuthenticated, RoleBasedFormPermission]
     pagination_class = StandardResultsSetPagination
+    response_cache = FormCacheService
 
     user_field = "created_by"
 
     def get_queryset(self):
-        queryset = FormDefinition.objects.all().order_by("-created_at")
-        queryset = FormDefinitionService.filter_by_state(queryset, self.request.user, self.request.query_params)
-        queryset = FormDefinitionService.filter_latest_only(queryset, self.request.query_params.get("latest_only", "true"))
-        return queryset
+        return FormDefinitionService.get_queryset(self.request.user, self.request.query_params)
     
     def update(self, request, *args, **kwargs):
         # Leave versioning/business rules in FormDefinitionSerializer (already refactored with FormService)
@@ -60,31 +84,94 @@ class FormDefinitionViewSet(BulkCreateMixin, viewsets.ModelViewSet):
 
     def destroy(self, request, *args, **kwargs):
         instance = self.get_object()
-        if request.user.groups.filter(name="Admin").exists():
+        if "Admin" in get_request_roles(request):
             return super().destroy(request, *args, **kwargs)
         return Response({"detail": "Use PATCH for soft delete."}, status=status.HTTP_403_FORBIDDEN)
 
-class FormSubmissionViewSet(viewsets.ModelViewSet):
+    def perform_destroy(self, instance):
+        FormService.delete_form(instance)
+
+    @action(detail=True, methods=["get"], url_path="diff")
+    def diff(self, request, pk=None):
+        """
+        Changes from version `?against=` of this form's lineage to this version: metadata, added,
+        removed and modified fields, plus how many submissions of the older versions would fail
+        validation under the newer schema.
+        """
+        try:
+            against = int(request.query_params["against"])
+        except (KeyError, ValueError):
+            return Response({"detail": "against must be a version number."}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Any version of the lineage, not only the latest (visibility rules still apply)
+        visible = FormDefinitionService.filter_by_state(
+            FormDefinition.objects.select_related("created_by"), request.user, request.query_params
+        )
+        form = get_object_or_404(visible, pk=pk)
+        self.check_object_permissions(request, form)
+        base = get_object_or_404(visible, name=form.name, version=against)
+        return Response(FormDiffService.diff(base, form))
+
+    @action(detail=True, methods=["get"], url_path="analytics")
+    def analytics(self, request, pk=None):
+        """
+        Answer statistics of this form version computed in the database: option counts for
+        choice fields, min/max/mean and a `?buckets=` histogram for numeric fields, fill rates.
+        Only the submissions the user may list are counted.
+        """
+        try:
+            buckets = SubmissionAnalyticsService.buckets(request.query_params)
+        except ValueError:
+            return Response({"detail": "buckets must be a positive integer."}, status=status.HTTP_400_BAD_REQUEST)
+
+        visible = FormDefinitionService.filter_by_state(FormDefinition.objects.all(), request.user, request.query_params)
+        form = get_object_or_404(visible, pk=pk)
+        self.check_object_permissions(request, form)
+        return Response(SubmissionAnalyticsService.get(form, request.user, get_request_roles(request), buckets))
+
+    @action(detail=False, methods=["get"], url_path="submission-counters")
+    def submission_counters(self, request):
+        """
+        Live submission counters of the forms in `?ids=` (comma-separated, e.g. a list page).
+        They change with every submission, so they are served here uncached instead of in the
+        cached and ETagged form bodies. Forms the user may not see are left out.
+        """
+        try:
+            ids = {int(pk) for pk in request.query_params.get("ids", "").split(",") if pk}
+        except ValueError:
+            return Response({"detail": "ids must be comma-separated form ids."}, status=status.HTTP_400_BAD_REQUEST)
+        if len(ids) > StandardResultsSetPagination.max_page_size:
+            return Response(
+                {"detail": f"At most {StandardResultsSetPagination.max_page_size} ids."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        visible = FormDefinitionService.filter_by_state(FormDefinition.objects.all(), request.user, request.query_params)
+        forms = visible.filter(id__in=ids).only("id", "name", *SubmissionCounterService.FIELDS).order_by("id")
+        return Response(FormSubmissionCountersSerializer(forms, many=True).data)
+
+class FormSubmissionViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     serializer_class = FormSubmissionSerializer
     permission_classes = [IsAuthenticated, RoleBasedSubmissionPermission]
-    pagination_class = StandardResultsSetPagination
+    pagination_class = OptionalKeysetPagination
+    keyset_field = "submitted_at"
 
     def get_queryset(self):
-        form_pk = self.kwargs.get("form_pk")
-        queryset = FormSubmission.objects.all().order_by("-submitted_at")
-        
-        user = self.request.user
-        user_roles = list(user.groups.values_list("name", flat=True))
-
-        if "Admin" not in user_roles and "Editor" not in user_roles and not user.is_superuser:
-            queryset = queryset.filter(submitted_by=user)
-                
-        if form_pk:
-            queryset = queryset.filter(form_id=form_pk)
-        form_version = self.request.query_params.get("form_version")
-        if form_version:
-            queryset = queryset.filter(form_version=form_version)
-        return queryset
+        return FormSubmissionService.get_queryset(
+            self.request.user, get_request_roles(self.request), self.request.query_params, self.kwargs.get("form_pk")
+        )
+
+    def get_validators(self, request):
+        counters = ChangeCounterService.values(FormCacheService.COUNTER, "submissions")
+        etag = FormSubmissionService.etag(
+            request, self.action, request.user, get_request_roles(request), self.kwargs, counters
+        )
+        return etag, None
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["include_fields"] = FormSubmissionService.include_fields(self.request.query_params)
+        return context
 
     def create(self, request, *args, **kwargs):
         data = request.data.copy()
@@ -105,13 +192,71 @@ class FormSubmissionViewSet(viewsets.ModelViewSet):
         headers = self.get_success_headers(serializer.data)
         return Response(serializer.data, status=status.HTTP_201_CREATED, headers=headers)
 
+    @action(detail=False, methods=["post"], url_path="bulk")
+    def bulk(self, request, *args, **kwargs):
+        """
+        Bulk ingestion: accepts a list of {"data": {...}} rows (or {"form": id, "rows": [...]}).
+        Returns per-row errors instead of rejecting the whole batch.
+        """
+        payload = request.data
+        rows = payload.get("rows") if isinstance(payload, dict) else payload
+        if not isinstance(rows, list):
+            return Response({"detail": "Expected a list of submissions."}, status=status.HTTP_400_BAD_REQUEST)
+
+        max_rows = getattr(settings, "SUBMISSION_BULK_MAX_ROWS", 50000)
+        if len(rows) > max_rows:
+            return Response(
+                {"detail": f"At most {max_rows} submissions can be imported per request."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        form_id = self.kwargs.get("form_pk") or (payload.get("form") if isinstance(payload, dict) else None)
+        result = FormSubmissionService.bulk_ingest(
+            rows,
+            request.user,
+            form_id=form_id,
+            allow_submitter_override="Admin" in get_request_roles(request),
+        )
+        code = status.HTTP_201_CREATED if result["created"] else status.HTTP_400_BAD_REQUEST
+        return Response(result, status=code)
+
+    @action(detail=False, methods=["get"], url_path="export")
+    def export(self, request, *args, **kwargs):
+        """
+        Stream every visible submission of a form version as CSV (default) or NDJSON
+        (?export_format=ndjson), one column per form field.
+        """
+        form_pk = self.kwargs.get("form_pk")
+        if not form_pk:
+            return Response(
+                {"detail": "Export is available on /forms/{id}/submissions/export/."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        export_format = request.query_params.get("export_format", "csv")
+        if export_format not in SubmissionExportService.CONTENT_TYPES:
+            return Response({"detail": "export_format must be csv or ndjson."}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Same visibility rules as the form views: deleted versions are admin-only
+        visible = FormDefinitionService.filter_by_state(FormDefinition.objects.all(), request.user, request.query_params)
+        form = get_object_or_404(visible, pk=form_pk)
+        queryset = self.filter_queryset(self.get_queryset())
+        response = StreamingHttpResponse(
+            SubmissionExportService.stream(queryset, form, export_format),
+            content_type=SubmissionExportService.CONTENT_TYPES[export_format],
+        )
+        filename = f"{form.name}-v{form.version}.{export_format}".replace(" ", "_").replace('"', "")
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+
     def perform_create(self, serializer):
         form_pk = self.kwargs.get("form_pk")
         form = FormDefinition.objects.get(pk=form_pk) if form_pk else serializer.validated_data["form"]
-        serializer.save(form=form, form_version=form.version, submitted_by=self.request.user)
+        # The submission and its form's counters (SubmissionCounterService) commit together
+        with transaction.atomic():
+            serializer.save(form=form, form_version=form.version, submitted_by=self.request.user)
 
 class UserViewSet(viewsets.ModelViewSet):
-    queryset = User.objects.all().order_by("id")
+    queryset = User.objects.prefetch_related("groups").order_by("id")
     permission_classes = [IsAuthenticated, RoleBasedUserPermission]
     pagination_class = StandardResultsSetPagination
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
@@ -144,17 +289,45 @@ class UserViewSet(viewsets.ModelViewSet):
 class DashboardMetricsView(APIView):
     permission_classes = [IsAuthenticated]
 
+    @staticmethod
+    def window(params):
+        """(days, hours) from the query string, clamped to what the dashboard offers."""
+        def bounded(name, default, upper):
+            try:
+                return max(1, min(int(params.get(name, default)), upper))
+            except (TypeError, ValueError):
+                return default
+
+        return bounded("days", 7, 90), bounded("hours", 24, 168)
+
     def get(self, request, *args, **kwargs):
-        return Response(DashboardService.get_metrics())
+        days, hours = self.window(request.query_params)
+        metrics, etag, generated_at = DashboardService.get_snapshot(days=days, hours=hours)
+        not_modified = not_modified_response(request, etag, generated_at)
+        if not_modified is not None:
+            return not_modified
+        return set_validators(Response(metrics), etag, generated_at)
+
+class RequestMetricsView(APIView):
+    """
+    Per-route request metrics of every worker in Prometheus text format. Admins, or the scraper
+    with METRICS_SCRAPE_TOKEN.
+    """
+    authentication_classes = [MetricsScrapeTokenAuthentication, *api_settings.DEFAULT_AUTHENTICATION_CLASSES]
+    permission_classes = [IsAdminUser | HasMetricsScrapeToken]
 
-class AuditLogViewSet(viewsets.ReadOnlyModelViewSet):
+    def get(self, request, *args, **kwargs):
+        return HttpResponse(RequestMetricsService.render_prometheus(), content_type=RequestMetricsService.CONTENT_TYPE)
+
+class AuditLogViewSet(ConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
     """
     API endpoint to view user activity logs (audit logs).
     Only Admins can access this.
     """
     serializer_class = AuditLogSerializer
     permission_classes = [IsAdminUser]
-    pagination_class = StandardResultsSetPagination
+    pagination_class = OptionalKeysetPagination
+    keyset_field = "created_at"
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
 
     ordering_fields = ["created_at", "status_code", "method", "path"]
@@ -164,6 +337,13 @@ class AuditLogViewSet(viewsets.ReadOnlyModelViewSet):
     def get_queryset(self):
         return AuditLogService.get_queryset(self.request.query_params)
 
+    def get_validators(self, request):
+        newest, oldest, latest = AuditLogService.change_marker()
+        etag = ChangeCounterService.etag(
+            "audit-logs", self.action, self.kwargs, newest, oldest, ChangeCounterService.request_parts(request)
+        )
+        return etag, latest
+
 class LogEntryViewSet(viewsets.ReadOnlyModelViewSet):
     """
     API endpoint to view log entries.
@@ -171,10 +351,11 @@ class LogEntryViewSet(viewsets.ReadOnlyModelViewSet):
     """
     serializer_class = LogEntrySerializer
     permission_classes = [IsAdminUser]
-    pagination_class = StandardResultsSetPagination
+    pagination_class = OptionalKeysetPagination
+    keyset_field = "created_at"
 
     def get_queryset(self):
-        return LogEntryService.get_queryset()
+        return LogEntryService.get_queryset(self.request.query_params)
     
 class SelfRegisterView(generics.CreateAPIView):
     
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 import os
+import sys
 from pathlib import Path
 from datetime import timedelta
 from dotenv import load_dotenv
@@ -72,6 +73,20 @@ MIDDLEWARE = [
     "api.v1.middleware.AuditMiddleware",
 ]
 
+# Per-route latency, SQL count/time and response size histograms, aggregated per worker process
+# and served to admins in Prometheus text format at /api/v1/dashboard/metrics/prometheus/
+REQUEST_METRICS = os.getenv("REQUEST_METRICS", "True").lower() == "true"
+# Workers copy their metrics to the shared cache at most this often (seconds), so a scrape of any
+# worker returns the sum over all of them; copies of stopped workers expire after the TTL
+REQUEST_METRICS_PUBLISH_INTERVAL = int(os.getenv("REQUEST_METRICS_PUBLISH_INTERVAL", "15"))
+REQUEST_METRICS_WORKER_TTL = int(os.getenv("REQUEST_METRICS_WORKER_TTL", "3600"))
+# Static credential for the Prometheus scraper ("Authorization: Bearer <token>"), as an alternative
+# to an admin JWT; empty disables it
+METRICS_SCRAPE_TOKEN = os.getenv("METRICS_SCRAPE_TOKEN", "")
+if REQUEST_METRICS:
+    # First, so the latency includes every other middleware
+    MIDDLEWARE.insert(0, "api.v1.middleware.InstrumentationMiddleware")
+
 ROOT_URLCONF = 'backend.urls'
 
 TEMPLATES = [
@@ -107,6 +122,38 @@ DATABASES = {
         }
 }
 
+# Connection reuse (measure with `python manage.py loadtest`).
+# - DB_CONN_MAX_AGE: seconds a worker keeps its connection between requests
+#   (0 = reconnect on every request, "none" = keep forever).
+# - DB_CONN_HEALTH_CHECKS: ping a reused connection before a request so a broken one is replaced.
+# - DB_POOL: psycopg 3 connection pool per worker process instead of persistent connections
+#   (Django requires CONN_MAX_AGE = 0 with a pool). Sized by DB_POOL_MIN_SIZE / DB_POOL_MAX_SIZE;
+#   DB_POOL_TIMEOUT is how long a request waits for a free connection.
+# - APP_SERVER: "gunicorn" (WSGI) or "uvicorn" (ASGI), as started by entrypoint.sh. Under uvicorn
+#   DB_CONN_MAX_AGE is ignored and connections are not reused unless DB_POOL is set.
+APP_SERVER = os.getenv("APP_SERVER", "gunicorn").lower()
+DB_POOL = os.getenv("DB_POOL", "False").lower() == "true"
+_conn_max_age = os.getenv("DB_CONN_MAX_AGE", "60").lower()
+
+if DB_POOL:
+    DATABASES["default"]["CONN_MAX_AGE"] = 0
+    DATABASES["default"]["OPTIONS"] = {
+        "pool": {
+            "min_size": int(os.getenv("DB_POOL_MIN_SIZE", "2")),
+            "max_size": int(os.getenv("DB_POOL_MAX_SIZE", "10")),
+            "timeout": float(os.getenv("DB_POOL_TIMEOUT", "10")),
+            # Connections idle longer than this are closed and later replaced
+            "max_idle": float(os.getenv("DB_POOL_MAX_IDLE", "300")),
+        }
+    }
+elif APP_SERVER == "uvicorn":
+    # Under ASGI the ORM runs in executor threads that outlive requests, so a persistent connection
+    # is never closed by the request_finished cleanup and leaks; use DB_POOL=true instead (api.W002)
+    DATABASES["default"]["CONN_MAX_AGE"] = 0
+else:
+    DATABASES["default"]["CONN_MAX_AGE"] = None if _conn_max_age == "none" else int(_conn_max_age)
+DATABASES["default"]["CONN_HEALTH_CHECKS"] = os.getenv("DB_CONN_HEALTH_CHECKS", "True").lower() == "true"
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -151,9 +198,20 @@ STATIC_URL = 'static/'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Authenticate read requests from the JWT claims alone (no User query), with a cached
+# token-version check that revokes tokens after role/password changes.
+# See api.v1.authentication.StatelessJWTAuthentication.
+JWT_STATELESS_AUTH = os.getenv("JWT_STATELESS_AUTH", "False").lower() == "true"
+JWT_TOKEN_VERSION_TTL = int(os.getenv("JWT_TOKEN_VERSION_TTL", "3600"))
+# Cap on that TTL when several workers run on a per-process cache (revocations made in one
+# worker reach the others after at most this many seconds)
+JWT_TOKEN_VERSION_LOCAL_TTL = int(os.getenv("JWT_TOKEN_VERSION_LOCAL_TTL", "5"))
+
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "api.v1.authentication.StatelessJWTAuthentication"
+        if JWT_STATELESS_AUTH
+        else "rest_framework_simplejwt.authentication.JWTAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": (
         "rest_framework.permissions.IsAuthenticated",
@@ -171,6 +229,71 @@ SIMPLE_JWT = {
     'BLACKLIST_AFTER_ROTATION': True,
 }
 
+# Bulk submission ingestion (/submissions/bulk/)
+SUBMISSION_BULK_MAX_ROWS = int(os.getenv("SUBMISSION_BULK_MAX_ROWS", "50000"))
+SUBMISSION_BULK_CHUNK_SIZE = int(os.getenv("SUBMISSION_BULK_CHUNK_SIZE", "1000"))
+
+# Shared cache: a Redis-protocol server (Redis, Valkey, KeyDB...) when REDIS_URL is set,
+# otherwise per-process memory. Change counters (ETags), cached responses and token versions live
+# in the cache, so with more than one app server worker (APP_SERVER_WORKERS, read from the
+# GUNICORN_WORKERS that entrypoint.sh starts) the shared backend is required: the api.E001 system
+# check fails `manage.py check`, which entrypoint.sh runs before starting the server.
+APP_SERVER_WORKERS = int(os.getenv("GUNICORN_WORKERS", "1"))
+if os.getenv("REDIS_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.getenv("REDIS_URL"),
+            "KEY_PREFIX": os.getenv("CACHE_KEY_PREFIX", "dfb"),
+        }
+    }
+
+# Seconds GET /forms/ and /forms/{id}/ responses stay cached (invalidated on every form write)
+FORM_CACHE_TTL = int(os.getenv("FORM_CACHE_TTL", "300"))
+
+# Seconds /forms/{id}/diff/ results stay cached (field diffs are keyed by the immutable versions,
+# submission impact by the compared versions' submission counters)
+FORM_DIFF_CACHE_TTL = int(os.getenv("FORM_DIFF_CACHE_TTL", "3600"))
+# Most recent submissions the diff validates against the newer schema ("truncated" when capped)
+FORM_DIFF_IMPACT_MAX_ROWS = int(os.getenv("FORM_DIFF_IMPACT_MAX_ROWS", "50000"))
+
+# Seconds /forms/{id}/analytics/ results of closed (superseded) versions stay cached; they are
+# also invalidated whenever a submission is edited or deleted. The latest version is never cached.
+FORM_ANALYTICS_CACHE_TTL = int(os.getenv("FORM_ANALYTICS_CACHE_TTL", "86400"))
+
+# Serve GET /forms/, /forms/{id}/, /submissions/, /forms/{id}/submissions/ and /dashboard/metrics/
+# from the async views in api.v1.async_views. Only useful under an ASGI server (uvicorn, see
+# `manage.py benchmark_asgi`); under WSGI Django runs them in a per-request event loop.
+ASYNC_READ_VIEWS = os.getenv("ASYNC_READ_VIEWS", "False").lower() == "true"
+
+# Seconds /dashboard/metrics/ responses stay cached (served from MetricRollup)
+DASHBOARD_CACHE_TTL = int(os.getenv("DASHBOARD_CACHE_TTL", "30"))
+
+# MetricRollup counters are split over this many rows (each worker thread writes its own) so
+# concurrent writes do not serialize on one row lock. `prune_metric_rollups` (run daily) folds closed buckets and deletes hourly buckets
+# older than METRIC_ROLLUP_HOUR_RETENTION_DAYS (the dashboard shows at most 168 hours; 0 keeps all).
+METRIC_ROLLUP_SHARDS = int(os.getenv("METRIC_ROLLUP_SHARDS", "8"))
+METRIC_ROLLUP_HOUR_RETENTION_DAYS = int(os.getenv("METRIC_ROLLUP_HOUR_RETENTION_DAYS", "14"))
+
+# Rows fetched per server-side cursor round-trip by /forms/{id}/submissions/export/
+SUBMISSION_EXPORT_CHUNK_SIZE = int(os.getenv("SUBMISSION_EXPORT_CHUNK_SIZE", "2000"))
+
+# Number of compiled (form, version) submission validators kept in memory per process
+FORM_VALIDATOR_CACHE_SIZE = int(os.getenv("FORM_VALIDATOR_CACHE_SIZE", "512"))
+
+# Monthly partitions of v1_auditlog / v1_logentry (PostgreSQL, see `manage_log_partitions`).
+# Months kept attached per table (0 keeps everything); older partitions are detached,
+# archived to LOG_ARCHIVE_DIR as gzipped NDJSON and dropped.
+LOG_PARTITION_PREMAKE_MONTHS = int(os.getenv("LOG_PARTITION_PREMAKE_MONTHS", "3"))
+LOG_RETENTION_MONTHS = {
+    "v1_auditlog": int(os.getenv("AUDIT_LOG_RETENTION_MONTHS", "12")),
+    "v1_logentry": int(os.getenv("LOG_ENTRY_RETENTION_MONTHS", "3")),
+}
+LOG_ARCHIVE_DIR = os.getenv("LOG_ARCHIVE_DIR", os.path.join(BASE_DIR, "logs", "archive"))
+
+# Resolve user roles from the JWT `roles` claim instead of querying auth_group on every request
+JWT_ROLES_FROM_TOKEN = os.getenv("JWT_ROLES_FROM_TOKEN", "False").lower() == "true"
+
 
 CORS_ALLOW_ALL_ORIGINS = True
 # if DEBUG:
@@ -188,15 +311,53 @@ STATICFILES_DIRS = [
     os.path.join(BASE_DIR, "static"),
 ]
 
+TESTING = "test" in sys.argv or "pytest" in sys.modules
+
+# Requests AuditMiddleware logs, compiled once per process into one regex per method.
+# "pattern" is a regex matched at the start of the path (first matching route wins),
+# "methods" defaults to AUDIT_METHODS and "sample_rate" (default 1) is the fraction logged.
+# Single-submission POSTs are the high-volume writes: AUDIT_SUBMISSION_SAMPLE_RATE samples them,
+# every other write (forms, users, auth, bulk ingests, submission edits/deletes) is always logged.
+AUDIT_METHODS = ["POST", "PUT", "PATCH", "DELETE"]
+AUDIT_SUBMISSION_SAMPLE_RATE = float(os.getenv("AUDIT_SUBMISSION_SAMPLE_RATE", "1.0"))
+AUDIT_ROUTES = [
+    {
+        # Anchored: only the create endpoints, never /submissions/bulk/
+        "pattern": r"/api/v1/(forms/[^/]+/)?submissions/$",
+        "methods": ["POST"],
+        "sample_rate": AUDIT_SUBMISSION_SAMPLE_RATE,
+    },
+    {"pattern": r"/api/v1/forms/"},
+    {"pattern": r"/api/v1/users/"},
+    {"pattern": r"/api/v1/submissions/"},
+    {"pattern": r"/api/v1/auth/"},
+]
+
+# Audit/log rows are buffered and written in batches from a background thread.
+# Tests keep synchronous writes so rows land inside the test transaction.
+AUDIT_LOG_ASYNC = os.getenv("AUDIT_LOG_ASYNC", "True").lower() == "true" and not TESTING
+
+if AUDIT_LOG_ASYNC:
+    DB_LOG_HANDLER = {
+        "level": "INFO",
+        "class": "api.v1.logging_handlers.BufferedDatabaseLogHandler",
+        "batch_size": int(os.getenv("AUDIT_LOG_BATCH_SIZE", "100")),
+        "flush_interval": float(os.getenv("AUDIT_LOG_FLUSH_INTERVAL", "1.0")),
+        "max_queue_size": int(os.getenv("AUDIT_LOG_QUEUE_SIZE", "10000")),
+        "block_timeout": float(os.getenv("AUDIT_LOG_BLOCK_TIMEOUT", "0")),
+    }
+else:
+    DB_LOG_HANDLER = {
+        "level": "INFO",
+        "class": "api.v1.logging_handlers.DatabaseLogHandler",
+    }
+
 # Logging en DB
 LOGGING = {
     "version": 1,
     "disable_existing_loggers": False,
     "handlers": {
-        "db": {
-            "level": "INFO",
-            "class": "api.v1.logging_handlers.DatabaseLogHandler",
-        },
+        "db": DB_LOG_HANDLER,
         "console": {
             "level": "DEBUG",
             "class": "logging.StreamHandler",
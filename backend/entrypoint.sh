@@ -4,6 +4,9 @@ set -e
 MAX_RETRIES=30   # ~60 seconds if sleep=2
 COUNT=0
 
+# Worker count is also read by settings (APP_SERVER_WORKERS) for the shared-cache check below
+export GUNICORN_WORKERS="${GUNICORN_WORKERS:-3}"
+
 if [ -n "$DATABASE_HOST" ] && [ -n "$DATABASE_PORT" ]; then
   echo "Waiting for database at $DATABASE_HOST:$DATABASE_PORT..."
   until nc -z "$DATABASE_HOST" "$DATABASE_PORT"; do
@@ -22,5 +25,17 @@ else
   echo "DATABASE_HOST/PORT not set — skipping wait."
 fi
 
+# Refuses to start several workers on a per-process cache (api.E001: set REDIS_URL)
+python manage.py check
+
+if [ "$APP_SERVER" = "uvicorn" ]; then
+  echo "Starting Uvicorn (ASGI)..."
+  # Persistent connections are disabled under uvicorn; set DB_POOL=true to reuse them (api.W002)
+  exec uvicorn backend.asgi:application --host 0.0.0.0 --port 8000 \
+    --workers "$GUNICORN_WORKERS" --no-access-log
+fi
+
 echo "Starting Gunicorn..."
-exec gunicorn backend.wsgi:application --bind 0.0.0.0:8000 --workers 3
+# Each worker (and thread) holds its own persistent DB connection or pool (see DB_* settings)
+exec gunicorn backend.wsgi:application --bind 0.0.0.0:8000 \
+  --workers "$GUNICORN_WORKERS" --threads "${GUNICORN_THREADS:-1}"